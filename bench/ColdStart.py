@@ -0,0 +1,273 @@
+"""
+Cold-start latency benchmark for script entry points.
+Runs each script against fake binaries and a sysfs fixture, reporting wall time,
+import time and subprocess count per invocation.
+
+Usage:
+    python bench/ColdStart.py [-n RUNS] [--only NAME ...] [--output FILE]
+    python bench/ColdStart.py --compare OLD.json NEW.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+REPO_DIR: Path = Path(__file__).resolve().parent.parent
+HYPR_DIR: Path = REPO_DIR / "config/hypr"
+RESULTS_DIR: Path = REPO_DIR / "bench/results"
+BAR_SCRIPTS: str = "Themes/NierAutomata/Bar/Scripts"
+
+DEFAULT_RUNS: int = 20
+IMPORT_TOP: int = 10
+
+# name -> (script relative to config/hypr, arguments)
+ENTRY_POINTS: dict[str, tuple[str, list[str]]] = {
+    "Audio": ("Scripts/Audio.py", ["raiseVolume"]),
+    "Brightness": ("Scripts/Brightness.py", ["up"]),
+    "RofiLauncher": ("Scripts/RofiLauncher.py", ["menu"]),
+    "LockStatus": ("Scripts/LockStatus.py", []),
+    "Interface": ("Scripts/Interface.py", []),
+    "HyprlockMusic": ("Scripts/HyprlockMusic.py", ["--title"]),
+    "Album": ("Scripts/Album.py", []),
+    "Weather": ("Scripts/Weather.py", []),
+    "Location": ("Scripts/Location.py", []),
+    "Kahfein": (f"{BAR_SCRIPTS}/Kahfein.py", ["status"]),
+    "WifiSignal": (f"{BAR_SCRIPTS}/WifiSignal.py", []),
+    "BatteryAnimation": (f"{BAR_SCRIPTS}/BatteryAnimation.py", []),
+    "BlueLightFilter": (f"{BAR_SCRIPTS}/BlueLightFilter.py", ["status"]),
+    "ColorPicker": (f"{BAR_SCRIPTS}/ColorPicker.py", ["status"]),
+}
+
+# Fake binaries: name -> (stdout, exit code)
+FAKE_BINARIES: dict[str, tuple[str, int]] = {
+    "wpctl": ("Volume: 0.50", 0),
+    "brightnessctl": ("intel_backlight,backlight,480,50%,960", 0),
+    "hyprctl": ("[]", 0),
+    "playerctl": ("Playing", 0),
+    "iwctl": (
+        "                                 Station: wlan0\n"
+        "  State                 connected\n"
+        "  Connected network     HomeNetwork\n"
+        "  RSSI                  -52 dBm\n", 0),
+    "pidof": ("", 1),
+    "killall": ("", 0),
+    "notify-send": ("", 0),
+    "ip": ("default via 192.168.1.1 dev wlan0 proto dhcp metric 600", 0),
+    "ping": ("", 0),
+    "curl": ('{"country": "Nowhere", "city": "Benchville"}', 0),
+    "rofi": ("", 0),
+    "hyprsunset": ("", 0),
+    "hyprpicker": ("#aabbcc", 0),
+    "magick": ("", 0),
+    "awww": ("", 0),
+    "ps": ("", 1),
+    "sudo": ("", 0),
+}
+
+# Sysfs fixture: relative path -> contents
+SYSFS_FIXTURE: dict[str, str] = {
+    "class/power_supply/BAT0/status": "Discharging\n",
+    "class/power_supply/BAT0/capacity": "57\n",
+    "class/power_supply/AC/online": "0\n",
+    "class/net/lo/operstate": "unknown\n",
+    "class/net/wlan0/operstate": "up\n",
+    "class/net/enp3s0/operstate": "down\n",
+    "class/backlight/intel_backlight/brightness": "480\n",
+    "class/backlight/intel_backlight/max_brightness": "960\n",
+    "class/backlight/intel_backlight/type": "raw\n",
+    "class/thermal/thermal_zone0/temp": "45000\n",
+}
+
+
+def build_sandbox(root: Path) -> dict[str, str]:
+    """
+    Create fake binaries, a sysfs fixture and a home directory under root.
+
+    Returns:
+        Environment for running the entry points
+    """
+    bin_dir = root / "bin"
+    bin_dir.mkdir()
+    for name, (stdout, code) in FAKE_BINARIES.items():
+        script = bin_dir / name
+        script.write_text(
+            "#!/bin/sh\n"
+            f'echo {name} >> "$BENCH_SPAWN_LOG"\n'
+            f"cat <<'__OUT__'\n{stdout}\n__OUT__\n"
+            f"exit {code}\n"
+        )
+        script.chmod(0o755)
+
+    sysfs = root / "sys"
+    for rel, content in SYSFS_FIXTURE.items():
+        path = sysfs / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+    home = root / "home"
+    (home / ".config").mkdir(parents=True)
+    (home / ".config/hypr").symlink_to(HYPR_DIR)
+
+    runtime = root / "run"
+    runtime.mkdir(mode=0o700)
+
+    env = {
+        "PATH": f"{bin_dir}:/usr/bin:/bin",
+        "HOME": str(home),
+        "USER": os.environ.get("USER", "bench"),
+        "LANG": "C.UTF-8",
+        "XDG_RUNTIME_DIR": str(runtime),
+        "HYPR_SYSFS_ROOT": str(sysfs),
+        # Point the bus at nothing so scripts take their no-bus path deterministically
+        "DBUS_SESSION_BUS_ADDRESS": f"unix:path={root}/no-bus",
+        "BENCH_SPAWN_LOG": str(root / "spawn.log"),
+    }
+    return env
+
+
+def run_once(cmd: list[str], env: dict[str, str]) -> tuple[float, int]:
+    """Run a command, returning wall time in ms and the number of fake binaries spawned."""
+    log = Path(env["BENCH_SPAWN_LOG"])
+    log.write_text("")
+
+    start = time.perf_counter()
+    subprocess.run(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    return elapsed, len(log.read_text().splitlines())
+
+
+def import_breakdown(cmd: list[str], env: dict[str, str]) -> list[tuple[str, int, int]]:
+    """
+    Run once under -X importtime and return the slowest imports.
+
+    Returns:
+        (module, depth, cumulative us) for top-level imports and their direct children
+    """
+    result = subprocess.run(
+        [cmd[0], "-X", "importtime", *cmd[1:]],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Nesting is encoded as two spaces per level after the separator space
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth <= 1:
+            imports.append((name.strip(), depth, int(cumulative)))
+
+    imports.sort(key=lambda item: item[2], reverse=True)
+    return imports[:IMPORT_TOP]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def benchmark(runs: int, only: list[str] | None) -> dict:
+    """Benchmark every selected entry point and return the result document."""
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="hypr-bench-") as tmp:
+        env = build_sandbox(Path(tmp))
+
+        for name, (script, args) in ENTRY_POINTS.items():
+            if only and name not in only:
+                continue
+            cmd = [sys.executable, str(HYPR_DIR / script), *args]
+
+            # Warm the page cache and __pycache__ before measuring
+            run_once(cmd, env)
+            times, spawns = [], []
+            for _ in range(runs):
+                elapsed, spawned = run_once(cmd, env)
+                times.append(elapsed)
+                spawns.append(spawned)
+
+            results[name] = {
+                "p50_ms": round(statistics.median(times), 2),
+                "p95_ms": round(percentile(times, 0.95), 2),
+                "mean_ms": round(statistics.fmean(times), 2),
+                "subprocesses": max(spawns),
+                "imports_us": import_breakdown(cmd, env),
+            }
+            print(f"{name:<18}p50 {results[name]['p50_ms']:>7.1f} ms   "
+                  f"p95 {results[name]['p95_ms']:>7.1f} ms   "
+                  f"spawns {results[name]['subprocesses']}")
+
+    return {
+        "commit": git_revision(),
+        "python": sys.version.split()[0],
+        "runs": runs,
+        "timestamp": int(time.time()),
+        "results": results,
+    }
+
+
+def git_revision() -> str:
+    """Short hash of HEAD, with a -dirty suffix for uncommitted changes."""
+    try:
+        rev = subprocess.run(["git", "-C", str(REPO_DIR), "rev-parse", "--short", "HEAD"],
+                             capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(["git", "-C", str(REPO_DIR), "diff", "--quiet", "HEAD", "--", "config"]
+                               ).returncode != 0
+        return f"{rev}-dirty" if dirty else rev
+    except FileNotFoundError:
+        return "unknown"
+
+
+def compare(old_path: str, new_path: str) -> None:
+    """Print per-entry-point deltas between two result files."""
+    old = json.loads(Path(old_path).read_text())
+    new = json.loads(Path(new_path).read_text())
+
+    print(f"{old['commit']} -> {new['commit']}")
+    print(f"{'entry point':<18}{'p50 old':>9}{'p50 new':>9}{'delta':>9}{'spawns':>10}")
+    for name, row in new["results"].items():
+        before = old["results"].get(name)
+        if not before:
+            print(f"{name:<18}{'-':>9}{row['p50_ms']:>9.1f}")
+            continue
+        delta = (row["p50_ms"] - before["p50_ms"]) / before["p50_ms"] * 100
+        print(f"{name:<18}{before['p50_ms']:>9.1f}{row['p50_ms']:>9.1f}{delta:>+8.1f}%"
+              f"{before['subprocesses']:>5} -> {row['subprocesses']}")
+
+
+def main() -> None:
+    """Parse arguments and run or compare benchmarks."""
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for script entry points")
+    parser.add_argument("-n", "--runs", type=int, default=DEFAULT_RUNS, help="Runs per entry point")
+    parser.add_argument("--only", nargs="+", choices=list(ENTRY_POINTS), help="Entry points to run")
+    parser.add_argument("--output", type=str, help="Result file (default: bench/results/<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two result files")
+
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    if shutil.which("sh") is None:
+        sys.exit("sh is required for the fake binaries")
+
+    document = benchmark(args.runs, args.only)
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{document['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(document, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
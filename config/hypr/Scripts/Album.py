@@ -1,11 +1,11 @@
-from Utils import run_capture
+from MediaState import get_field
 
 def main():
-    album, _, _ = run_capture(["playerctl", "metadata", "--format", "{{ xesam:album }}"])
+    album = get_field("album")
     if album:
         print(album)
     else:
-        status, _, _ = run_capture(["playerctl", "status"])
+        status = get_field("status")
         if status:
             print("Not album")
         else:
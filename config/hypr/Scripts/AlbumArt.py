@@ -0,0 +1,235 @@
+"""
+Album-art cache.
+Cover variants rendered on first use, keyed by content hash, bounded by an LRU size budget.
+"""
+
+import argparse
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+from Utils import get_logger, run_silent, spawn_detached, write_atomic
+
+log = get_logger("AlbumArt")
+
+
+ART_CACHE_DIR: Path = Path.home() / ".cache/hypr/album-art"
+INDEX_FILE: str = "index.json"
+LOCK_FILE: str = ".lock"
+
+CACHE_BUDGET: int = 32 * 1024 * 1024  # Bytes kept across all covers
+INDEX_LIMIT: int = 512                # Source -> hash entries remembered
+CURL_TIMEOUT: str = "5"
+
+
+@dataclass(frozen=True, slots=True)
+class ArtVariant:
+    """How one cached rendition of a cover is produced."""
+    size: int
+    rounding: int = 0
+    blur: float = 0.0
+
+
+VARIANTS: dict[str, ArtVariant] = {
+    "lock": ArtVariant(120),                 # hyprlock image widget (size 60, 2x for HiDPI)
+    "notify": ArtVariant(128, rounding=12),  # Notification icon
+    "backdrop": ArtVariant(480, blur=24),    # Blurred background
+}
+
+
+def local_path(url: str) -> Path | None:
+    """Filesystem path of a file:// URL or plain path, else None."""
+    if url.startswith("file://"):
+        return Path(unquote(urlparse(url).path))
+    if url.startswith("/"):
+        return Path(url)
+    return None
+
+
+def source_key(url: str) -> str | None:
+    """
+    Identify a source without reading it.
+    Local files are keyed by path, mtime and size so a rewritten file is rehashed.
+    """
+    path = local_path(url)
+    if path is None:
+        return url
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return f"{path}:{st.st_mtime_ns}:{st.st_size}"
+
+
+def load_index() -> dict[str, str]:
+    try:
+        return json.loads((ART_CACHE_DIR / INDEX_FILE).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def variant_path(digest: str, variant: str) -> Path:
+    return ART_CACHE_DIR / digest / f"{variant}.png"
+
+
+def get_art(url: str, variant: str = "lock") -> str:
+    """
+    Return the cached variant for a cover URL.
+    On a miss, generation of that variant starts in a detached process and
+    the source path is returned meanwhile; the cache path follows once it
+    is ready.
+    """
+    key = source_key(url) if url else None
+    if key is None:
+        return ""
+
+    digest = load_index().get(key)
+    if digest is not None:
+        path = variant_path(digest, variant)
+        if path.exists():
+            # Directory mtime is the LRU timestamp
+            os.utime(path.parent)
+            return str(path)
+
+    warm(url, variant)
+    source = local_path(url)
+    return str(source) if source else ""
+
+
+def warm(url: str, variant: str = "lock") -> None:
+    """Generate one variant of a cover in the background."""
+    if url:
+        spawn_detached(lambda: generate(url, (variant,)))
+
+
+def render(source: Path, dest: Path, variant: ArtVariant) -> bool:
+    """Render one variant with ImageMagick, atomically replacing dest."""
+    size = variant.size
+    cmd = [
+        "magick", f"{source}[0]",
+        "-resize", f"{size}x{size}^", "-gravity", "center", "-extent", f"{size}x{size}",
+    ]
+    if variant.blur:
+        cmd += ["-blur", f"0x{variant.blur}"]
+    if variant.rounding:
+        radius = variant.rounding
+        cmd += [
+            "(", "-size", f"{size}x{size}", "xc:black", "-fill", "white",
+            "-draw", f"roundrectangle 0,0 {size - 1},{size - 1} {radius},{radius}", ")",
+            "-alpha", "off", "-compose", "CopyOpacity", "-composite",
+        ]
+
+    tmp = dest.with_suffix(".tmp.png")
+    cmd.append(f"PNG32:{tmp}")
+    if run_silent(cmd) != 0:
+        tmp.unlink(missing_ok=True)
+        return False
+    os.replace(tmp, dest)
+    return True
+
+
+def generate(url: str, variants: tuple[str, ...] = ("lock",)) -> None:
+    """
+    Hash a cover, render the requested variants it is missing, record it
+    and enforce the budget.
+
+    Args:
+        url: Cover URL (file://, path or http(s)://)
+        variants: Names from VARIANTS to render; the others are left until asked for
+    """
+    ART_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    key = source_key(url)
+    if key is None:
+        return
+
+    fd = os.open(ART_CACHE_DIR / LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return  # Another generator is running; the next lookup retries
+
+        with tempfile.TemporaryDirectory(dir=ART_CACHE_DIR) as tmp_dir:
+            source = local_path(url)
+            if source is None:
+                source = Path(tmp_dir) / "source"
+                if run_silent(["curl", "-sf", "--max-time", CURL_TIMEOUT, "-o", str(source), url]) != 0:
+                    log.warning(f"Could not download {url}")
+                    return
+
+            try:
+                with open(source, "rb") as f:
+                    digest = hashlib.file_digest(f, "sha256").hexdigest()[:32]
+            except OSError as e:
+                log.warning(f"Could not read {source}: {e}")
+                return
+
+            (ART_CACHE_DIR / digest).mkdir(exist_ok=True)
+            for name in variants:
+                dest = variant_path(digest, name)
+                if not dest.exists() and not render(source, dest, VARIANTS[name]):
+                    log.warning(f"Could not render {name} variant of {source}")
+            os.utime(ART_CACHE_DIR / digest)
+
+        index = load_index()
+        index.pop(key, None)
+        index[key] = digest
+        # Oldest insertions are dropped first
+        index = dict(list(index.items())[-INDEX_LIMIT:])
+        prune(index)
+        write_atomic(ART_CACHE_DIR / INDEX_FILE, json.dumps(index))
+        log.debug(f"Cached {url} as {digest}")
+    finally:
+        os.close(fd)
+
+
+def prune(index: dict[str, str]) -> None:
+    """Delete least recently used covers until the cache fits its budget."""
+    entries = []
+    total = 0
+    for entry in ART_CACHE_DIR.iterdir():
+        if not entry.is_dir() or entry.name.startswith("tmp"):
+            continue
+        size = sum(f.stat().st_size for f in entry.iterdir())
+        entries.append((entry.stat().st_mtime, size, entry))
+        total += size
+
+    for _, size, entry in sorted(entries):
+        if total <= CACHE_BUDGET:
+            break
+        shutil.rmtree(entry, ignore_errors=True)
+        total -= size
+        for key in [k for k, v in index.items() if v == entry.name]:
+            del index[key]
+        log.debug(f"Evicted {entry.name}")
+
+
+def main() -> None:
+    """Parse arguments and execute the requested album-art action."""
+    parser = argparse.ArgumentParser(description="Album-art cache")
+    parser.add_argument("action", choices=["get", "generate"])
+    parser.add_argument("url", help="Cover URL (file://, path or http(s)://)")
+    parser.add_argument(
+        "--variant",
+        choices=list(VARIANTS),
+        default="lock",
+        help="Rendition to return or generate (default: lock)"
+    )
+
+    args = parser.parse_args()
+
+    match args.action:
+        case "get":
+            print(get_art(args.url, args.variant))
+        case "generate":
+            generate(args.url, (args.variant,))
+
+
+if __name__ == "__main__":
+    main()
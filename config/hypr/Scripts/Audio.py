@@ -4,10 +4,15 @@ Provides functions for adjusting volume, muting, and sending notifications.
 """
 
 import argparse
+import os
+import time
 from pathlib import Path
 from typing import TypedDict
 
-from Utils import notify, notify_with_progress, get_logger, run_capture, run_silent, get_theme_dir
+from Utils import (
+    notify, notify_with_progress, get_logger, run_capture, run_silent, get_theme_dir,
+    runtime_lock, load_worker_state, save_worker_state, worker_alive
+)
 
 log = get_logger("Audio")
 
@@ -19,6 +24,13 @@ DEFAULT_STEP: int = 5
 
 ICON_DIR: Path = get_theme_dir() / "Swaync/Icons"
 
+# Key-repeat coalescing: invocations add their step to a shared pending
+# delta and a single worker applies it once per frame
+VOLUME_STATE: str = "volume"
+VOLUME_IDLE: dict = {"pending": 0, "worker": 0}
+FRAME_INTERVAL: float = 0.05  # Seconds between applied updates
+WORKER_LINGER: float = 0.3  # Idle time before the worker exits
+
 
 class VolumeInfo(TypedDict):
     """Type definition for volume information."""
@@ -106,21 +118,79 @@ def sync_mic_led() -> None:
     set_mic_led(is_mic_muted())
 
 
+def apply_volume(new_volume: int) -> None:
+    """Set the sink volume and show the progress notification."""
+    run_silent(["wpctl", "set-volume", "@DEFAULT_AUDIO_SINK@", f"{new_volume}%"])
+    icon = get_volume_icon(new_volume, False)
+    notify_with_progress(icon, f"Volume Level: {new_volume}%", new_volume, level="critical")
+
+
+def clamp_volume(value: int) -> int:
+    return max(MIN_VOLUME, min(value, MAX_VOLUME))
+
+
 def adjust_volume(step: int, action: str = "raise") -> None:
     """Adjust volume by the specified step amount."""
     volume_info = get_volume()
-
-    if action == "raise":
-        new_volume = min(volume_info["value"] + step, MAX_VOLUME)
-    else:
-        new_volume = max(volume_info["value"] - step, MIN_VOLUME)
+    delta = step if action == "raise" else -step
+    new_volume = clamp_volume(volume_info["value"] + delta)
 
     audio_unmute()
-    run_silent(["wpctl", "set-volume", "@DEFAULT_AUDIO_SINK@", f"{new_volume}%"])
+    apply_volume(new_volume)
     log.debug(f"Volume {action}: {volume_info['value']}% -> {new_volume}%")
 
-    icon = get_volume_icon(new_volume, False)
-    notify_with_progress(icon, f"Volume Level: {new_volume}%", new_volume, level="critical")
+
+def queue_volume_step(step: int, action: str = "raise") -> None:
+    """
+    Add a step to the shared pending delta.
+    If no worker is running this invocation becomes the worker; otherwise
+    it returns at once without spawning anything.
+    """
+    delta = step if action == "raise" else -step
+
+    with runtime_lock(VOLUME_STATE):
+        state = load_worker_state(VOLUME_STATE, VOLUME_IDLE)
+        state["pending"] = state.get("pending", 0) + delta
+        if worker_alive(state.get("worker", 0)):
+            save_worker_state(VOLUME_STATE, state)
+            return
+        state["worker"] = os.getpid()
+        save_worker_state(VOLUME_STATE, state)
+
+    run_volume_worker()
+
+
+def run_volume_worker() -> None:
+    """Apply the accumulated delta once per frame until key repeat stops."""
+    volume = get_volume()["value"]
+    start_volume = volume
+    audio_unmute()
+    last_change = time.monotonic()
+
+    while True:
+        with runtime_lock(VOLUME_STATE):
+            state = load_worker_state(VOLUME_STATE, VOLUME_IDLE)
+            delta = state.get("pending", 0)
+            idle = time.monotonic() - last_change
+            if delta == 0 and idle >= WORKER_LINGER:
+                # Release the worker role under the lock so no step is lost
+                state["worker"] = 0
+                save_worker_state(VOLUME_STATE, state)
+                break
+            if delta:
+                state["pending"] = 0
+                save_worker_state(VOLUME_STATE, state)
+
+        if delta:
+            new_volume = clamp_volume(volume + delta)
+            if new_volume != volume:
+                volume = new_volume
+                apply_volume(volume)
+            last_change = time.monotonic()
+
+        time.sleep(FRAME_INTERVAL)
+
+    log.debug(f"Volume ramp: {start_volume}% -> {volume}%")
 
 
 def main() -> None:
@@ -137,14 +207,21 @@ def main() -> None:
         default=DEFAULT_STEP,
         help="Volume adjustment step (default: 5)"
     )
+    parser.add_argument(
+        "--no-coalesce",
+        action="store_true",
+        help="Apply the step immediately instead of merging key repeats"
+    )
 
     args = parser.parse_args()
 
     match args.action:
-        case "raiseVolume":
-            adjust_volume(args.step, "raise")
-        case "lowerVolume":
-            adjust_volume(args.step, "lower")
+        case "raiseVolume" | "lowerVolume":
+            direction = "raise" if args.action == "raiseVolume" else "lower"
+            if args.no_coalesce:
+                adjust_volume(args.step, direction)
+            else:
+                queue_volume_step(args.step, direction)
         case "muteToggle":
             audio_mute_toggle()
         case "micToggle":
@@ -1,12 +1,15 @@
 """
 Battery monitoring and notification module.
-Watches battery status via D-Bus and sends low/critical battery alerts.
+Subscribes to UPower over D-Bus and sends low/critical battery alerts.
 """
 
+import time
 from collections.abc import Generator
 from pathlib import Path
 
-from Utils import notify, read_file, get_logger, run_bg, PIPE, get_theme_dir
+from DBus import Connection, DBusError
+from PowerState import PowerSnapshot, SnapshotWriter
+from Utils import notify, get_logger, get_theme_dir, ThemeWatcher
 
 log = get_logger("Battery")
 
@@ -17,61 +20,180 @@ BATTERY_THRESHOLDS: dict[str, int] = {
     "critical": 10
 }
 
-ICON_DIR: Path = get_theme_dir() / "Swaync/Icons"
+ICON_SUBDIR: str = "Swaync/Icons"
+ICON_DIR: Path = get_theme_dir() / ICON_SUBDIR
+
+UPOWER_BUS: str = "org.freedesktop.UPower"
+UPOWER_PATH: str = "/org/freedesktop/UPower"
+UPOWER_DEVICES: str = "/org/freedesktop/UPower/devices"
+DEVICE_IFACE: str = "org.freedesktop.UPower.Device"
+PROPERTIES_IFACE: str = "org.freedesktop.DBus.Properties"
+
+DEVICE_TYPE_BATTERY: int = 2
+
+# UPower Device.State values, named like /sys/class/power_supply/*/status
+DEVICE_STATES: dict[int, str] = {
+    0: "Unknown",
+    1: "Charging",
+    2: "Discharging",
+    3: "Empty",
+    4: "Full",
+    5: "Not charging",
+    6: "Discharging",
+}
+
+# Properties tracked per battery
+TRACKED_PROPERTIES: tuple[str, ...] = ("Percentage", "State", "TimeToEmpty", "Energy", "EnergyFull")
+
+DEBOUNCE_INTERVAL: float = 0.5  # Seconds of quiet before a burst is reported
+
+# Reconnect backoff after losing UPower or the bus (seconds)
+RECONNECT_MIN: float = 1.0
+RECONNECT_MAX: float = 60.0
 
 
 # Track which notifications have been sent
 notified: set[str] = set()
 
-
-def watch_battery() -> Generator[tuple[str, int], None, None]:
+# Follows theme switches while the monitor keeps running
+theme_watcher: ThemeWatcher | None = None
+
+
+class BatteryTracker:
+    """Per-battery UPower properties, kept current from PropertiesChanged signals."""
+
+    def __init__(self, bus: Connection) -> None:
+        self.bus = bus
+        self.batteries: dict[str, dict] = {}
+
+    def add_device(self, path: str) -> None:
+        """Start tracking a device if it is a system battery."""
+        try:
+            props = self.bus.get_all_properties(UPOWER_BUS, path, DEVICE_IFACE)
+        except DBusError as e:
+            log.warning(f"Could not read {path}: {e}")
+            return
+        if props.get("Type") != DEVICE_TYPE_BATTERY or not props.get("PowerSupply", True):
+            return
+        self.batteries[path] = {key: props.get(key, 0) for key in TRACKED_PROPERTIES}
+        log.info(f"Tracking battery {path}")
+
+    def enumerate(self) -> None:
+        for path in self.bus.call(UPOWER_BUS, UPOWER_PATH, UPOWER_BUS, "EnumerateDevices")[0]:
+            self.add_device(path)
+
+    def apply(self, msg) -> bool:
+        """
+        Update state from a signal.
+
+        Returns:
+            True if a tracked battery changed
+        """
+        if msg.member == "PropertiesChanged" and msg.path in self.batteries:
+            interface, changed = msg.body[0], msg.body[1]
+            if interface != DEVICE_IFACE:
+                return False
+            updates = {key: changed[key] for key in TRACKED_PROPERTIES if key in changed}
+            self.batteries[msg.path].update(updates)
+            return bool(updates)
+        if msg.member == "DeviceAdded":
+            self.add_device(msg.body[0])
+            return msg.body[0] in self.batteries
+        if msg.member == "DeviceRemoved":
+            return self.batteries.pop(msg.body[0], None) is not None
+        return False
+
+    def summary(self) -> PowerSnapshot:
+        """Combine all batteries into one reading."""
+        states = [DEVICE_STATES.get(b["State"], "Unknown") for b in self.batteries.values()]
+        if "Charging" in states:
+            status = "Charging"
+        elif "Discharging" in states:
+            status = "Discharging"
+        else:
+            status = states[0] if states else "Unknown"
+
+        energy_full = sum(b["EnergyFull"] for b in self.batteries.values())
+        if energy_full > 0:
+            capacity = 100 * sum(b["Energy"] for b in self.batteries.values()) / energy_full
+        else:
+            capacity = sum(b["Percentage"] for b in self.batteries.values()) / max(len(states), 1)
+
+        time_to_empty = sum(b["TimeToEmpty"] for b in self.batteries.values())
+        return PowerSnapshot(status, round(capacity), time_to_empty, len(states), time.time())
+
+
+def watch_battery() -> Generator[PowerSnapshot, None, None]:
     """
-    Monitor battery changes via D-Bus.
-    Yields (status, capacity) tuples when battery state changes.
+    Monitor every UPower battery via D-Bus signals.
+    Yields a combined snapshot once per burst of changes.
     """
-    process = run_bg(
-        [
-            "dbus-monitor", "--system",
-            "type='signal',interface='org.freedesktop.DBus.Properties',"
-            "path='/org/freedesktop/UPower/devices/battery_BAT0'"
-        ],
-        stdout=PIPE,
-        text=True,
-        bufsize=1
-    )
-
-    if process.stdout is None:
-        return
-
-    for line in process.stdout:
-        if "PropertiesChanged" in line:
-            try:
-                status = read_file("/sys/class/power_supply/BAT0/status").strip()
-                capacity = int(read_file("/sys/class/power_supply/BAT0/capacity").strip())
-                log.debug(f"Battery: {status} at {capacity}%")
-                yield status, capacity
-            except (FileNotFoundError, ValueError) as e:
-                log.error(f"Error reading battery info: {e}")
+    bus = Connection.system()
+    try:
+        bus.add_match(sender=UPOWER_BUS, interface=PROPERTIES_IFACE,
+                      member="PropertiesChanged", path_namespace=UPOWER_DEVICES)
+        bus.add_match(sender=UPOWER_BUS, interface=UPOWER_BUS, path=UPOWER_PATH)
+
+        tracker = BatteryTracker(bus)
+        tracker.enumerate()
+        if not tracker.batteries:
+            log.warning("UPower reports no batteries")
+        else:
+            yield tracker.summary()
+
+        while True:
+            msg = bus.next_signal()
+            if msg is None or not tracker.apply(msg):
                 continue
 
+            # Absorb the rest of the burst before reporting
+            while (msg := bus.next_signal(DEBOUNCE_INTERVAL)) is not None:
+                tracker.apply(msg)
+
+            snapshot = tracker.summary()
+            log.debug(f"Battery: {snapshot.status} at {snapshot.capacity}% "
+                      f"({snapshot.time_to_empty}s left)")
+            yield snapshot
+    finally:
+        bus.close()
+
+
+def refresh_icon_dir() -> None:
+    """Re-resolve ICON_DIR if the theme was switched since the last check."""
+    global ICON_DIR
+
+    if theme_watcher is not None and theme_watcher.changed():
+        ICON_DIR = get_theme_dir() / ICON_SUBDIR
+        log.info(f"Theme changed, icons now from {ICON_DIR}")
+
 
 def get_battery_icon(value: int) -> str:
     """Get the appropriate battery icon based on level."""
+    refresh_icon_dir()
     if value <= BATTERY_THRESHOLDS["critical"]:
         return str(ICON_DIR / "battery-critical.png")
     return str(ICON_DIR / "battery-low.png")
 
 
-def send_notification(status: str, capacity: int) -> None:
+def format_remaining(seconds: int) -> str:
+    """Format a time-to-empty estimate, or an empty string if unknown."""
+    if seconds <= 0:
+        return ""
+    hours, remainder = divmod(seconds, 3600)
+    return f" ({hours}h {remainder // 60:02d}m left)"
+
+
+def send_notification(status: str, capacity: int, time_to_empty: int = 0) -> None:
     """Send battery notification based on status and capacity."""
     global notified
 
+    remaining = format_remaining(time_to_empty)
     if status == "Discharging":
         if capacity <= BATTERY_THRESHOLDS["critical"] and "critical" not in notified:
             log.warning(f"Battery critical: {capacity}%")
             notify(
                 get_battery_icon(capacity),
-                f"Battery Critical! {capacity}%. Plug in charger now!",
+                f"Battery Critical! {capacity}%{remaining}. Plug in charger now!",
                 level="critical"
             )
             notified.add("critical")
@@ -79,7 +201,7 @@ def send_notification(status: str, capacity: int) -> None:
             log.info(f"Battery low: {capacity}%")
             notify(
                 get_battery_icon(capacity),
-                f"Battery Low! {capacity}%. Consider plugging in the charger.",
+                f"Battery Low! {capacity}%{remaining}. Consider plugging in the charger.",
                 level="normal"
             )
             notified.add("low")
@@ -91,10 +213,28 @@ def send_notification(status: str, capacity: int) -> None:
 
 
 def main() -> None:
-    """Main loop: watch battery and send notifications."""
+    """Main loop: watch battery, publish the shared snapshot and send notifications."""
+    global theme_watcher
+
     log.info("Battery monitor started")
-    for status, capacity in watch_battery():
-        send_notification(status, capacity)
+    try:
+        theme_watcher = ThemeWatcher()
+    except OSError as e:
+        log.warning(f"Theme watch unavailable: {e}")
+
+    writer = SnapshotWriter()
+    delay = RECONNECT_MIN
+    while True:
+        try:
+            for snapshot in watch_battery():
+                delay = RECONNECT_MIN
+                writer.publish(snapshot)
+                send_notification(snapshot.status, snapshot.capacity, snapshot.time_to_empty)
+        except (DBusError, OSError) as e:
+            # UPower or the bus restarted: subscribe again once it is back
+            log.warning(f"UPower unavailable ({e}), retrying in {delay:.0f}s")
+        time.sleep(delay)
+        delay = min(delay * 2, RECONNECT_MAX)
 
 
 if __name__ == "__main__":
@@ -1,32 +1,167 @@
 """
 Screen brightness control module.
-Provides functions for adjusting brightness and sending notifications.
+Drives the laptop backlight through sysfs and external monitors over DDC/CI.
 """
 
 import argparse
+import json
+import os
+import threading
+import time
 from pathlib import Path
 
-from Utils import notify_with_progress, get_logger, run_capture, run_silent, get_theme_dir
+from Utils import (
+    notify, notify_with_progress, get_logger, get_theme_dir, get_runtime_dir, runtime_lock,
+    load_worker_state, save_worker_state, worker_alive, read_file, write_atomic,
+    get_monitors, run_capture, run_silent, SYSFS_ROOT
+)
 
 log = get_logger("Brightness")
 
 
 DEFAULT_STEP: int = 10
+MIN_PERCENT: int = 1  # Avoid a fully dark panel
+MAX_PERCENT: int = 100
 
 ICON_DIR: Path = get_theme_dir() / "Swaync/Icons"
 
+BACKLIGHT_DIR: Path = SYSFS_ROOT / "class/backlight"
+# Preferred interface types, as ranked by the kernel documentation
+BACKLIGHT_TYPES: tuple[str, ...] = ("firmware", "platform", "raw")
+
+# Percentages are perceptual: raw = max * (percent / 100) ** EXPONENT
+PERCEPTUAL_EXPONENT: float = 2.0
+
+# Animated transitions
+BRIGHTNESS_STATE: str = "brightness"
+RAMP_IDLE: dict = {"target": None, "worker": 0}
+DEVICE_CACHE: str = "backlight.json"
+RAMP_DURATION: float = 0.15  # Seconds per transition
+FRAME_INTERVAL: float = 1 / 60
+
+LOGIND_BUS: str = "org.freedesktop.login1"
+LOGIND_SESSION: str = "/org/freedesktop/login1/session/auto"
+LOGIND_SESSION_IFACE: str = "org.freedesktop.login1.Session"
+
+# DDC/CI external monitors
+DDCUTIL: str = os.environ.get("HYPR_DDCUTIL", "ddcutil")
+DDC_BUS_CACHE: Path = Path.home() / ".cache/hypr/ddc-buses.json"
+DDC_BRIGHTNESS_VCP: str = "10"
+DDC_WRITE_INTERVAL: float = 0.25  # i2c is slow; never write more often than this
+DDC_CACHE_TTL: float = 5.0  # Seconds the last known value is trusted over getvcp
+INTERNAL_PREFIXES: tuple[str, ...] = ("eDP", "LVDS", "DSI")
+
+
+class Backlight:
+    """A sysfs backlight device with a cached maximum."""
+
+    def __init__(self, name: str, max_brightness: int) -> None:
+        self.name = name
+        self.max = max_brightness
+        self.path = BACKLIGHT_DIR / name
+        self._bus = None
+
+    def read(self) -> int:
+        """Current raw brightness."""
+        return int(read_file(self.path / "brightness"))
+
+    def write(self, raw: int) -> bool:
+        """Set raw brightness, going through logind when sysfs is not writable."""
+        raw = max(0, min(raw, self.max))
+        try:
+            with open(self.path / "brightness", "w") as f:
+                f.write(str(raw))
+            return True
+        except PermissionError:
+            pass
+        except OSError as e:
+            log.error(f"Could not write {self.path / 'brightness'}: {e}")
+            notify("dialog-error", f"Brightness: could not write {self.name}")
+            return False
+
+        from DBus import Connection, DBusError
+
+        try:
+            if self._bus is None:
+                self._bus = Connection.system()
+            self._bus.call(
+                LOGIND_BUS, LOGIND_SESSION, LOGIND_SESSION_IFACE,
+                "SetBrightness", "ssu", "backlight", self.name, raw
+            )
+            return True
+        except (DBusError, OSError) as e:
+            log.error(f"logind SetBrightness failed for {self.name}: {e}")
+            notify("dialog-error", f"Brightness: logind refused {self.name}")
+            if self._bus is not None:
+                self._bus.close()
+                self._bus = None
+            return False
+
+    def get_percent(self) -> float:
+        """Current brightness on the perceptual scale."""
+        return to_percent(self.read(), self.max)
+
+
+def to_percent(raw: int, max_brightness: int) -> float:
+    """Convert a raw value to a perceptual percentage."""
+    if max_brightness <= 0:
+        return 0.0
+    return 100 * (raw / max_brightness) ** (1 / PERCEPTUAL_EXPONENT)
+
+
+def to_raw(percent: float, max_brightness: int) -> int:
+    """Convert a perceptual percentage to a raw value, never below 1 so the panel stays lit."""
+    return max(1, round(max_brightness * (percent / 100) ** PERCEPTUAL_EXPONENT))
+
+
+def discover_backlight() -> Backlight | None:
+    """Pick the preferred backlight device under sysfs."""
+    best = None
+    for device in sorted(BACKLIGHT_DIR.glob("*")):
+        try:
+            kind = read_file(device / "type").strip()
+            max_brightness = int(read_file(device / "max_brightness"))
+        except (OSError, ValueError):
+            continue
+        rank = BACKLIGHT_TYPES.index(kind) if kind in BACKLIGHT_TYPES else len(BACKLIGHT_TYPES)
+        if best is None or rank < best[0]:
+            best = (rank, device.name, max_brightness)
+
+    if best is None:
+        return None
+    return Backlight(best[1], best[2])
+
+
+def get_backlight() -> Backlight | None:
+    """
+    Get the backlight device, discovering it once per session.
+    The device name and max_brightness are cached in the runtime directory.
+    """
+    cache = get_runtime_dir() / DEVICE_CACHE
+    try:
+        data = json.loads(cache.read_text())
+        if data.get("root") == str(BACKLIGHT_DIR) and (BACKLIGHT_DIR / data["name"]).exists():
+            return Backlight(data["name"], data["max"])
+    except (OSError, ValueError, KeyError):
+        pass
+
+    backlight = discover_backlight()
+    if backlight is not None:
+        write_atomic(cache, json.dumps({
+            "root": str(BACKLIGHT_DIR), "name": backlight.name, "max": backlight.max
+        }))
+    return backlight
+
 
 def get_brightness_percentage() -> int:
     """Get current screen brightness as a percentage."""
-    stdout, _, _ = run_capture(["brightnessctl", "-m"])
-    try:
-        # Output format: device,class,current,max%,current
-        # The percentage is at index 3 (e.g., "100%")
-        parts = stdout.split(",")
-        percentage_str = parts[3].rstrip("%")
-        return int(percentage_str)
-    except (IndexError, ValueError):
+    backlight = get_backlight()
+    if backlight is None:
         return 50  # Default fallback
+    try:
+        return round(backlight.get_percent())
+    except (OSError, ValueError):
+        return 50
 
 
 def get_brightness_icon(value: int) -> str:
@@ -38,16 +173,308 @@ def get_brightness_icon(value: int) -> str:
     return str(ICON_DIR / "brightness-high.png")
 
 
-def adjust_brightness(step: int, action: str = "up") -> None:
-    """Adjust screen brightness by the specified step amount."""
-    old_value = get_brightness_percentage()
-    adjustment = f"{step}%+" if action == "up" else f"{step}%-"
-    run_silent(["brightnessctl", "s", adjustment])
+def clamp_percent(value: float) -> int:
+    return max(MIN_PERCENT, min(round(value), MAX_PERCENT))
+
+
+def notify_level(value: int, label: str = "Brightness Level") -> None:
+    icon = get_brightness_icon(value)
+    notify_with_progress(icon, f"{label}: {value}%", value, level="critical")
+
+
+def adjust_backlight(backlight: Backlight, delta: int, notify: bool = True) -> None:
+    """
+    Move the backlight target by delta percent.
+    A ramp that is already running is retargeted; otherwise this process
+    runs the ramp itself.
+    """
+    with runtime_lock(BRIGHTNESS_STATE):
+        state = load_worker_state(BRIGHTNESS_STATE, RAMP_IDLE)
+        if worker_alive(state.get("worker", 0)) and state.get("target") is not None:
+            state["target"] = clamp_percent(state["target"] + delta)
+            save_worker_state(BRIGHTNESS_STATE, state)
+            if notify:
+                notify_level(state["target"])
+            return
+
+        current = backlight.get_percent()
+        state = {"target": clamp_percent(current + delta), "worker": os.getpid()}
+        save_worker_state(BRIGHTNESS_STATE, state)
+
+    log.debug(f"Backlight: {current:.0f}% -> {state['target']}%")
+    if notify:
+        notify_level(state["target"])
+    run_ramp(backlight, current, state["target"])
+
+
+def run_ramp(backlight: Backlight, start: float, target: int) -> None:
+    """Animate towards the target, restarting from the current level when it moves."""
+    position = start
+    ramp_from, ramp_start = start, time.monotonic()
+    last_raw = None
+
+    while True:
+        progress = min((time.monotonic() - ramp_start) / RAMP_DURATION, 1.0)
+        position = ramp_from + (target - ramp_from) * progress
+        raw = to_raw(position, backlight.max)
+        failed = raw != last_raw and not backlight.write(raw)
+        last_raw = raw
+
+        with runtime_lock(BRIGHTNESS_STATE):
+            state = load_worker_state(BRIGHTNESS_STATE, RAMP_IDLE)
+            if failed:
+                # Already reported; give up rather than failing every frame
+                state["worker"] = 0
+                save_worker_state(BRIGHTNESS_STATE, state)
+                return
+            if state.get("target") != target:
+                target = state["target"]
+                ramp_from, ramp_start = position, time.monotonic()
+            elif progress >= 1.0:
+                # Release the ramp under the lock so a retarget is never missed
+                state["worker"] = 0
+                save_worker_state(BRIGHTNESS_STATE, state)
+                return
+
+        time.sleep(FRAME_INTERVAL)
+
 
-    new_value = get_brightness_percentage()
-    log.debug(f"Brightness {action}: {old_value}% -> {new_value}%")
-    icon = get_brightness_icon(new_value)
-    notify_with_progress(icon, f"Brightness Level: {new_value}%", new_value, level="critical")
+# =============================================================================
+# DDC/CI
+# =============================================================================
+
+class DDCMonitor:
+    """An external monitor reachable over DDC/CI on a known i2c bus."""
+
+    def __init__(self, name: str, bus: int) -> None:
+        self.name = name
+        self.bus = bus
+        self.state_name = f"ddc-{bus}"
+
+    def read(self) -> tuple[int, int] | None:
+        """Current and maximum brightness, or None if the monitor did not answer."""
+        try:
+            stdout, _, code = run_capture(
+                [DDCUTIL, "--bus", str(self.bus), "--brief", "getvcp", DDC_BRIGHTNESS_VCP]
+            )
+        except OSError as e:
+            log.warning(f"Could not run {DDCUTIL}: {e}")
+            return None
+        # Output format: VCP 10 C <current> <max>
+        parts = stdout.split()
+        if code != 0 or len(parts) < 5:
+            return None
+        try:
+            return int(parts[3]), int(parts[4])
+        except ValueError:
+            return None
+
+    def write(self, value: int) -> bool:
+        try:
+            return run_silent(
+                [DDCUTIL, "--bus", str(self.bus), "--noverify", "setvcp", DDC_BRIGHTNESS_VCP, str(value)]
+            ) == 0
+        except OSError as e:
+            log.warning(f"Could not run {DDCUTIL}: {e}")
+            return False
+
+
+def parse_ddc_detect(output: str) -> list[tuple[int, str, str]]:
+    """
+    Parse `ddcutil detect --terse` output.
+
+    Returns:
+        (bus, model, serial) for each valid display
+    """
+    displays = []
+    valid, bus = False, None
+    for line in output.splitlines():
+        if line and not line[0].isspace():
+            valid, bus = line.startswith("Display"), None
+            continue
+        key, _, value = line.strip().partition(":")
+        value = value.strip()
+        if key == "I2C bus" and value.startswith("/dev/i2c-"):
+            bus = int(value.removeprefix("/dev/i2c-"))
+        elif key == "Monitor" and valid and bus is not None:
+            # Monitor: MFG:MODEL:SERIAL
+            _, model, serial = (value.split(":") + ["", ""])[:3]
+            displays.append((bus, model.strip(), serial.strip()))
+    return displays
+
+
+def detect_ddc_buses(monitors: list[dict]) -> dict[str, dict]:
+    """
+    Run the (slow) ddcutil detection and match displays to Hyprland outputs.
+    Outputs without DDC/CI are recorded with bus None so they are not probed again;
+    without ddcutil every output is, and brightness falls back to the backlight.
+    """
+    try:
+        stdout, stderr, code = run_capture([DDCUTIL, "detect", "--terse"])
+    except OSError as e:
+        log.warning(f"Could not run {DDCUTIL}: {e}")
+        stdout, stderr, code = "", "", 0
+    if code != 0:
+        log.warning(f"ddcutil detect failed: {stderr}")
+    displays = parse_ddc_detect(stdout)
+
+    mapping = {}
+    for monitor in monitors:
+        bus = None
+        for ddc_bus, model, serial in displays:
+            if model == monitor.get("model") and serial in ("", monitor.get("serial", "")):
+                bus = ddc_bus
+                break
+        mapping[monitor["name"]] = {"description": monitor.get("description", ""), "bus": bus}
+    log.info(f"DDC bus map: {mapping}")
+    return mapping
+
+
+def get_ddc_monitors(monitors: list[dict]) -> dict[str, DDCMonitor]:
+    """
+    Map external Hyprland outputs to DDC monitors.
+    The bus map is persisted and only re-detected when an unknown output appears.
+    """
+    external = [m for m in monitors if not m["name"].startswith(INTERNAL_PREFIXES)]
+    try:
+        mapping = json.loads(DDC_BUS_CACHE.read_text())
+    except (OSError, ValueError):
+        mapping = {}
+
+    known = all(
+        mapping.get(m["name"], {}).get("description") == m.get("description", "")
+        for m in external
+    )
+    if not known:
+        mapping = detect_ddc_buses(external)
+        DDC_BUS_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(DDC_BUS_CACHE, json.dumps(mapping))
+
+    return {
+        name: DDCMonitor(name, entry["bus"])
+        for name, entry in mapping.items()
+        if entry.get("bus") is not None and any(m["name"] == name for m in external)
+    }
+
+
+def forget_ddc_buses() -> None:
+    """Drop the persisted bus map so the next adjustment re-detects."""
+    DDC_BUS_CACHE.unlink(missing_ok=True)
+
+
+def adjust_ddc(monitor: DDCMonitor, delta: int, notify: bool = True) -> None:
+    """
+    Move a monitor's brightness target by delta percent.
+    Concurrent key repeats only update the shared target; one writer applies
+    it at most every DDC_WRITE_INTERVAL and skips values already written.
+    Once idle for DDC_CACHE_TTL the monitor is read again, picking up
+    changes made with its own buttons.
+    """
+    with runtime_lock(monitor.state_name):
+        state = load_worker_state(monitor.state_name, {})
+        busy = worker_alive(state.get("worker", 0))
+        stale = time.time() - state.get("synced", 0) > DDC_CACHE_TTL
+
+        if state.get("written") is None or (stale and not busy):
+            reading = monitor.read()
+            if reading is None:
+                log.warning(f"{monitor.name} did not answer on i2c-{monitor.bus}")
+                forget_ddc_buses()
+                return
+            state["written"], state["max"] = reading
+            state["target"] = state["written"]
+            state["synced"] = time.time()
+
+        scale = state["max"] / 100
+        target_percent = clamp_percent(state["target"] / scale + delta)
+        state["target"] = round(target_percent * scale)
+        if notify:
+            notify_level(target_percent, f"{monitor.name} Brightness")
+
+        if busy:
+            save_worker_state(monitor.state_name, state)
+            return
+        state["worker"] = os.getpid()
+        save_worker_state(monitor.state_name, state)
+
+    while True:
+        with runtime_lock(monitor.state_name):
+            state = load_worker_state(monitor.state_name, {})
+            target = state["target"]
+            if target == state["written"]:
+                state["worker"] = 0
+                save_worker_state(monitor.state_name, state)
+                return
+
+        ok = monitor.write(target)
+        with runtime_lock(monitor.state_name):
+            state = load_worker_state(monitor.state_name, {})
+            if ok:
+                state["written"] = target
+                state["synced"] = time.time()
+            else:
+                # Unknown state: re-read on the next keypress
+                log.warning(f"setvcp failed on {monitor.name}")
+                state["written"] = state["target"] = None
+                state["worker"] = 0
+            save_worker_state(monitor.state_name, state)
+            if not ok:
+                return
+
+        time.sleep(DDC_WRITE_INTERVAL)
+
+
+# =============================================================================
+# Output selection
+# =============================================================================
+
+def adjust_brightness(
+    step: int,
+    action: str = "up",
+    output: str | None = None,
+    all_outputs: bool = False
+) -> None:
+    """
+    Adjust brightness on the focused output, a named output, or all of them.
+    The laptop panel goes through sysfs, external monitors through DDC/CI.
+    """
+    delta = step if action == "up" else -step
+    try:
+        monitors = get_monitors() or []
+    except Exception:
+        monitors = []
+
+    if not all_outputs:
+        if output is None:
+            output = next((m["name"] for m in monitors if m.get("focused")), None)
+        if output is not None and not output.startswith(INTERNAL_PREFIXES):
+            ddc = get_ddc_monitors(monitors).get(output)
+            if ddc is not None:
+                adjust_ddc(ddc, delta)
+                return
+        backlight = get_backlight()
+        if backlight is None:
+            log.warning(f"No backlight device under {BACKLIGHT_DIR}")
+            return
+        adjust_backlight(backlight, delta)
+        return
+
+    # Every output in parallel; only the first one drives the notification
+    jobs = []
+    backlight = get_backlight()
+    if backlight is not None:
+        jobs.append((adjust_backlight, backlight))
+    for ddc in get_ddc_monitors(monitors).values():
+        jobs.append((adjust_ddc, ddc))
+
+    threads = [
+        threading.Thread(target=func, args=(device, delta, index == 0))
+        for index, (func, device) in enumerate(jobs)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
 
 
 def main() -> None:
@@ -64,15 +491,25 @@ def main() -> None:
         default=DEFAULT_STEP,
         help="Brightness adjustment step (default: 10)"
     )
+    parser.add_argument("--monitor", type=str, help="Output to adjust (default: focused)")
+    parser.add_argument("--all", action="store_true", help="Adjust every output in parallel")
+    parser.add_argument(
+        "--redetect",
+        action="store_true",
+        help="Forget the cached DDC/CI bus map before adjusting"
+    )
 
     args = parser.parse_args()
 
+    if args.redetect:
+        forget_ddc_buses()
+
     match args.action:
         case "up":
-            adjust_brightness(args.step, "up")
+            adjust_brightness(args.step, "up", args.monitor, args.all)
         case "down":
-            adjust_brightness(args.step, "down")
+            adjust_brightness(args.step, "down", args.monitor, args.all)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,188 @@
+"""
+Background connectivity prober.
+Probes an HTTP 204 endpoint off the UI path and publishes the last known state to the runtime dir.
+"""
+
+import argparse
+import json
+import os
+import select
+import sys
+import time
+
+from Utils import get_logger, get_runtime_dir, write_atomic
+
+log = get_logger("Connectivity")
+
+
+CHECK_HOST: str = "connectivitycheck.gstatic.com"
+CHECK_PATH: str = "/generate_204"
+PROBE_TIMEOUT: float = 5.0
+
+STATE_FILE: str = "connectivity.json"
+
+# Probe scheduling (seconds)
+ONLINE_INTERVAL: float = 60.0
+RETRY_MIN: float = 2.0
+RETRY_MAX: float = 60.0
+ROUTE_SETTLE: float = 1.0  # Let addresses and DNS settle after a route change
+
+# Same codes curl reports for %{http_code}
+CODE_OFFLINE: int = 0
+CODE_ONLINE: int = 204
+
+
+def probe(timeout: float = PROBE_TIMEOUT) -> int:
+    """
+    Request the 204 endpoint once.
+
+    Returns:
+        HTTP status code, or 0 if no connection could be made
+    """
+    import http.client
+
+    conn = http.client.HTTPConnection(CHECK_HOST, 80, timeout=timeout)
+    try:
+        conn.request("GET", CHECK_PATH, headers={"Connection": "close"})
+        return conn.getresponse().status
+    except (OSError, http.client.HTTPException):
+        return CODE_OFFLINE
+    finally:
+        conn.close()
+
+
+def state_name(code: int) -> str:
+    if code == CODE_ONLINE:
+        return "online"
+    if code == CODE_OFFLINE:
+        return "offline"
+    return "portal"
+
+
+def publish(code: int, iface: str | None, previous: dict | None, pid: int | None = None) -> dict:
+    """
+    Write the probe result with its timestamp, keeping the time of the last change.
+
+    Args:
+        code: Probe status code
+        iface: Interface holding the default route
+        previous: Last published state
+        pid: Prober the state belongs to (default: this process)
+    """
+    now = time.time()
+    state = {
+        "state": state_name(code),
+        "code": code,
+        "iface": iface,
+        "checked": now,
+        "changed": now,
+        "pid": pid or os.getpid(),
+    }
+    if previous and previous.get("state") == state["state"] and previous.get("iface") == iface:
+        state["changed"] = previous["changed"]
+    else:
+        log.info(f"Connectivity: {state['state']} via {iface or 'no route'} ({code})")
+    write_atomic(get_runtime_dir() / STATE_FILE, json.dumps(state))
+    return state
+
+
+def read_state() -> dict | None:
+    """
+    Read the last published state.
+
+    Returns:
+        State dict, or None if no prober is running
+    """
+    try:
+        state = json.loads((get_runtime_dir() / STATE_FILE).read_text())
+        os.kill(state["pid"], 0)
+    except (OSError, ValueError, KeyError):
+        return None
+    return state
+
+
+def is_online() -> bool:
+    """
+    Cached connectivity for UI code; never blocks on the network.
+    Without a running prober, a default route is taken as connectivity.
+    """
+    state = read_state()
+    return state is None or state["state"] == "online"
+
+
+def watch() -> None:
+    """Probe forever: re-probe on route changes, back off while offline."""
+    from Netlink import LinkWatcher
+
+    watcher = LinkWatcher()
+    state = None
+    retry = RETRY_MIN
+    log.info("Connectivity prober started")
+
+    while True:
+        link = watcher.table.default_interface()
+        if link is None:
+            # Nothing to probe until a route appears
+            state = publish(CODE_OFFLINE, None, state)
+            timeout = None
+        else:
+            state = publish(probe(), link.name, state)
+            if state["state"] == "online":
+                timeout, retry = ONLINE_INTERVAL, RETRY_MIN
+            else:
+                timeout, retry = retry, min(retry * 2, RETRY_MAX)
+
+        ready, _, _ = select.select([watcher], [], [], timeout)
+        if ready and watcher.update():
+            retry = RETRY_MIN
+            time.sleep(ROUTE_SETTLE)
+            watcher.update()
+
+
+def check(max_age: float) -> int:
+    """Return the cached probe code if fresh enough, otherwise probe now."""
+    state = read_state()
+    if state is not None and time.time() - state["checked"] <= max_age:
+        return state["code"]
+
+    code = probe()
+    if state is not None:
+        # Share the fresh result with the running prober's readers; the state
+        # stays owned by the prober so it outlives this process
+        publish(code, state.get("iface"), state, state["pid"])
+    return code
+
+
+def main() -> None:
+    """Parse arguments and execute the requested connectivity action."""
+    parser = argparse.ArgumentParser(description="Connectivity prober")
+    parser.add_argument(
+        "action",
+        choices=["watch", "status", "check"],
+        help="watch: run the prober, status: print cached state, check: print the 204 probe code"
+    )
+    parser.add_argument(
+        "--max-age",
+        type=float,
+        default=5.0,
+        help="Seconds a cached result stays valid for check (default: 5)"
+    )
+
+    args = parser.parse_args()
+
+    match args.action:
+        case "watch":
+            try:
+                watch()
+            except KeyboardInterrupt:
+                pass
+        case "status":
+            state = read_state()
+            print(json.dumps(state) if state else "no prober running")
+            sys.exit(0 if state else 1)
+        case "check":
+            print(f"{check(args.max_age):03d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,581 @@
+"""
+Minimal D-Bus client speaking the wire protocol over a Unix socket.
+Supports method calls, signal subscriptions and unix fd passing without external libraries.
+"""
+
+import array
+import os
+import select
+import socket
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+
+# Message types
+METHOD_CALL: int = 1
+METHOD_RETURN: int = 2
+ERROR: int = 3
+SIGNAL: int = 4
+
+# Message flags
+NO_REPLY_EXPECTED: int = 0x1
+
+# Header field codes
+FIELD_PATH: int = 1
+FIELD_INTERFACE: int = 2
+FIELD_MEMBER: int = 3
+FIELD_ERROR_NAME: int = 4
+FIELD_REPLY_SERIAL: int = 5
+FIELD_DESTINATION: int = 6
+FIELD_SENDER: int = 7
+FIELD_SIGNATURE: int = 8
+FIELD_UNIX_FDS: int = 9
+
+HEADER_FIELD_TYPES: dict[int, str] = {
+    FIELD_PATH: "o",
+    FIELD_INTERFACE: "s",
+    FIELD_MEMBER: "s",
+    FIELD_ERROR_NAME: "s",
+    FIELD_REPLY_SERIAL: "u",
+    FIELD_DESTINATION: "s",
+    FIELD_SENDER: "s",
+    FIELD_SIGNATURE: "g",
+    FIELD_UNIX_FDS: "u",
+}
+
+BUS_NAME: str = "org.freedesktop.DBus"
+BUS_PATH: str = "/org/freedesktop/DBus"
+SYSTEM_BUS_DEFAULT: str = "unix:path=/run/dbus/system_bus_socket"
+
+DEFAULT_TIMEOUT: float = 5.0
+RECV_SIZE: int = 65536
+MAX_FDS: int = 16
+
+# Fixed-size types: struct format and alignment
+FIXED_TYPES: dict[str, tuple[str, int]] = {
+    "y": ("B", 1),
+    "b": ("I", 4),
+    "n": ("h", 2),
+    "q": ("H", 2),
+    "i": ("i", 4),
+    "u": ("I", 4),
+    "x": ("q", 8),
+    "t": ("Q", 8),
+    "d": ("d", 8),
+    "h": ("I", 4),
+}
+
+ALIGNMENT: dict[str, int] = {
+    **{code: align for code, (_, align) in FIXED_TYPES.items()},
+    "s": 4, "o": 4, "g": 1, "a": 4, "(": 8, "{": 8, "v": 1,
+}
+
+
+class DBusError(Exception):
+    """Raised when a call returns an error or the bus cannot be reached."""
+
+    def __init__(self, name: str, message: str = "") -> None:
+        super().__init__(f"{name}: {message}" if message else name)
+        self.name = name
+
+
+@dataclass
+class Variant:
+    """A value tagged with its D-Bus signature, used for 'v' arguments."""
+    signature: str
+    value: Any
+
+
+@dataclass
+class Message:
+    """A decoded D-Bus message."""
+    type: int
+    serial: int
+    flags: int = 0
+    path: str | None = None
+    interface: str | None = None
+    member: str | None = None
+    error_name: str | None = None
+    reply_serial: int | None = None
+    destination: str | None = None
+    sender: str | None = None
+    signature: str = ""
+    body: list[Any] = field(default_factory=list)
+    fds: list[int] = field(default_factory=list)
+
+
+# =============================================================================
+# Marshalling
+# =============================================================================
+
+def split_signature(signature: str) -> list[str]:
+    """Split a signature into its complete types, e.g. "sa{sv}i" -> ["s", "a{sv}", "i"]."""
+    types = []
+    i = 0
+    while i < len(signature):
+        end = _type_end(signature, i)
+        types.append(signature[i:end])
+        i = end
+    return types
+
+
+def _type_end(signature: str, start: int) -> int:
+    """Return the index just past the complete type starting at start."""
+    code = signature[start]
+    if code == "a":
+        return _type_end(signature, start + 1)
+    if code in "({":
+        closing = ")" if code == "(" else "}"
+        i = start + 1
+        while signature[i] != closing:
+            i = _type_end(signature, i)
+        return i + 1
+    return start + 1
+
+
+def _guess_signature(value: Any) -> str:
+    """Pick a signature for a bare Python value placed inside a variant."""
+    if isinstance(value, bool):
+        return "b"
+    if isinstance(value, int):
+        return "i"
+    if isinstance(value, float):
+        return "d"
+    if isinstance(value, str):
+        return "s"
+    if isinstance(value, bytes):
+        return "ay"
+    raise TypeError(f"Cannot infer D-Bus signature for {type(value).__name__}")
+
+
+class _Writer:
+    """Serializes values into little-endian wire format."""
+
+    def __init__(self) -> None:
+        self.buf = bytearray()
+
+    def align(self, n: int) -> None:
+        self.buf.extend(b"\0" * (-len(self.buf) % n))
+
+    def write(self, sig: str, value: Any) -> None:
+        code = sig[0]
+
+        if code in FIXED_TYPES:
+            fmt, align = FIXED_TYPES[code]
+            self.align(align)
+            self.buf.extend(struct.pack("<" + fmt, int(value) if code == "b" else value))
+        elif code in "so":
+            data = value.encode("utf-8")
+            self.align(4)
+            self.buf.extend(struct.pack("<I", len(data)) + data + b"\0")
+        elif code == "g":
+            data = value.encode("ascii")
+            self.buf.extend(struct.pack("<B", len(data)) + data + b"\0")
+        elif code == "v":
+            if not isinstance(value, Variant):
+                value = Variant(_guess_signature(value), value)
+            self.write("g", value.signature)
+            self.write(value.signature, value.value)
+        elif code == "a":
+            self.align(4)
+            length_pos = len(self.buf)
+            self.buf.extend(b"\0\0\0\0")
+            element = sig[1:]
+            self.align(ALIGNMENT[element[0]])
+            start = len(self.buf)
+            if element[0] == "{":
+                key_sig, value_sig = split_signature(element[1:-1])
+                for key, item in value.items():
+                    self.align(8)
+                    self.write(key_sig, key)
+                    self.write(value_sig, item)
+            elif element == "y":
+                self.buf.extend(bytes(value))
+            else:
+                for item in value:
+                    self.write(element, item)
+            struct.pack_into("<I", self.buf, length_pos, len(self.buf) - start)
+        elif code == "(":
+            self.align(8)
+            for member_sig, item in zip(split_signature(sig[1:-1]), value):
+                self.write(member_sig, item)
+        else:
+            raise TypeError(f"Unsupported D-Bus type code {code!r}")
+
+
+class _Reader:
+    """Deserializes values from wire format."""
+
+    def __init__(self, data: bytes, endian: str = "<", offset: int = 0) -> None:
+        self.data = data
+        self.endian = endian
+        self.pos = offset
+
+    def align(self, n: int) -> None:
+        self.pos += -self.pos % n
+
+    def read(self, sig: str) -> Any:
+        code = sig[0]
+
+        if code in FIXED_TYPES:
+            fmt, align = FIXED_TYPES[code]
+            self.align(align)
+            (value,) = struct.unpack_from(self.endian + fmt, self.data, self.pos)
+            self.pos += struct.calcsize(fmt)
+            return bool(value) if code == "b" else value
+        if code in "so":
+            length = self.read("u")
+            value = self.data[self.pos:self.pos + length].decode("utf-8", errors="replace")
+            self.pos += length + 1
+            return value
+        if code == "g":
+            length = self.data[self.pos]
+            value = self.data[self.pos + 1:self.pos + 1 + length].decode("ascii")
+            self.pos += length + 2
+            return value
+        if code == "v":
+            return self.read(self.read("g"))
+        if code == "a":
+            length = self.read("u")
+            element = sig[1:]
+            self.align(ALIGNMENT[element[0]])
+            end = self.pos + length
+            if element == "y":
+                value = bytes(self.data[self.pos:end])
+                self.pos = end
+                return value
+            if element[0] == "{":
+                key_sig, value_sig = split_signature(element[1:-1])
+                result = {}
+                while self.pos < end:
+                    self.align(8)
+                    key = self.read(key_sig)
+                    result[key] = self.read(value_sig)
+                return result
+            items = []
+            while self.pos < end:
+                items.append(self.read(element))
+            return items
+        if code == "(":
+            self.align(8)
+            return tuple(self.read(member) for member in split_signature(sig[1:-1]))
+        raise TypeError(f"Unsupported D-Bus type code {code!r}")
+
+
+def encode_message(msg: Message) -> bytes:
+    """Serialize a message (header and body) for sending."""
+    body = _Writer()
+    for sig, value in zip(split_signature(msg.signature), msg.body):
+        body.write(sig, value)
+
+    fields = []
+    for code, value in (
+        (FIELD_PATH, msg.path),
+        (FIELD_INTERFACE, msg.interface),
+        (FIELD_MEMBER, msg.member),
+        (FIELD_ERROR_NAME, msg.error_name),
+        (FIELD_REPLY_SERIAL, msg.reply_serial),
+        (FIELD_DESTINATION, msg.destination),
+        (FIELD_SIGNATURE, msg.signature or None),
+        (FIELD_UNIX_FDS, len(msg.fds) or None),
+    ):
+        if value is not None:
+            fields.append((code, Variant(HEADER_FIELD_TYPES[code], value)))
+
+    header = _Writer()
+    header.buf.extend(struct.pack("<cBBBII", b"l", msg.type, msg.flags, 1, len(body.buf), msg.serial))
+    header.write("a(yv)", fields)
+    header.align(8)
+    return bytes(header.buf + body.buf)
+
+
+def decode_message(data: bytes, fds: list[int] | None = None) -> Message:
+    """Parse a complete message produced by message_length()."""
+    endian = "<" if data[0:1] == b"l" else ">"
+    msg_type, flags, _, body_len, serial = struct.unpack_from(endian + "BBBII", data, 1)
+
+    header = _Reader(data, endian, 12)
+    fields = dict(header.read("a(yv)"))
+    header.align(8)
+
+    msg = Message(
+        type=msg_type,
+        serial=serial,
+        flags=flags,
+        path=fields.get(FIELD_PATH),
+        interface=fields.get(FIELD_INTERFACE),
+        member=fields.get(FIELD_MEMBER),
+        error_name=fields.get(FIELD_ERROR_NAME),
+        reply_serial=fields.get(FIELD_REPLY_SERIAL),
+        destination=fields.get(FIELD_DESTINATION),
+        sender=fields.get(FIELD_SENDER),
+        signature=fields.get(FIELD_SIGNATURE, ""),
+    )
+
+    body = _Reader(data[header.pos:header.pos + body_len], endian)
+    msg.body = [body.read(sig) for sig in split_signature(msg.signature)]
+
+    if fds and FIELD_UNIX_FDS in fields:
+        msg.fds = fds[:fields[FIELD_UNIX_FDS]]
+        del fds[:fields[FIELD_UNIX_FDS]]
+    return msg
+
+
+def message_length(data: bytes) -> int | None:
+    """Return the total length of the message at the start of data, if known yet."""
+    if len(data) < 16:
+        return None
+    endian = "<" if data[0:1] == b"l" else ">"
+    body_len, _, fields_len = struct.unpack_from(endian + "III", data, 4)
+    header_len = 16 + fields_len
+    return header_len + (-header_len % 8) + body_len
+
+
+# =============================================================================
+# Connection
+# =============================================================================
+
+def _parse_address(address: str) -> str | bytes:
+    """Turn the first usable unix transport of a bus address into a socket path."""
+    for entry in address.split(";"):
+        transport, _, params = entry.partition(":")
+        if transport != "unix":
+            continue
+        options = dict(p.split("=", 1) for p in params.split(",") if "=" in p)
+        if "path" in options:
+            return options["path"]
+        if "abstract" in options:
+            return b"\0" + options["abstract"].encode()
+    raise DBusError("org.freedesktop.DBus.Error.BadAddress", address)
+
+
+class Connection:
+    """A blocking connection to a message bus."""
+
+    def __init__(self, address: str, unix_fds: bool = False) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(DEFAULT_TIMEOUT)
+        try:
+            self.sock.connect(_parse_address(address))
+            self._authenticate(unix_fds)
+        except OSError as e:
+            self.sock.close()
+            raise DBusError("org.freedesktop.DBus.Error.NoServer", str(e)) from e
+        except DBusError:
+            self.sock.close()
+            raise
+
+        self._serial = 0
+        self._buf = b""
+        self._fds: list[int] = []
+        self._queue: list[Message] = []
+        try:
+            self.unique_name: str = self.call(BUS_NAME, BUS_PATH, BUS_NAME, "Hello")[0]
+        except DBusError:
+            self.close()
+            raise
+        except OSError as e:
+            self.close()
+            raise DBusError("org.freedesktop.DBus.Error.Disconnected", str(e)) from e
+
+    @classmethod
+    def session(cls, unix_fds: bool = False) -> "Connection":
+        """Connect to the user's session bus."""
+        address = os.environ.get("DBUS_SESSION_BUS_ADDRESS")
+        if not address:
+            runtime_dir = os.environ.get("XDG_RUNTIME_DIR", f"/run/user/{os.getuid()}")
+            address = f"unix:path={runtime_dir}/bus"
+        return cls(address, unix_fds)
+
+    @classmethod
+    def system(cls, unix_fds: bool = False) -> "Connection":
+        """Connect to the system bus."""
+        return cls(os.environ.get("DBUS_SYSTEM_BUS_ADDRESS", SYSTEM_BUS_DEFAULT), unix_fds)
+
+    def _authenticate(self, unix_fds: bool) -> None:
+        """Perform SASL EXTERNAL authentication and optionally negotiate fd passing."""
+        uid = str(os.getuid()).encode().hex()
+        self.sock.sendall(b"\0AUTH EXTERNAL " + uid.encode() + b"\r\n")
+        if not self._auth_line().startswith(b"OK"):
+            raise DBusError("org.freedesktop.DBus.Error.AuthFailed")
+        if unix_fds:
+            self.sock.sendall(b"NEGOTIATE_UNIX_FD\r\n")
+            if not self._auth_line().startswith(b"AGREE_UNIX_FD"):
+                raise DBusError("org.freedesktop.DBus.Error.NotSupported", "unix fd passing")
+        self.sock.sendall(b"BEGIN\r\n")
+
+    def _auth_line(self) -> bytes:
+        line = b""
+        while not line.endswith(b"\r\n"):
+            chunk = self.sock.recv(1)
+            if not chunk:
+                raise DBusError("org.freedesktop.DBus.Error.Disconnected")
+            line += chunk
+        return line
+
+    def close(self) -> None:
+        """Close the connection and any unclaimed file descriptors."""
+        for fd in self._fds:
+            os.close(fd)
+        self._fds.clear()
+        self.sock.close()
+
+    def fileno(self) -> int:
+        return self.sock.fileno()
+
+    def send(self, msg: Message) -> int:
+        """Assign a serial, send the message and return the serial."""
+        self._serial += 1
+        msg.serial = self._serial
+        data = encode_message(msg)
+        if msg.fds:
+            self.sock.sendmsg([data], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array("i", msg.fds))])
+        else:
+            self.sock.sendall(data)
+        return msg.serial
+
+    def _read_message(self, timeout: float | None) -> Message | None:
+        """Read one message from the socket, or None on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            length = message_length(self._buf)
+            if length is not None and len(self._buf) >= length:
+                data, self._buf = self._buf[:length], self._buf[length:]
+                return decode_message(data, self._fds)
+
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            if not select.select([self.sock], [], [], remaining)[0]:
+                return None
+
+            fd_size = array.array("i").itemsize
+            data, ancdata, _, _ = self.sock.recvmsg(RECV_SIZE, socket.CMSG_SPACE(MAX_FDS * fd_size))
+            if not data:
+                raise DBusError("org.freedesktop.DBus.Error.Disconnected")
+            for level, kind, payload in ancdata:
+                if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+                    fds = array.array("i")
+                    fds.frombytes(payload[:len(payload) - len(payload) % fd_size])
+                    self._fds.extend(fds)
+            self._buf += data
+
+    def call(
+        self,
+        destination: str,
+        path: str,
+        interface: str,
+        member: str,
+        signature: str = "",
+        *args: Any,
+        fds: list[int] | None = None,
+        timeout: float | None = DEFAULT_TIMEOUT,
+        no_reply: bool = False,
+    ) -> list[Any]:
+        """
+        Call a method and wait for its reply.
+        Signals that arrive meanwhile are queued for next_signal().
+
+        Args:
+            destination: Bus name of the service
+            path: Object path
+            interface: Interface name
+            member: Method name
+            signature: Argument signature
+            *args: Argument values
+            fds: File descriptors referenced by 'h' arguments
+            timeout: Seconds to wait for the reply
+            no_reply: Send without waiting for a reply
+
+        Returns:
+            Reply body values
+
+        Raises:
+            DBusError: If the call fails or times out
+        """
+        serial = self.send(Message(
+            type=METHOD_CALL,
+            serial=0,
+            flags=NO_REPLY_EXPECTED if no_reply else 0,
+            path=path,
+            interface=interface,
+            member=member,
+            destination=destination,
+            signature=signature,
+            body=list(args),
+            fds=fds or [],
+        ))
+        if no_reply:
+            return []
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            reply = self._read_message(remaining)
+            if reply is None:
+                raise DBusError("org.freedesktop.DBus.Error.Timeout", f"{interface}.{member}")
+            if reply.reply_serial == serial:
+                if reply.type == ERROR:
+                    raise DBusError(reply.error_name or "Error", str(reply.body[0]) if reply.body else "")
+                if reply.fds:
+                    reply.body = [reply.fds[v] if s == "h" else v
+                                  for s, v in zip(split_signature(reply.signature), reply.body)]
+                return reply.body
+            if reply.type == SIGNAL:
+                self._queue.append(reply)
+
+    def add_match(self, **rule: str) -> None:
+        """Subscribe to signals matching a rule, e.g. add_match(type="signal", member="Foo")."""
+        rule.setdefault("type", "signal")
+        match = ",".join(f"{key}='{value}'" for key, value in rule.items())
+        self.call(BUS_NAME, BUS_PATH, BUS_NAME, "AddMatch", "s", match)
+
+    def next_signal(self, timeout: float | None = None) -> Message | None:
+        """Return the next received signal, or None on timeout."""
+        if self._queue:
+            return self._queue.pop(0)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            msg = self._read_message(remaining)
+            if msg is None:
+                return None
+            if msg.type == SIGNAL:
+                return msg
+
+    def get_property(self, destination: str, path: str, interface: str, name: str) -> Any:
+        """Read a single property through org.freedesktop.DBus.Properties."""
+        return self.call(destination, path, "org.freedesktop.DBus.Properties", "Get",
+                         "ss", interface, name)[0]
+
+    def get_all_properties(self, destination: str, path: str, interface: str) -> dict[str, Any]:
+        """Read every property of an interface."""
+        return self.call(destination, path, "org.freedesktop.DBus.Properties", "GetAll",
+                         "s", interface)[0]
+
+
+_session: Connection | None = None
+
+
+def session_bus() -> Connection:
+    """
+    Return a process-wide session bus connection, reconnecting if it dropped.
+    Long-lived processes reuse the same connection across calls.
+    """
+    global _session
+    if _session is not None:
+        try:
+            # A readable socket with no pending message means the peer hung up
+            if select.select([_session.sock], [], [], 0)[0] and not _session.sock.recv(
+                    1, socket.MSG_PEEK):
+                raise OSError("disconnected")
+            return _session
+        except OSError:
+            _session.close()
+            _session = None
+
+    _session = Connection.session()
+    return _session
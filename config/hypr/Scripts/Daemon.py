@@ -0,0 +1,227 @@
+"""
+Resident command daemon for keybind scripts.
+Keeps script modules imported and runs forwarded commands in forked children.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import signal
+import socket
+import statistics
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+from Utils import get_logger, get_runtime_dir, flush_stats, THEME_VARS
+
+log = get_logger("Daemon")
+
+
+SOCKET_NAME: str = "daemon.sock"
+SCRIPTS_DIR: Path = Path(__file__).resolve().parent
+
+# Modules served by the daemon, pre-imported at startup
+COMMANDS: tuple[str, ...] = ("Audio", "Brightness", "GameMode", "RofiLauncher")
+
+LATENCY_HISTORY: int = 256  # Samples kept per command
+REQUEST_TIMEOUT: float = 1.0
+STATS_REQUEST: str = "@stats"
+
+
+class LatencyStats:
+    """Rolling dispatch and completion latencies per command."""
+
+    def __init__(self) -> None:
+        self.dispatch: dict[str, deque[float]] = {}
+        self.total: dict[str, deque[float]] = {}
+
+    def record(self, table: dict[str, deque[float]], command: str, ms: float) -> None:
+        table.setdefault(command, deque(maxlen=LATENCY_HISTORY)).append(ms)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Return count, p50 and p95 (ms) for each command."""
+        result = {}
+        for command, samples in self.total.items():
+            ordered = sorted(samples)
+            dispatch = sorted(self.dispatch.get(command, [0.0]))
+            result[command] = {
+                "count": len(ordered),
+                "dispatch_p50": statistics.median(dispatch),
+                "p50": statistics.median(ordered),
+                "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                "max": ordered[-1],
+            }
+        return result
+
+
+def get_socket_path() -> Path:
+    """Get the daemon socket path in the runtime directory."""
+    return get_runtime_dir() / SOCKET_NAME
+
+
+def decode_request(data: bytes) -> tuple[list[str], dict[str, str]]:
+    """Decode a request written by Run.encode_request into argv and environment."""
+    fields = data.decode("utf-8", errors="surrogateescape").split("\0")
+    split = fields.index("") if "" in fields else len(fields)
+    env = dict(entry.split("=", 1) for entry in fields[split + 1:] if "=" in entry)
+    return fields[:split], env
+
+
+def read_request(conn: socket.socket) -> bytes:
+    """Read a request until the client shuts down its write side."""
+    chunks = []
+    while chunk := conn.recv(65536):
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def theme_mtime() -> float:
+    """Modification time of the theme variables, used to detect theme switches."""
+    try:
+        return THEME_VARS.stat().st_mtime
+    except OSError:
+        return 0.0
+
+
+def run_child(module_name: str, args: list[str], env: dict[str, str], fresh: bool) -> None:
+    """Run a command inside a forked child and exit with its status."""
+    os.setsid()
+    os.environ.clear()
+    os.environ.update(env)
+
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+
+    script = str(SCRIPTS_DIR / f"{module_name}.py")
+    if fresh:
+        # Theme changed since startup: module-level paths are stale
+        os.execv(sys.executable, [sys.executable, script, *args])
+
+    code = 0
+    sys.argv = [script, *args]
+    try:
+        sys.modules[module_name].main()
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else 1
+    except Exception as e:
+        log.error(f"{module_name} {' '.join(args)} failed: {e}")
+        code = 1
+    # os._exit skips atexit handlers
+    flush_stats()
+    os._exit(code)
+
+
+def serve() -> None:
+    """Accept forwarded commands until terminated."""
+    for name in COMMANDS:
+        importlib.import_module(name)
+
+    started_theme = theme_mtime()
+    stats = LatencyStats()
+    running: dict[int, tuple[str, float]] = {}
+
+    def reap(*_) -> None:
+        while True:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            if pid in running:
+                command, start = running.pop(pid)
+                stats.record(stats.total, command, (time.perf_counter() - start) * 1000)
+
+    signal.signal(signal.SIGCHLD, reap)
+
+    path = get_socket_path()
+    path.unlink(missing_ok=True)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(path))
+    os.chmod(path, 0o600)
+    server.listen(16)
+    log.info(f"Daemon listening on {path}")
+
+    while True:
+        conn, _ = server.accept()
+        start = time.perf_counter()
+        with conn:
+            conn.settimeout(REQUEST_TIMEOUT)
+            try:
+                argv, env = decode_request(read_request(conn))
+            except OSError as e:
+                log.warning(f"Bad request: {e}")
+                continue
+
+            if argv == [STATS_REQUEST]:
+                conn.sendall(json.dumps(stats.summary()).encode() + b"\n")
+                continue
+
+            if not argv or argv[0] not in COMMANDS:
+                conn.sendall(b"unknown\n")
+                continue
+
+            fresh = theme_mtime() != started_theme
+            # Hold SIGCHLD until the child is registered so a fast exit is not lost
+            signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGCHLD})
+            pid = os.fork()
+            if pid == 0:
+                signal.pthread_sigmask(signal.SIG_UNBLOCK, {signal.SIGCHLD})
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                server.close()
+                run_child(argv[0], argv[1:], env, fresh)
+
+            running[pid] = (argv[0], start)
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, {signal.SIGCHLD})
+            stats.record(stats.dispatch, argv[0], (time.perf_counter() - start) * 1000)
+            try:
+                conn.sendall(b"ok\n")
+            except OSError:
+                pass
+
+        if fresh:
+            log.info("Theme changed, restarting daemon")
+            server.close()
+            os.execv(sys.executable, [sys.executable, __file__, "serve"])
+
+
+def print_stats() -> None:
+    """Query the running daemon and print per-command latency."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(get_socket_path()))
+        sock.sendall(STATS_REQUEST.encode())
+        sock.shutdown(socket.SHUT_WR)
+        summary = json.loads(sock.makefile("rb").readline())
+
+    print(f"{'command':<14}{'count':>7}{'dispatch ms':>13}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}")
+    for command, row in sorted(summary.items()):
+        print(f"{command:<14}{row['count']:>7}{row['dispatch_p50']:>13.2f}"
+              f"{row['p50']:>9.1f}{row['p95']:>9.1f}{row['max']:>9.1f}")
+
+
+def main() -> None:
+    """Parse arguments and execute the requested daemon action."""
+    parser = argparse.ArgumentParser(description="Resident script daemon")
+    parser.add_argument(
+        "action",
+        nargs="?",
+        default="serve",
+        choices=["serve", "stats"],
+        help="Daemon action to perform"
+    )
+
+    args = parser.parse_args()
+
+    match args.action:
+        case "serve":
+            serve()
+        case "stats":
+            print_stats()
+
+
+if __name__ == "__main__":
+    main()
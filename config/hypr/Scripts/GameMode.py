@@ -77,5 +77,10 @@ def toggle_game_mode() -> None:
         enable_game_mode()
 
 
-if __name__ == "__main__":
+def main() -> None:
+    """Toggle game mode."""
     toggle_game_mode()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""
+Hyprland event socket subscriber.
+Parses .socket2.sock events and dispatches them to registered handlers via asyncio.
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from Utils import get_logger, get_hypr_dir
+
+log = get_logger("HyprEvents")
+
+
+EVENT_SOCKET: str = ".socket2.sock"
+EVENT_SEPARATOR: bytes = b">>"
+READ_SIZE: int = 65536
+
+# Reconnect backoff (seconds)
+RECONNECT_MIN: float = 0.5
+RECONNECT_MAX: float = 30.0
+
+# Field names for each event. The last field absorbs any remaining commas,
+# since window titles and workspace names may contain them.
+EVENT_FIELDS: dict[str, tuple[str, ...]] = {
+    "workspace": ("name",),
+    "workspacev2": ("id", "name"),
+    "focusedmon": ("monitor", "workspace"),
+    "focusedmonv2": ("monitor", "workspace_id"),
+    "activewindow": ("class", "title"),
+    "activewindowv2": ("address",),
+    "fullscreen": ("state",),
+    "monitoradded": ("name",),
+    "monitoraddedv2": ("id", "name", "description"),
+    "monitorremoved": ("name",),
+    "monitorremovedv2": ("id", "name", "description"),
+    "createworkspace": ("name",),
+    "createworkspacev2": ("id", "name"),
+    "destroyworkspace": ("name",),
+    "destroyworkspacev2": ("id", "name"),
+    "moveworkspace": ("name", "monitor"),
+    "moveworkspacev2": ("id", "name", "monitor"),
+    "renameworkspace": ("id", "name"),
+    "activespecial": ("name", "monitor"),
+    "activelayout": ("keyboard", "layout"),
+    "openwindow": ("address", "workspace", "class", "title"),
+    "closewindow": ("address",),
+    "movewindow": ("address", "workspace"),
+    "movewindowv2": ("address", "workspace_id", "workspace"),
+    "openlayer": ("namespace",),
+    "closelayer": ("namespace",),
+    "submap": ("name",),
+    "changefloatingmode": ("address", "floating"),
+    "urgent": ("address",),
+    "minimized": ("address", "minimized"),
+    "screencast": ("state", "owner"),
+    "windowtitle": ("address",),
+    "windowtitlev2": ("address", "title"),
+    "togglegroup": ("state", "addresses"),
+    "moveintogroup": ("address",),
+    "moveoutofgroup": ("address",),
+    "pin": ("address", "pinned"),
+    "configreloaded": (),
+}
+
+WILDCARD: str = "*"
+
+Handler = Callable[["Event"], Awaitable[None] | None]
+
+
+@dataclass(frozen=True, slots=True)
+class Event:
+    """A single compositor event with its payload split into named fields."""
+    name: str
+    data: str
+    fields: dict[str, str] = field(default_factory=dict)
+
+    def get(self, key: str, default: str = "") -> str:
+        """Return a named field, or default if the event does not carry it."""
+        return self.fields.get(key, default)
+
+
+def parse_line(line: str) -> Event | None:
+    """
+    Parse a single EVENT>>DATA line.
+
+    Returns:
+        Parsed event, or None for malformed lines
+    """
+    name, sep, data = line.partition(">>")
+    if not sep:
+        return None
+
+    names = EVENT_FIELDS.get(name)
+    if not names:
+        return Event(name, data)
+    return Event(name, data, dict(zip(names, data.split(",", len(names) - 1))))
+
+
+class EventParser:
+    """Incremental parser that turns raw socket chunks into events."""
+
+    def __init__(self) -> None:
+        self._buffer = b""
+
+    def feed(self, chunk: bytes) -> list[Event]:
+        """
+        Consume a chunk of socket data.
+        Incomplete trailing lines are kept until the next chunk arrives.
+
+        Returns:
+            Events completed by this chunk
+        """
+        lines = (self._buffer + chunk).split(b"\n")
+        self._buffer = lines.pop()
+
+        events = []
+        for raw in lines:
+            event = parse_line(raw.decode("utf-8", errors="replace"))
+            if event is not None:
+                events.append(event)
+        return events
+
+
+class EventBus:
+    """Registry of event handlers with a reconnecting socket reader."""
+
+    def __init__(self) -> None:
+        self._handlers: dict[str, list[Handler]] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def on(self, *names: str) -> Callable[[Handler], Handler]:
+        """
+        Decorator registering a handler for one or more events.
+        Use "*" to receive every event.
+        """
+        def register(handler: Handler) -> Handler:
+            for name in names:
+                self.subscribe(name, handler)
+            return handler
+        return register
+
+    def subscribe(self, name: str, handler: Handler) -> None:
+        """Register a handler (sync function or coroutine) for an event."""
+        self._handlers.setdefault(name, []).append(handler)
+
+    def dispatch(self, event: Event) -> None:
+        """
+        Deliver an event to its handlers.
+        Coroutine handlers are scheduled as tasks so a slow handler never
+        stalls the socket reader.
+        """
+        for handler in self._handlers.get(event.name, []) + self._handlers.get(WILDCARD, []):
+            try:
+                result = handler(event)
+            except Exception as e:
+                log.error(f"Handler {handler.__name__} failed on {event.name}: {e}")
+                continue
+
+            if inspect.isawaitable(result):
+                task = asyncio.ensure_future(result)
+                self._tasks.add(task)
+                task.add_done_callback(self._task_done)
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            log.error(f"Async handler failed: {task.exception()}")
+
+    async def run(self) -> None:
+        """Read events forever, reconnecting with backoff when the socket drops."""
+        delay = RECONNECT_MIN
+
+        while True:
+            hypr_dir = get_hypr_dir()
+            if hypr_dir is None:
+                log.error("Hyprland instance not found, is HYPRLAND_INSTANCE_SIGNATURE set?")
+                return
+
+            try:
+                reader, writer = await asyncio.open_unix_connection(str(hypr_dir / EVENT_SOCKET))
+            except OSError as e:
+                log.warning(f"Event socket unavailable ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX)
+                continue
+
+            log.info("Connected to event socket")
+            delay = RECONNECT_MIN
+            parser = EventParser()
+            try:
+                while chunk := await reader.read(READ_SIZE):
+                    for event in parser.feed(chunk):
+                        self.dispatch(event)
+            except OSError as e:
+                log.warning(f"Event socket error: {e}")
+            finally:
+                writer.close()
+
+            log.warning("Event socket closed, reconnecting")
+            await asyncio.sleep(delay)
+
+    async def replay(self, path: str | Path, speed: float = 1.0) -> None:
+        """
+        Replay a file written by record(), preserving the original timing.
+        Each entry is a raw socket read as a JSON string, so lines split across
+        reads are replayed split; plain lines from older recordings also work.
+
+        Args:
+            path: Recording file
+            speed: Playback speed multiplier (0 replays without delays)
+        """
+        start = time.monotonic()
+        parser = EventParser()
+
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                offset, _, raw = line.rstrip("\n").partition("\t")
+                chunk = json.loads(raw) if raw.startswith('"') else raw + "\n"
+                if speed > 0:
+                    delay = float(offset) / speed - (time.monotonic() - start)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                for event in parser.feed(chunk.encode("utf-8", errors="surrogateescape")):
+                    self.dispatch(event)
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+async def record(path: str | Path) -> None:
+    """Write each raw socket read with its time offset to a file until interrupted."""
+    hypr_dir = get_hypr_dir()
+    if hypr_dir is None:
+        log.error("Hyprland instance not found")
+        return
+
+    reader, writer = await asyncio.open_unix_connection(str(hypr_dir / EVENT_SOCKET))
+    start = time.monotonic()
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            while chunk := await reader.read(READ_SIZE):
+                # surrogateescape keeps a character split across reads intact
+                data = json.dumps(chunk.decode("utf-8", errors="surrogateescape"))
+                f.write(f"{time.monotonic() - start:.3f}\t{data}\n")
+                f.flush()
+    finally:
+        writer.close()
+
+
+def generate_events(count: int) -> Iterable[bytes]:
+    """Yield synthetic event lines cycling through the known event types."""
+    samples = [
+        b"workspace>>3",
+        b"workspacev2>>3,3",
+        b"activewindow>>kitty,~/projects: nvim, main.py",
+        b"activewindowv2>>5581e4a0c3d0",
+        b"openwindow>>5581e4a0c3d0,3,firefox,Mozilla Firefox",
+        b"closewindow>>5581e4a0c3d0",
+        b"monitoradded>>HDMI-A-1",
+        b"focusedmon>>eDP-1,2",
+        b"windowtitlev2>>5581e4a0c3d0,README.md - Code",
+        b"configreloaded>>",
+    ]
+    for i in range(count):
+        yield samples[i % len(samples)] + b"\n"
+
+
+def benchmark(count: int, chunk_size: int = 4096) -> None:
+    """Push synthetic events through the parser and report throughput."""
+    payload = b"".join(generate_events(count))
+    chunks = [payload[i:i + chunk_size] for i in range(0, len(payload), chunk_size)]
+
+    parser = EventParser()
+    parsed = 0
+    start = time.perf_counter()
+    for chunk in chunks:
+        parsed += len(parser.feed(chunk))
+    elapsed = time.perf_counter() - start
+
+    print(f"{parsed} events, {len(payload)} bytes in {elapsed * 1000:.1f} ms "
+          f"({parsed / elapsed:,.0f} events/s)")
+
+
+def main() -> None:
+    """Parse arguments and execute the requested event action."""
+    parser = argparse.ArgumentParser(description="Hyprland event socket tool")
+    parser.add_argument(
+        "action",
+        choices=["watch", "record", "replay", "bench"],
+        help="Event action to perform"
+    )
+    parser.add_argument("--file", type=str, help="Recording file for record/replay")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed (0 = no delays)")
+    parser.add_argument("--count", type=int, default=100_000, help="Benchmark event count")
+
+    args = parser.parse_args()
+
+    bus = EventBus()
+    bus.subscribe(WILDCARD, lambda event: print(f"{event.name}: {event.fields or event.data}"))
+
+    try:
+        match args.action:
+            case "watch":
+                asyncio.run(bus.run())
+            case "record":
+                if args.file:
+                    asyncio.run(record(args.file))
+            case "replay":
+                if args.file:
+                    asyncio.run(bus.replay(args.file, args.speed))
+            case "bench":
+                benchmark(args.count)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,9 @@
 import sys
-from Utils import run_capture
-
-def get_metadata(key):
-    stdout, _, _ = run_capture(["playerctl", "metadata", "--format", f"{{{{ {key} }}}}" ])
-    return stdout
+from AlbumArt import get_art
+from MediaState import get_field
 
 def get_source_info():
-    trackid = get_metadata("mpris:trackid")
+    trackid = get_field("trackid")
     if "firefox" in trackid.lower():
         return "Firefox 󰈹"
     elif "spotify" in trackid.lower():
@@ -20,18 +17,16 @@ def main():
     arg = sys.argv[1]
     
     if arg == "--title":
-        title = get_metadata("xesam:title")
+        title = get_field("title")
         print(title[:30] if title else "")
     elif arg == "--arturl":
-        url = get_metadata("mpris:artUrl")
-        if url.startswith("file://"):
-            url = url[7:]
-        print(url if url else "")
+        # Pre-scaled cover from the cache, generated off the lock screen's path
+        print(get_art(get_field("arturl"), "lock"))
     elif arg == "--artist":
-        artist = get_metadata("xesam:artist")
+        artist = get_field("artist")
         print(artist[:30] if artist else "")
     elif arg == "--length":
-        length = get_metadata("mpris:length")
+        length = get_field("length")
         if length:
             try:
                 # Convert length from microseconds to seconds
@@ -42,13 +37,13 @@ def main():
         else:
             print("")
     elif arg == "--album":
-        album = get_metadata("xesam:album")
+        album = get_field("album")
         print(album if album else "")
     elif arg == "--source":
         print(get_source_info())
     elif arg == "--status":
-        stdout, _, _ = run_capture(["playerctl", "status"])
-        print(stdout if stdout else "")
+        status = get_field("status")
+        print(status if status else "")
 
 if __name__ == "__main__":
     main()
@@ -1,21 +1,15 @@
-from Utils import run_capture, run_silent
+from Connectivity import is_online
+from Netlink import get_default_interface
 
 def get_interface_icon():
-    # Get default interface
-    stdout, _, _ = run_capture(["ip", "route"])
-    default_iface = ""
-    for line in stdout.splitlines():
-        if line.startswith("default"):
-            parts = line.split()
-            if "dev" in parts:
-                default_iface = parts[parts.index("dev") + 1]
-            break
-            
+    # Get default interface from an rtnetlink dump
+    default_iface = get_default_interface() or ""
+
     if not default_iface:
         return "󱐅"
         
-    # Ping 1.1.1.1
-    if run_silent(["ping", "-q", "-c", "1", "-W", "1", "1.1.1.1"]) == 0:
+    # Last result from the background prober
+    if is_online():
         if default_iface.startswith("wl"):
             return ""
         elif default_iface.startswith(("en", "eth")):
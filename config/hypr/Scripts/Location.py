@@ -1,40 +1,29 @@
-import sys
-import os
-import time
 import json
-from pathlib import Path
-from Utils import run_capture, read_file
+from Utils import run_capture, cached
 
-CACHE_FILE = Path.home() / ".cache/ip_cache.txt"
+CACHE_KEY = "location"
 EXPIRY_TIME = 86400  # 24 hours
+CURL_TIMEOUT = "5"
 
-def get_location():
-    if not CACHE_FILE.parent.exists():
-        CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
-    
-    if CACHE_FILE.exists():
-        last_modified = CACHE_FILE.stat().st_mtime
-        if time.time() - last_modified < EXPIRY_TIME:
-            try:
-                cached_data = read_file(CACHE_FILE).strip()
-                if cached_data:
-                    return cached_data
-            except:
-                pass
-
+def fetch_location():
     # Fetch new data from ip-api.com
-    stdout, stderr, code = run_capture(["curl", "-s", "ip-api.com/json"])
+    stdout, stderr, code = run_capture(["curl", "-sf", "--max-time", CURL_TIMEOUT, "ip-api.com/json"])
     if code == 0 and stdout:
         try:
             data = json.loads(stdout)
-            location = f"{data.get('country', '')}, {data.get('city', '')}"
-            with open(CACHE_FILE, "w") as f:
-                f.write(location)
-            return location
+            return f"{data.get('country', '')}, {data.get('city', '')}"
         except json.JSONDecodeError:
             pass
-    
-    return "Unknown Location"
+    return None
+
+def get_location():
+    return cached(
+        CACHE_KEY,
+        fetch_location,
+        ttl=EXPIRY_TIME,
+        stale_while_revalidate=True,
+        default="Unknown Location"
+    )
 
 if __name__ == "__main__":
     print(get_location())
@@ -1,78 +1,35 @@
-import os
-import time
-from pathlib import Path
-from Utils import is_running, read_file, run_capture, run_silent
-
-# Unique state file per user to avoid permission conflicts in /tmp
-STATE_FILE = Path(f"/tmp/lock_battery_frame_{os.getlogin()}")
+from PowerState import get_power_state, charging_frame
+from Connectivity import is_online
+from Netlink import get_default_interface
+from Utils import is_running
 
 CHARGING_ICONS: list[str] = ["󰢟", "󰢜", "󰂆", "󰂇", "󰂈", "󰢝", "󰂉", "󰢞", "󰂊", "󰂋", "󰂅"]
 BATTERY_ICONS: list[str] = ["󰂎", "󰁺", "󰁻", "󰁼", "󰁽", "󰁾", "󰁿", "󰂀", "󰂁", "󰂂", "󰁹"]
 
 def get_battery_info():
-    try:
-        # Resolve battery path
-        bat_path = next(Path("/sys/class/power_supply").glob("BAT*"))
-        capacity = int(read_file(bat_path / "capacity").strip())
-        status = read_file(bat_path / "status").strip()
-        
-        start_index = min(capacity // 10, 10)
-        
-        if status == "Charging":
-            # Determine current animation frame
-            if STATE_FILE.exists():
-                try:
-                    frame = int(STATE_FILE.read_text().strip())
-                except ValueError:
-                    frame = start_index
-            else:
-                frame = start_index
-                
-            # Keep animation between current level and full
-            frame = max(frame, start_index)
-            icon = CHARGING_ICONS[frame]
-            
-            # Save next frame
-            try:
-                next_frame = frame + 1 if frame < 10 else start_index
-                STATE_FILE.write_text(str(next_frame))
-            except PermissionError:
-                pass
-            return icon
-        
-        elif status == "Full":
-            if STATE_FILE.exists():
-                try: STATE_FILE.unlink(missing_ok=True)
-                except PermissionError: pass
-            return "󰂅"
-            
-        else:
-            if STATE_FILE.exists():
-                try: STATE_FILE.unlink(missing_ok=True)
-                except PermissionError: pass
-            return BATTERY_ICONS[start_index]
-            
-    except (StopIteration, FileNotFoundError, ValueError, IndexError):
+    snapshot = get_power_state()
+    if snapshot is None:
         return ""
 
+    capacity = snapshot.capacity
+    if snapshot.status == "Charging":
+        # Frame comes from the shared clock, in step with the bar
+        return CHARGING_ICONS[charging_frame(capacity)]
+    elif snapshot.status == "Full":
+        return "󰂅"
+    return BATTERY_ICONS[min(capacity // 10, 10)]
+
 def get_hotspot_status():
     return "󱜠" if is_running("hostapd") else ""
 
 def get_interface_icon():
-    stdout, _, _ = run_capture(["ip", "route"])
-    default_iface = ""
-    for line in stdout.splitlines():
-        if line.startswith("default"):
-            parts = line.split()
-            if "dev" in parts:
-                default_iface = parts[parts.index("dev") + 1]
-            break
-            
+    default_iface = get_default_interface() or ""
+
     if not default_iface:
         return "󱐅"
         
-    # Check connectivity via ping
-    if run_silent(["ping", "-q", "-c", "1", "-W", "1", "1.1.1.1"]) == 0:
+    # Cached connectivity from the background prober
+    if is_online():
         if default_iface.startswith("wl"):
             return ""
         elif default_iface.startswith(("en", "eth")):
@@ -0,0 +1,130 @@
+"""
+Shared MPRIS metadata snapshot.
+One resident playerctl follower keeps the current track in the runtime dir.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import time
+from pathlib import Path
+
+from AlbumArt import warm
+from Utils import get_logger, get_runtime_dir, run_bg, run_capture, write_atomic
+
+log = get_logger("MediaState")
+
+
+SNAPSHOT_FILE: str = "media.json"
+
+# Snapshot field -> playerctl format key
+FIELDS: dict[str, str] = {
+    "status": "status",
+    "title": "xesam:title",
+    "artist": "xesam:artist",
+    "album": "xesam:album",
+    "length": "mpris:length",
+    "trackid": "mpris:trackid",
+    "arturl": "mpris:artUrl",
+    "player": "playerName",
+}
+SEPARATOR: str = "\x1f"
+RESTART_DELAY: float = 2.0
+
+
+def get_snapshot_path() -> Path:
+    return get_runtime_dir() / SNAPSHOT_FILE
+
+
+def parse_line(line: str) -> dict[str, str]:
+    """Split one follower line into snapshot fields; a blank line means no player."""
+    values = line.rstrip("\n").split(SEPARATOR)
+    if len(values) != len(FIELDS):
+        values = [""] * len(FIELDS)
+    return dict(zip(FIELDS, values))
+
+
+def publish(fields: dict[str, str]) -> None:
+    write_atomic(get_snapshot_path(), json.dumps({"pid": os.getpid(), **fields}))
+
+
+def follow() -> None:
+    """Run playerctl --follow and publish every change until interrupted."""
+    template = SEPARATOR.join(f"{{{{{key}}}}}" for key in FIELDS.values())
+    cmd = ["playerctl", "metadata", "--follow", "--format", template]
+    log.info("Media follower started")
+
+    while True:
+        last = None
+        try:
+            proc = run_bg(cmd, stdout=subprocess.PIPE, text=True)
+        except FileNotFoundError:
+            log.error("playerctl not found")
+            return
+
+        for line in proc.stdout:
+            fields = parse_line(line)
+            if fields != last:
+                publish(fields)
+                if fields["arturl"] and (last is None or fields["arturl"] != last["arturl"]):
+                    warm(fields["arturl"])
+                last = fields
+                log.debug(f"Media: {fields['status']} {fields['title']!r}")
+
+        proc.wait()
+        publish(parse_line(""))
+        log.warning(f"playerctl exited ({proc.returncode}), restarting")
+        time.sleep(RESTART_DELAY)
+
+
+def read_snapshot() -> dict[str, str] | None:
+    """
+    Read the published snapshot.
+
+    Returns:
+        Snapshot fields, or None if no follower is running
+    """
+    try:
+        snapshot = json.loads(get_snapshot_path().read_text())
+        os.kill(snapshot["pid"], 0)
+    except (OSError, ValueError, KeyError):
+        return None
+    return snapshot
+
+
+def get_field(field: str) -> str:
+    """One snapshot field, querying playerctl directly if no follower runs."""
+    snapshot = read_snapshot()
+    if snapshot is not None:
+        return snapshot.get(field, "")
+    if field == "status":
+        stdout, _, _ = run_capture(["playerctl", "status"])
+    else:
+        stdout, _, _ = run_capture(["playerctl", "metadata", "--format", f"{{{{ {FIELDS[field]} }}}}"])
+    return stdout
+
+
+def main() -> None:
+    """Parse arguments and execute the requested media action."""
+    parser = argparse.ArgumentParser(description="MPRIS metadata snapshot")
+    parser.add_argument(
+        "action",
+        choices=["follow", "show"],
+        help="follow: run the follower, show: print the current snapshot"
+    )
+
+    args = parser.parse_args()
+
+    match args.action:
+        case "follow":
+            try:
+                follow()
+            except KeyboardInterrupt:
+                pass
+        case "show":
+            print(json.dumps(read_snapshot() or {field: get_field(field) for field in FIELDS}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+"""
+Minimal netlink client for kernel network state.
+Speaks rtnetlink (links, routes) and generic netlink (nl80211) without external tools.
+"""
+
+import errno
+import os
+import socket
+import struct
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+from Utils import SYSFS_ROOT
+
+
+# Message header: length, type, flags, sequence, port id
+NLMSG_HEADER: struct.Struct = struct.Struct("=IHHII")
+# Attribute header: length, type
+NLA_HEADER: struct.Struct = struct.Struct("=HH")
+# Generic netlink header: command, version, reserved
+GENL_HEADER: struct.Struct = struct.Struct("=BBH")
+
+NLM_F_REQUEST: int = 0x1
+NLM_F_ACK: int = 0x4
+NLM_F_DUMP: int = 0x300
+
+NLMSG_ERROR: int = 2
+NLMSG_DONE: int = 3
+
+NLA_TYPE_MASK: int = 0x3FFF
+
+RECV_SIZE: int = 65536
+DEFAULT_TIMEOUT: float = 2.0
+
+# Generic netlink controller
+NETLINK_GENERIC: int = 16
+GENL_ID_CTRL: int = 0x10
+CTRL_CMD_GETFAMILY: int = 3
+CTRL_ATTR_FAMILY_ID: int = 1
+CTRL_ATTR_FAMILY_NAME: int = 2
+
+# nl80211 commands and attributes (include/uapi/linux/nl80211.h)
+NL80211_CMD_GET_INTERFACE: int = 5
+NL80211_CMD_GET_STATION: int = 17
+NL80211_ATTR_IFINDEX: int = 3
+NL80211_ATTR_IFNAME: int = 4
+NL80211_ATTR_IFTYPE: int = 5
+NL80211_ATTR_MAC: int = 6
+NL80211_ATTR_STA_INFO: int = 21
+NL80211_ATTR_SSID: int = 52
+NL80211_STA_INFO_SIGNAL: int = 7
+NL80211_STA_INFO_SIGNAL_AVG: int = 13
+NL80211_IFTYPE_STATION: int = 2
+
+
+class NetlinkError(OSError):
+    """Raised when the kernel answers a request with an error."""
+
+
+def align(length: int) -> int:
+    return (length + 3) & ~3
+
+
+def encode_attr(attr_type: int, value: bytes) -> bytes:
+    """Encode one attribute, padded to the 4-byte boundary."""
+    header = NLA_HEADER.pack(NLA_HEADER.size + len(value), attr_type)
+    return (header + value).ljust(align(NLA_HEADER.size + len(value)), b"\0")
+
+
+def parse_attrs(data: bytes, offset: int = 0) -> dict[int, bytes]:
+    """Split a run of attributes into {type: payload}; nested types stay raw."""
+    attrs = {}
+    while offset + NLA_HEADER.size <= len(data):
+        length, attr_type = NLA_HEADER.unpack_from(data, offset)
+        if length < NLA_HEADER.size:
+            break
+        attrs[attr_type & NLA_TYPE_MASK] = data[offset + NLA_HEADER.size:offset + length]
+        offset += align(length)
+    return attrs
+
+
+def attr_u32(attrs: dict[int, bytes], attr_type: int, default: int = 0) -> int:
+    value = attrs.get(attr_type)
+    return struct.unpack("=I", value[:4])[0] if value and len(value) >= 4 else default
+
+
+def attr_str(attrs: dict[int, bytes], attr_type: int) -> str:
+    return attrs.get(attr_type, b"").rstrip(b"\0").decode("utf-8", errors="replace")
+
+
+class NetlinkSocket:
+    """A request/response netlink socket for one protocol."""
+
+    def __init__(self, protocol: int, groups: int = 0) -> None:
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW | socket.SOCK_CLOEXEC, protocol)
+        self.sock.settimeout(DEFAULT_TIMEOUT)
+        self.sock.bind((0, groups))
+        self._seq = 0
+
+    def close(self) -> None:
+        self.sock.close()
+
+    def fileno(self) -> int:
+        return self.sock.fileno()
+
+    def request(self, msg_type: int, flags: int, payload: bytes) -> Iterator[tuple[int, bytes]]:
+        """
+        Send a request and yield (type, payload) for each reply message.
+        Dumps are followed until NLMSG_DONE.
+        """
+        self._seq += 1
+        seq = self._seq
+        header = NLMSG_HEADER.pack(NLMSG_HEADER.size + len(payload), msg_type,
+                                   flags | NLM_F_REQUEST, seq, 0)
+        self.sock.send(header + payload)
+
+        while True:
+            data = self.sock.recv(RECV_SIZE)
+            offset = 0
+            while offset + NLMSG_HEADER.size <= len(data):
+                length, reply_type, _, reply_seq, _ = NLMSG_HEADER.unpack_from(data, offset)
+                body = data[offset + NLMSG_HEADER.size:offset + length]
+                offset += align(length)
+                if reply_seq != seq:
+                    continue
+                if reply_type == NLMSG_DONE:
+                    return
+                if reply_type == NLMSG_ERROR:
+                    error = -struct.unpack_from("=i", body)[0]
+                    if error:
+                        raise NetlinkError(error, os.strerror(error))
+                    return
+                yield reply_type, body
+            if not flags & NLM_F_DUMP:
+                return
+
+    def read_events(self) -> Iterator[tuple[int, bytes]]:
+        """
+        Yield (type, payload) for pending multicast messages without blocking.
+        Raises OSError with ENOBUFS when the kernel had to drop messages.
+        """
+        while True:
+            try:
+                data = self.sock.recv(RECV_SIZE, socket.MSG_DONTWAIT)
+            except BlockingIOError:
+                return
+            offset = 0
+            while offset + NLMSG_HEADER.size <= len(data):
+                length, msg_type, _, _, _ = NLMSG_HEADER.unpack_from(data, offset)
+                yield msg_type, data[offset + NLMSG_HEADER.size:offset + length]
+                offset += align(length)
+
+
+# =============================================================================
+# Generic netlink / nl80211
+# =============================================================================
+
+class GenericNetlink(NetlinkSocket):
+    """Generic netlink socket bound to one resolved family."""
+
+    def __init__(self, family: str) -> None:
+        super().__init__(NETLINK_GENERIC)
+        name = encode_attr(CTRL_ATTR_FAMILY_NAME, family.encode() + b"\0")
+        try:
+            for _, body in self.request(GENL_ID_CTRL, 0, GENL_HEADER.pack(CTRL_CMD_GETFAMILY, 1, 0) + name):
+                attrs = parse_attrs(body, GENL_HEADER.size)
+                self.family_id = struct.unpack("=H", attrs[CTRL_ATTR_FAMILY_ID][:2])[0]
+                break
+            else:
+                raise NetlinkError(2, f"generic netlink family {family} not found")
+        except (OSError, KeyError):
+            self.close()
+            raise
+
+    def command(self, cmd: int, attrs: bytes = b"", dump: bool = False) -> Iterator[dict[int, bytes]]:
+        """Run a family command and yield each reply's attributes."""
+        payload = GENL_HEADER.pack(cmd, 0, 0) + attrs
+        for _, body in self.request(self.family_id, NLM_F_DUMP if dump else NLM_F_ACK, payload):
+            yield parse_attrs(body, GENL_HEADER.size)
+
+
+@dataclass(frozen=True, slots=True)
+class WifiLink:
+    """Association state of one wireless interface."""
+    ifname: str
+    ssid: str | None
+    signal_dbm: int | None
+
+
+class Nl80211:
+    """Reads wireless interface and station state from nl80211."""
+
+    def __init__(self) -> None:
+        self.genl = GenericNetlink("nl80211")
+
+    def close(self) -> None:
+        self.genl.close()
+
+    def interfaces(self) -> list[tuple[int, str, str | None]]:
+        """
+        List station-mode wireless interfaces.
+
+        Returns:
+            (ifindex, ifname, ssid) for each, ssid None when not associated
+        """
+        result = []
+        for attrs in self.genl.command(NL80211_CMD_GET_INTERFACE, dump=True):
+            if attr_u32(attrs, NL80211_ATTR_IFTYPE) != NL80211_IFTYPE_STATION:
+                continue
+            ssid = attrs.get(NL80211_ATTR_SSID)
+            result.append((
+                attr_u32(attrs, NL80211_ATTR_IFINDEX),
+                attr_str(attrs, NL80211_ATTR_IFNAME),
+                ssid.decode("utf-8", errors="replace") if ssid else None,
+            ))
+        return result
+
+    def signal(self, ifindex: int) -> int | None:
+        """Signal of the associated access point in dBm, or None if not associated."""
+        request = encode_attr(NL80211_ATTR_IFINDEX, struct.pack("=I", ifindex))
+        for attrs in self.genl.command(NL80211_CMD_GET_STATION, request, dump=True):
+            info = parse_attrs(attrs.get(NL80211_ATTR_STA_INFO, b""))
+            value = info.get(NL80211_STA_INFO_SIGNAL_AVG) or info.get(NL80211_STA_INFO_SIGNAL)
+            if value:
+                return struct.unpack("=b", value[:1])[0]
+        return None
+
+    def links(self) -> list[WifiLink]:
+        """Association state of every station interface."""
+        return [
+            WifiLink(ifname, ssid, self.signal(ifindex) if ssid else None)
+            for ifindex, ifname, ssid in self.interfaces()
+        ]
+
+
+# =============================================================================
+# rtnetlink (links and routes)
+# =============================================================================
+
+NETLINK_ROUTE: int = 0
+
+RTM_NEWLINK: int = 16
+RTM_DELLINK: int = 17
+RTM_GETLINK: int = 18
+RTM_NEWROUTE: int = 24
+RTM_DELROUTE: int = 25
+RTM_GETROUTE: int = 26
+
+RTMGRP_LINK: int = 0x1
+RTMGRP_IPV4_ROUTE: int = 0x40
+RTMGRP_IPV6_ROUTE: int = 0x400
+
+# family, type, index, flags, change
+IFINFO_HEADER: struct.Struct = struct.Struct("=BxHiII")
+# family, dst_len, src_len, tos, table, protocol, scope, type, flags
+RTMSG_HEADER: struct.Struct = struct.Struct("=BBBBBBBBI")
+
+IFLA_IFNAME: int = 3
+IFLA_OPERSTATE: int = 16
+IFLA_LINKINFO: int = 18
+IFLA_INFO_KIND: int = 1
+
+RTA_OIF: int = 4
+RTA_PRIORITY: int = 6
+RTA_TABLE: int = 15
+
+RT_TABLE_MAIN: int = 254
+RTN_UNICAST: int = 1
+IF_OPER_UP: int = 6
+ARPHRD_LOOPBACK: int = 772
+
+SYS_CLASS_NET: Path = SYSFS_ROOT / "class/net"
+
+
+@dataclass(slots=True)
+class Link:
+    """A network interface as reported by RTM_NEWLINK."""
+    index: int
+    name: str
+    kind: str  # IFLA_INFO_KIND ("bridge", "wireguard", ...) or "" for hardware
+    up: bool
+    loopback: bool
+    wireless: bool
+
+
+class LinkTable:
+    """In-memory link and default-route table kept current from rtnetlink messages."""
+
+    def __init__(self, sysfs_net: Path = SYS_CLASS_NET) -> None:
+        self.links: dict[int, Link] = {}
+        # (family, ifindex) -> metric of its default route
+        self.default_routes: dict[tuple[int, int], int] = {}
+        self._sysfs_net = sysfs_net
+
+    def apply(self, msg_type: int, body: bytes) -> bool:
+        """
+        Update the table from one message payload.
+
+        Returns:
+            True if the message changed a link or default route
+        """
+        if msg_type in (RTM_NEWLINK, RTM_DELLINK):
+            return self._apply_link(msg_type, body)
+        if msg_type in (RTM_NEWROUTE, RTM_DELROUTE):
+            return self._apply_route(msg_type, body)
+        return False
+
+    def feed(self, data: bytes) -> bool:
+        """Apply every message in a raw netlink datagram (e.g. a recording)."""
+        changed = False
+        offset = 0
+        while offset + NLMSG_HEADER.size <= len(data):
+            length, msg_type, _, _, _ = NLMSG_HEADER.unpack_from(data, offset)
+            if length < NLMSG_HEADER.size:
+                break
+            changed |= self.apply(msg_type, data[offset + NLMSG_HEADER.size:offset + length])
+            offset += align(length)
+        return changed
+
+    def _apply_link(self, msg_type: int, body: bytes) -> bool:
+        _, link_type, index, _, _ = IFINFO_HEADER.unpack_from(body)
+        if msg_type == RTM_DELLINK:
+            return self.links.pop(index, None) is not None
+
+        attrs = parse_attrs(body, IFINFO_HEADER.size)
+        name = attr_str(attrs, IFLA_IFNAME)
+        operstate = attrs.get(IFLA_OPERSTATE, b"\0")[0]
+        kind = attr_str(parse_attrs(attrs.get(IFLA_LINKINFO, b"")), IFLA_INFO_KIND)
+
+        previous = self.links.get(index)
+        if previous is not None and previous.name == name:
+            wireless = previous.wireless
+        else:
+            wireless = (self._sysfs_net / name / "wireless").is_dir()
+
+        link = Link(index, name, kind, operstate == IF_OPER_UP, link_type == ARPHRD_LOOPBACK, wireless)
+        self.links[index] = link
+        return link != previous
+
+    def _apply_route(self, msg_type: int, body: bytes) -> bool:
+        family, dst_len, _, _, table, _, _, route_type, _ = RTMSG_HEADER.unpack_from(body)
+        attrs = parse_attrs(body, RTMSG_HEADER.size)
+        table = attr_u32(attrs, RTA_TABLE, table)
+        if dst_len != 0 or table != RT_TABLE_MAIN or route_type != RTN_UNICAST or RTA_OIF not in attrs:
+            return False
+
+        key = (family, attr_u32(attrs, RTA_OIF))
+        if msg_type == RTM_DELROUTE:
+            return self.default_routes.pop(key, None) is not None
+        metric = attr_u32(attrs, RTA_PRIORITY)
+        changed = self.default_routes.get(key) != metric
+        self.default_routes[key] = metric
+        return changed
+
+    def default_interface(self) -> Link | None:
+        """The interface of the preferred default route (IPv4 first, lowest metric)."""
+        if not self.default_routes:
+            return None
+        family, index = min(
+            self.default_routes,
+            key=lambda key: (key[0] != socket.AF_INET, self.default_routes[key])
+        )
+        return self.links.get(index)
+
+    def up_links(self) -> list[Link]:
+        """Links that are operationally up, excluding loopback."""
+        return [link for link in self.links.values() if link.up and not link.loopback]
+
+
+class LinkWatcher:
+    """Keeps a LinkTable current from rtnetlink multicast events."""
+
+    def __init__(self, table: LinkTable | None = None) -> None:
+        self.table = table or LinkTable()
+        # Subscribe before dumping so no change falls between the two
+        self.events = NetlinkSocket(NETLINK_ROUTE, RTMGRP_LINK | RTMGRP_IPV4_ROUTE | RTMGRP_IPV6_ROUTE)
+        self.events.sock.setblocking(False)
+        load_link_table(self.table)
+
+    def fileno(self) -> int:
+        return self.events.fileno()
+
+    def update(self) -> bool:
+        """Apply pending events. Returns True if anything changed."""
+        changed = False
+        try:
+            for msg_type, body in self.events.read_events():
+                changed |= self.table.apply(msg_type, body)
+        except OSError as e:
+            if e.errno != errno.ENOBUFS:
+                raise
+            # Events were lost, so the table can no longer be trusted
+            self.resync()
+            return True
+        return changed
+
+    def resync(self) -> None:
+        """Rebuild the table from a fresh dump."""
+        self.table.links.clear()
+        self.table.default_routes.clear()
+        load_link_table(self.table)
+
+    def close(self) -> None:
+        self.events.close()
+
+
+def load_link_table(table: LinkTable | None = None) -> LinkTable:
+    """Fill a table with one link dump and one route dump."""
+    table = table or LinkTable()
+    sock = NetlinkSocket(NETLINK_ROUTE)
+    try:
+        for msg_type, body in sock.request(RTM_GETLINK, NLM_F_DUMP, IFINFO_HEADER.pack(0, 0, 0, 0, 0)):
+            table.apply(msg_type, body)
+        for msg_type, body in sock.request(RTM_GETROUTE, NLM_F_DUMP, RTMSG_HEADER.pack(0, 0, 0, 0, 0, 0, 0, 0, 0)):
+            table.apply(msg_type, body)
+    finally:
+        sock.close()
+    return table
+
+
+def get_default_interface() -> str | None:
+    """Name of the default-route interface, from a one-off rtnetlink dump."""
+    link = load_link_table().default_interface()
+    return link.name if link else None
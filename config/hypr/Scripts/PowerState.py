@@ -0,0 +1,183 @@
+"""
+Shared power-supply snapshot.
+A fixed-layout record in an mmap'd runtime file, guarded by a sequence counter.
+"""
+
+import mmap
+import os
+import struct
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from Utils import get_runtime_dir, read_file, worker_alive, SYSFS_ROOT
+
+
+SNAPSHOT_FILE: str = "power-state"
+SNAPSHOT_MAGIC: bytes = b"PWR1"
+SNAPSHOT_VERSION: int = 1
+
+# magic, version, batteries, seq, provider pid, status, capacity, time_to_empty, updated_ns
+SNAPSHOT_LAYOUT: struct.Struct = struct.Struct("<4sHHQIBBxxiq")
+SEQ_OFFSET: int = 8
+SEQ_LAYOUT: struct.Struct = struct.Struct("<Q")
+READ_RETRIES: int = 100
+
+STATUS_CODES: dict[str, int] = {
+    "Unknown": 0,
+    "Charging": 1,
+    "Discharging": 2,
+    "Full": 3,
+    "Not charging": 4,
+    "Empty": 5,
+}
+STATUS_NAMES: dict[int, str] = {code: name for name, code in STATUS_CODES.items()}
+
+POWER_SUPPLY_DIR: Path = SYSFS_ROOT / "class/power_supply"
+
+# Shared charging animation clock
+FRAME_INTERVAL: float = 1.0
+
+
+@dataclass(frozen=True, slots=True)
+class PowerSnapshot:
+    """Combined state of all batteries."""
+    status: str
+    capacity: int
+    time_to_empty: int = 0
+    batteries: int = 1
+    updated: float = 0.0
+
+
+def get_snapshot_path() -> Path:
+    return get_runtime_dir() / SNAPSHOT_FILE
+
+
+class SnapshotWriter:
+    """Publishes snapshots for readers in other processes."""
+
+    def __init__(self) -> None:
+        fd = os.open(get_snapshot_path(), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            os.ftruncate(fd, SNAPSHOT_LAYOUT.size)
+            self._map = mmap.mmap(fd, SNAPSHOT_LAYOUT.size)
+        finally:
+            os.close(fd)
+        self._seq = SEQ_LAYOUT.unpack_from(self._map, SEQ_OFFSET)[0] & ~1
+
+    def publish(self, snapshot: PowerSnapshot) -> None:
+        """Write a snapshot; the odd sequence value marks the write in progress."""
+        self._seq += 1
+        SEQ_LAYOUT.pack_into(self._map, SEQ_OFFSET, self._seq)
+        self._seq += 1
+        SNAPSHOT_LAYOUT.pack_into(
+            self._map, 0,
+            SNAPSHOT_MAGIC, SNAPSHOT_VERSION, snapshot.batteries, self._seq - 1, os.getpid(),
+            STATUS_CODES.get(snapshot.status, 0), snapshot.capacity, snapshot.time_to_empty,
+            time.time_ns()
+        )
+        SEQ_LAYOUT.pack_into(self._map, SEQ_OFFSET, self._seq)
+
+
+class SnapshotReader:
+    """Reads published snapshots without touching sysfs."""
+
+    def __init__(self) -> None:
+        self._map: mmap.mmap | None = None
+
+    def _open(self) -> bool:
+        try:
+            with open(get_snapshot_path(), "rb") as f:
+                self._map = mmap.mmap(f.fileno(), SNAPSHOT_LAYOUT.size, prot=mmap.PROT_READ)
+        except (OSError, ValueError):
+            return False
+        return True
+
+    def read(self) -> PowerSnapshot | None:
+        """
+        Return the latest snapshot.
+
+        Returns:
+            Snapshot, or None if no provider is running
+        """
+        if self._map is None and not self._open():
+            return None
+
+        for _ in range(READ_RETRIES):
+            seq = SEQ_LAYOUT.unpack_from(self._map, SEQ_OFFSET)[0]
+            if seq & 1:
+                continue
+            (magic, version, batteries, _, pid, status, capacity,
+             time_to_empty, updated) = SNAPSHOT_LAYOUT.unpack_from(self._map)
+            if SEQ_LAYOUT.unpack_from(self._map, SEQ_OFFSET)[0] != seq:
+                continue
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION or not worker_alive(pid):
+                return None
+            return PowerSnapshot(STATUS_NAMES.get(status, "Unknown"), capacity,
+                                 time_to_empty, batteries, updated / 1e9)
+        return None
+
+
+    def sequence(self) -> int | None:
+        """Publish counter of the snapshot file; it changes with every publish."""
+        if self._map is None and not self._open():
+            return None
+        return SEQ_LAYOUT.unpack_from(self._map, SEQ_OFFSET)[0]
+
+
+def sample_sysfs() -> PowerSnapshot | None:
+    """Read every battery directly from sysfs (used when no provider runs)."""
+    statuses = []
+    capacity_sum = weight_sum = 0.0
+    for bat_path in sorted(POWER_SUPPLY_DIR.glob("BAT*")):
+        try:
+            status = read_file(bat_path / "status").strip()
+            capacity = int(read_file(bat_path / "capacity").strip())
+        except (OSError, ValueError):
+            continue
+        try:
+            weight = int(read_file(bat_path / "energy_full").strip())
+        except (OSError, ValueError):
+            weight = 1
+        statuses.append(status)
+        capacity_sum += capacity * weight
+        weight_sum += weight
+
+    if not statuses:
+        return None
+    if "Charging" in statuses:
+        status = "Charging"
+    elif "Discharging" in statuses:
+        status = "Discharging"
+    else:
+        status = statuses[0]
+    return PowerSnapshot(status, round(capacity_sum / weight_sum), 0, len(statuses), time.time())
+
+
+_reader: SnapshotReader | None = None
+
+
+def get_power_state() -> PowerSnapshot | None:
+    """Get the published snapshot, falling back to sysfs if no provider runs."""
+    global _reader
+    if _reader is None:
+        _reader = SnapshotReader()
+    return _reader.read() or sample_sysfs()
+
+
+def get_snapshot_sequence() -> int | None:
+    """Publish counter of the shared snapshot, or None if there is none."""
+    global _reader
+    if _reader is None:
+        _reader = SnapshotReader()
+    return _reader.sequence()
+
+
+def charging_frame(capacity: int, now: float | None = None) -> int:
+    """
+    Charging animation frame (0-10) from the shared clock.
+    Cycles from the current level up to full, identically in every consumer.
+    """
+    start = min(capacity // 10, 10)
+    ticks = int((time.time() if now is None else now) / FRAME_INTERVAL)
+    return start + ticks % (11 - start)
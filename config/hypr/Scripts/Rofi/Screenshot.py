@@ -7,7 +7,7 @@ import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path.home() / ".config/hypr/Scripts"))
-from Utils import run_silent, run_with_input
+from Utils import run_silent, run_with_input, notify_and_wait
 from .Shared import ROFI_THEMES
 
 
@@ -42,18 +42,13 @@ def send_notification() -> bool:
     Returns True if the user clicked 'Edit'.
     """
     try:
-        output, _ = run_with_input(
-            [
-                "notify-send",
-                "-i", str(FULL_TEMP_PATH),
-                "Screenshot Taken",
-                "Click 'Edit' to open Swappy",
-                "--action=edit=Edit",
-                "--wait"
-            ],
-            ""
+        action = notify_and_wait(
+            str(FULL_TEMP_PATH),
+            "Screenshot Taken",
+            "Click 'Edit' to open Swappy",
+            {"edit": "Edit"}
         )
-        return output == "edit"
+        return action == "edit"
 
     except FileNotFoundError:
         return False
@@ -0,0 +1,62 @@
+"""
+Thin client forwarding a command to the script daemon.
+Falls back to running the script in-process when the daemon is down.
+
+Only C-level modules are imported on the fast path (_socket instead of
+socket, no json) so interpreter startup stays the dominant cost.
+"""
+
+import _socket
+import os
+import sys
+
+SCRIPTS_DIR: str = os.path.dirname(os.path.abspath(__file__))
+TIMEOUT: float = 1.0
+
+
+def encode_request(argv: list[str], env: dict[str, str]) -> bytes:
+    """Encode argv and environment as NUL separated fields, split by an empty field."""
+    fields = argv + [""] + [f"{key}={value}" for key, value in env.items()]
+    return "\0".join(fields).encode("utf-8", errors="surrogateescape")
+
+
+def forward(argv: list[str]) -> bool:
+    """Send argv to the daemon. Returns True if it accepted the command."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or f"/run/user/{os.getuid()}"
+    path = os.path.join(runtime_dir, "hypr-scripts", "daemon.sock")
+
+    sock = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+    try:
+        sock.settimeout(TIMEOUT)
+        sock.connect(path)
+        sock.sendall(encode_request(argv, dict(os.environ)))
+        sock.shutdown(_socket.SHUT_WR)
+        return sock.recv(16).startswith(b"ok")
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def main() -> None:
+    """Forward the command, or execute the script directly as a fallback."""
+    if len(sys.argv) < 2:
+        print("usage: Run.py <Script> [args...]", file=sys.stderr)
+        sys.exit(2)
+
+    if forward(sys.argv[1:]):
+        return
+
+    import runpy
+
+    sys.path.insert(0, SCRIPTS_DIR)
+    script = os.path.join(SCRIPTS_DIR, f"{sys.argv[1]}.py")
+    if not os.path.isfile(script):
+        print(f"Run.py: unknown script {sys.argv[1]}", file=sys.stderr)
+        sys.exit(2)
+    sys.argv = [script, *sys.argv[2:]]
+    runpy.run_path(script, run_name="__main__")
+
+
+if __name__ == "__main__":
+    main()
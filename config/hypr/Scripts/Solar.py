@@ -0,0 +1,104 @@
+"""
+Offline solar position calculations.
+Sunrise and sunset from the NOAA (Meeus) equations, accurate to about a minute.
+"""
+
+import math
+from datetime import date, datetime, timedelta, timezone
+
+
+# Apparent sunrise/sunset: refraction plus the solar disc radius
+SUNRISE_ZENITH: float = 90.833
+
+JULIAN_EPOCH_J2000: float = 2451545.0
+UNIX_EPOCH_JD: float = 2440587.5
+ITERATIONS: int = 3
+
+
+def julian_day(when: datetime) -> float:
+    """Julian day of an aware datetime."""
+    return UNIX_EPOCH_JD + when.timestamp() / 86400
+
+
+def solar_coordinates(jd: float) -> tuple[float, float]:
+    """
+    Solar declination and equation of time for a Julian day.
+
+    Returns:
+        (declination in radians, equation of time in minutes)
+    """
+    t = (jd - JULIAN_EPOCH_J2000) / 36525
+
+    mean_long = math.radians((280.46646 + t * (36000.76983 + t * 0.0003032)) % 360)
+    mean_anom = math.radians(357.52911 + t * (35999.05029 - 0.0001537 * t))
+    eccent = 0.016708634 - t * (0.000042037 + 0.0000001267 * t)
+
+    center = (math.sin(mean_anom) * (1.914602 - t * (0.004817 + 0.000014 * t))
+              + math.sin(2 * mean_anom) * (0.019993 - 0.000101 * t)
+              + math.sin(3 * mean_anom) * 0.000289)
+    omega = math.radians(125.04 - 1934.136 * t)
+    apparent_long = math.radians(math.degrees(mean_long) + center - 0.00569 - 0.00478 * math.sin(omega))
+
+    seconds = 21.448 - t * (46.815 + t * (0.00059 - t * 0.001813))
+    obliquity = math.radians(23 + (26 + seconds / 60) / 60 + 0.00256 * math.cos(omega))
+    declination = math.asin(math.sin(obliquity) * math.sin(apparent_long))
+
+    y = math.tan(obliquity / 2) ** 2
+    eq_time = 4 * math.degrees(
+        y * math.sin(2 * mean_long)
+        - 2 * eccent * math.sin(mean_anom)
+        + 4 * eccent * y * math.sin(mean_anom) * math.cos(2 * mean_long)
+        - 0.5 * y * y * math.sin(4 * mean_long)
+        - 1.25 * eccent * eccent * math.sin(2 * mean_anom)
+    )
+    return declination, eq_time
+
+
+def _event_minutes(day: date, latitude: float, longitude: float, rising: bool) -> float | None:
+    """UTC minutes after midnight of a sunrise or sunset, refined at the event time."""
+    midnight = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+    lat = math.radians(latitude)
+    minutes = 720 - 4 * longitude
+
+    for _ in range(ITERATIONS):
+        declination, eq_time = solar_coordinates(julian_day(midnight + timedelta(minutes=minutes)))
+        cos_hour = (math.cos(math.radians(SUNRISE_ZENITH)) / (math.cos(lat) * math.cos(declination))
+                    - math.tan(lat) * math.tan(declination))
+        if not -1 <= cos_hour <= 1:
+            return None
+        hour_angle = math.degrees(math.acos(cos_hour))
+        minutes = 720 - 4 * (longitude + (hour_angle if rising else -hour_angle)) - eq_time
+    return minutes
+
+
+def sun_times(day: date, latitude: float, longitude: float) -> tuple[datetime, datetime] | None:
+    """
+    Sunrise and sunset on a UTC calendar day.
+
+    Args:
+        day: Date of the solar noon in question
+        latitude: Degrees north
+        longitude: Degrees east
+
+    Returns:
+        (sunrise, sunset) as UTC datetimes, or None during polar day or night
+    """
+    sunrise = _event_minutes(day, latitude, longitude, rising=True)
+    sunset = _event_minutes(day, latitude, longitude, rising=False)
+    if sunrise is None or sunset is None:
+        return None
+    midnight = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+    return midnight + timedelta(minutes=sunrise), midnight + timedelta(minutes=sunset)
+
+
+def solar_elevation(when: datetime, latitude: float, longitude: float) -> float:
+    """Geometric elevation of the sun in degrees."""
+    declination, eq_time = solar_coordinates(julian_day(when))
+    utc = when.astimezone(timezone.utc)
+    minutes = utc.hour * 60 + utc.minute + utc.second / 60
+    hour_angle = math.radians((minutes + eq_time + 4 * longitude) / 4 - 180)
+    lat = math.radians(latitude)
+    return math.degrees(math.asin(
+        math.sin(lat) * math.sin(declination)
+        + math.cos(lat) * math.cos(declination) * math.cos(hour_angle)
+    ))
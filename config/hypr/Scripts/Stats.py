@@ -0,0 +1,105 @@
+"""
+Subprocess statistics report.
+Summarizes the histograms written by the Utils run_* wrappers when HYPR_PROFILE=1.
+"""
+
+import argparse
+import json
+
+from Utils import STATS_DIR
+
+
+class CommandTotals:
+    """Aggregated calls of one command across processes."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total_us = 0
+        self.failures = 0
+        self.captured = 0
+        self.buckets: dict[int, int] = {}
+        self.scripts: set[str] = set()
+
+    def add(self, script: str, entry: list) -> None:
+        calls, total_us, failures, captured, buckets = entry
+        self.calls += calls
+        self.total_us += total_us
+        self.failures += failures
+        self.captured += captured
+        self.scripts.add(script)
+        for bucket, count in buckets.items():
+            self.buckets[int(bucket)] = self.buckets.get(int(bucket), 0) + count
+
+    def percentile_ms(self, pct: float) -> float:
+        """Approximate percentile from the log2 buckets (upper bucket bound)."""
+        target = self.calls * pct
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= target:
+                return (1 << bucket) / 1000
+        return 0.0
+
+
+def load_totals(script: str | None = None) -> dict[str, CommandTotals]:
+    """Read every stats file (or one script's) and aggregate per command."""
+    totals: dict[str, CommandTotals] = {}
+    if not STATS_DIR.exists():
+        return totals
+
+    for path in STATS_DIR.glob("*.log"):
+        if script and path.stem != script:
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                for command, entry in record.get("c", {}).items():
+                    totals.setdefault(command, CommandTotals()).add(path.stem, entry)
+    return totals
+
+
+def print_report(top: int, sort_by: str, script: str | None) -> None:
+    """Print the top commands by total time or call count."""
+    totals = load_totals(script)
+    if not totals:
+        print(f"No stats in {STATS_DIR} (run scripts with HYPR_PROFILE=1)")
+        return
+
+    key = (lambda item: item[1].total_us) if sort_by == "time" else (lambda item: item[1].calls)
+    rows = sorted(totals.items(), key=key, reverse=True)[:top]
+
+    print(f"{'command':<22}{'calls':>8}{'total ms':>10}{'mean ms':>10}{'p95 ms':>9}"
+          f"{'fail':>6}{'KiB':>8}  scripts")
+    for command, t in rows:
+        print(f"{command:<22}{t.calls:>8}{t.total_us / 1000:>10.1f}{t.total_us / t.calls / 1000:>10.2f}"
+              f"{t.percentile_ms(0.95):>9.1f}{t.failures:>6}{t.captured / 1024:>8.1f}  "
+              f"{', '.join(sorted(t.scripts))}")
+
+
+def reset() -> None:
+    """Delete all collected stats."""
+    for path in STATS_DIR.glob("*.log"):
+        path.unlink()
+
+
+def main() -> None:
+    """Parse arguments and print the subprocess report."""
+    parser = argparse.ArgumentParser(description="Subprocess cost report")
+    parser.add_argument("--top", type=int, default=15, help="Number of commands to show")
+    parser.add_argument("--by", choices=["time", "count"], default="time", help="Sort order")
+    parser.add_argument("--script", type=str, help="Only include one script")
+    parser.add_argument("--reset", action="store_true", help="Delete collected stats")
+
+    args = parser.parse_args()
+
+    if args.reset:
+        reset()
+    else:
+        print_report(args.top, args.by, args.script)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,23 @@ Utility functions for Hyprland scripts.
 Provides common helpers for notifications, file operations, process management, and logging.
 """
 
+import atexit
+import fcntl
 import json
 import logging
+import os
+import select
+import signal
+import socket
 import subprocess
+import sys
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import datetime
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 
 # Logging configuration
@@ -19,6 +29,9 @@ LOG_DATE_FORMAT: str = "%Y-%m-%d %H:%M:%S"
 LOG_MAX_BYTES: int = 1024 * 1024  # 1MB per file
 LOG_BACKUP_COUNT: int = 3  # Keep 3 rotated files
 
+# Root of sysfs; overridable so readers can run against a fixture tree
+SYSFS_ROOT: Path = Path(os.environ.get("HYPR_SYSFS_ROOT", "/sys"))
+
 
 def setup_logging() -> None:
     """Initialize the logging directory."""
@@ -84,13 +97,145 @@ def clean_old_logs(days: int = 7) -> None:
         if log_file.stat().st_mtime < cutoff:
             log_file.unlink()
 
+NOTIFY_BUS: str = "org.freedesktop.Notifications"
+NOTIFY_PATH: str = "/org/freedesktop/Notifications"
+NOTIFY_SYNC_TAG: str = "sys_notif"
+URGENCY_LEVELS: dict[str, int] = {"low": 0, "normal": 1, "critical": 2}
+
+# Last notification id per synchronous tag, mirrored to the runtime dir
+# so separate invocations replace each other instead of stacking
+_notification_ids: dict[str, int] = {}
+
+
+def get_runtime_dir() -> Path:
+    """Get the per-user runtime directory for script state, creating it if needed."""
+    base = os.environ.get("XDG_RUNTIME_DIR") or f"/run/user/{os.getuid()}"
+    path = Path(base) / "hypr-scripts"
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    return path
+
+
+@contextmanager
+def runtime_lock(name: str) -> Iterator[None]:
+    """Hold an exclusive flock on <runtime dir>/<name>.lock for the block."""
+    fd = os.open(get_runtime_dir() / f"{name}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+def load_worker_state(name: str, default: dict) -> dict:
+    """Read <runtime dir>/<name>.json, or a copy of default (caller must hold the lock)."""
+    try:
+        return json.loads((get_runtime_dir() / f"{name}.json").read_text())
+    except (OSError, ValueError):
+        return dict(default)
+
+
+def save_worker_state(name: str, state: dict) -> None:
+    write_atomic(get_runtime_dir() / f"{name}.json", json.dumps(state))
+
+
+def worker_alive(pid: int) -> bool:
+    """Whether the process that claimed a worker role still exists."""
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _load_notification_id(tag: str) -> int:
+    if tag not in _notification_ids:
+        try:
+            _notification_ids[tag] = int(read_file(get_runtime_dir() / f"notify-{tag}.id"))
+        except (OSError, ValueError):
+            _notification_ids[tag] = 0
+    return _notification_ids[tag]
+
+
+def _save_notification_id(tag: str, notification_id: int) -> None:
+    if _notification_ids.get(tag) == notification_id:
+        return
+    _notification_ids[tag] = notification_id
+    try:
+        (get_runtime_dir() / f"notify-{tag}.id").write_text(str(notification_id))
+    except OSError:
+        pass
+
+
+def send_notification(
+    summary: str,
+    body: str = "",
+    icon: str = "",
+    level: str = "low",
+    app_name: str = "notify-send",
+    hints: dict[str, Any] | None = None,
+    actions: dict[str, str] | None = None,
+    tag: str | None = None,
+    expire_timeout: int = -1,
+) -> int | None:
+    """
+    Send a notification over the session bus without spawning notify-send.
+    
+    Args:
+        summary: Notification title
+        body: Notification body
+        icon: Icon name or path
+        level: Urgency ("low", "normal" or "critical")
+        app_name: Application name shown by the server
+        hints: Extra hints; values may be DBus.Variant for explicit types
+        actions: Mapping of action key to label
+        tag: Synchronous tag; notifications sharing a tag replace each other
+        expire_timeout: Timeout in ms (-1 = server default)
+        
+    Returns:
+        Notification id, or None if the bus is unavailable
+    """
+    from DBus import DBusError, Variant, session_bus
+
+    all_hints: dict[str, Any] = {"urgency": Variant("y", URGENCY_LEVELS.get(level, 1))}
+    if tag:
+        all_hints["x-canonical-private-synchronous"] = tag
+    all_hints.update(hints or {})
+
+    action_list: list[str] = []
+    for key, label in (actions or {}).items():
+        action_list.extend([key, label])
+
+    replaces_id = _load_notification_id(tag) if tag else 0
+    try:
+        notification_id = session_bus().call(
+            NOTIFY_BUS, NOTIFY_PATH, NOTIFY_BUS, "Notify", "susssasa{sv}i",
+            app_name, replaces_id, icon, summary, body, action_list, all_hints, expire_timeout
+        )[0]
+    except (DBusError, OSError):
+        # OSError covers a notification daemon that never answers (TimeoutError)
+        return None
+
+    if tag:
+        _save_notification_id(tag, notification_id)
+    return notification_id
+
+
 def notify(icon: str, msg: str, level: str = "low") -> None:
-    """Send a desktop notification using notify-send."""
+    """Send a desktop notification."""
+    hints = {"transient": True}
+    if send_notification(msg, icon=icon, level=level, app_name="volume-notify",
+                         hints=hints, tag=NOTIFY_SYNC_TAG) is not None:
+        return
+
     run_silent([
         "notify-send",
         "-e",
         "-a", "volume-notify",
-        "-h", "string:x-canonical-private-synchronous:sys_notif",
+        "-h", f"string:x-canonical-private-synchronous:{NOTIFY_SYNC_TAG}",
         "-u", level,
         "-i", icon,
         msg
@@ -99,11 +244,16 @@ def notify(icon: str, msg: str, level: str = "low") -> None:
 
 def notify_with_progress(icon: str, msg: str, value: int, level: str = "low") -> None:
     """Send a desktop notification with a progress bar."""
+    hints = {"transient": True, "value": value, "category": "custom"}
+    if send_notification(msg, icon=icon, level=level, hints=hints,
+                         tag=NOTIFY_SYNC_TAG) is not None:
+        return
+
     run_silent([
         "notify-send",
         "-e",
         "-h", f"int:value:{value}",
-        "-h", "string:x-canonical-private-synchronous:sys_notif",
+        "-h", f"string:x-canonical-private-synchronous:{NOTIFY_SYNC_TAG}",
         "-c", "custom",
         "-u", level,
         "-i", icon,
@@ -111,6 +261,58 @@ def notify_with_progress(icon: str, msg: str, value: int, level: str = "low") ->
     ])
 
 
+def notify_and_wait(
+    icon: str,
+    summary: str,
+    body: str,
+    actions: dict[str, str],
+    timeout: float | None = None,
+) -> str | None:
+    """
+    Send a notification with actions and block until it is answered.
+    Equivalent to notify-send --wait with --action options.
+    
+    Returns:
+        Key of the invoked action, or None if dismissed or timed out
+    """
+    from DBus import DBusError, Connection
+
+    try:
+        # A private connection keeps the signal subscription scoped to this call
+        conn = Connection.session()
+    except DBusError:
+        action_args = [f"--action={key}={label}" for key, label in actions.items()]
+        output, _ = run_with_input(
+            ["notify-send", "-i", icon, summary, body, *action_args, "--wait"], ""
+        )
+        return output or None
+
+    try:
+        conn.add_match(interface=NOTIFY_BUS, path=NOTIFY_PATH)
+        action_list = [item for pair in actions.items() for item in pair]
+        notification_id = conn.call(
+            NOTIFY_BUS, NOTIFY_PATH, NOTIFY_BUS, "Notify", "susssasa{sv}i",
+            "notify-send", 0, icon, summary, body, action_list, {}, -1
+        )[0]
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            signal_msg = conn.next_signal(remaining)
+            if signal_msg is None or not signal_msg.body or signal_msg.body[0] != notification_id:
+                continue
+            if signal_msg.member == "ActionInvoked":
+                return signal_msg.body[1]
+            if signal_msg.member == "NotificationClosed":
+                return None
+    except DBusError:
+        return None
+    finally:
+        conn.close()
+
+
 def read_file(path: str | Path) -> str:
     """Read and return the contents of a file."""
     with open(path, "r", encoding="utf-8") as f:
@@ -138,14 +340,46 @@ def read_config(path: str | Path) -> dict[str, str] | None:
 
 
 def get_pid(process: str) -> str:
-    """Get the PID of a running process."""
-    stdout, _, _ = run_capture(["pidof", process])
-    return stdout
+    """Get the PIDs of a running process, space separated like pidof."""
+    return " ".join(str(pid) for pid in pids_of(process)[process])
 
 
-def kill_all(process: str) -> None:
-    """Terminate all instances of a process quietly and wait for completion."""
-    run_silent(["killall", "-qw", process])
+def kill_all(process: str, sig: int = signal.SIGTERM, timeout: float | None = None) -> None:
+    """
+    Terminate all instances of a process quietly and wait for completion.
+    Signals are delivered through pidfds so a recycled PID is never hit.
+
+    Args:
+        process: Process name as matched by get_pid
+        sig: Signal to send (default: SIGTERM)
+        timeout: Maximum seconds to wait for exit (default: wait indefinitely)
+    """
+    pidfds: list[int] = []
+    for pid in pids_of(process)[process]:
+        try:
+            pidfd = os.pidfd_open(pid)
+        except ProcessLookupError:
+            continue
+        except OSError:
+            # pidfd unsupported, fall back to a plain kill
+            try:
+                os.kill(pid, sig)
+            except (ProcessLookupError, PermissionError):
+                pass
+            continue
+
+        try:
+            signal.pidfd_send_signal(pidfd, sig)
+            pidfds.append(pidfd)
+        except (ProcessLookupError, PermissionError):
+            os.close(pidfd)
+
+    _invalidate_pid_index()
+    try:
+        _wait_pidfds(pidfds, timeout)
+    finally:
+        for pidfd in pidfds:
+            os.close(pidfd)
 
 
 def load_json(data: str) -> Any:
@@ -159,13 +393,227 @@ def write_json(data: Any, path: str | Path) -> None:
         json.dump(data, f, indent=2)
 
 
+def write_atomic(path: str | Path, data: str | bytes) -> None:
+    """
+    Replace a file's contents atomically.
+    Readers see either the old or the new file, never a partial write.
+    """
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    mode = "wb" if isinstance(data, bytes) else "w"
+    with open(tmp, mode, **({} if isinstance(data, bytes) else {"encoding": "utf-8"})) as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+# =============================================================================
+# Cache Utilities
+# =============================================================================
+
+CACHE_DIR: Path = Path.home() / ".cache/hypr/cache"
+CACHE_LOCK_TIMEOUT: float = 10.0
+
+
+def _cache_path(key: str) -> Path:
+    return CACHE_DIR / f"{key}.json"
+
+
+def _load_cache_entry(key: str) -> dict:
+    try:
+        return json.loads(read_file(_cache_path(key)))
+    except (OSError, ValueError):
+        return {}
+
+
+def _lock_cache(key: str, blocking: bool) -> int | None:
+    """Take the per-key refresh lock. Returns the lock fd, or None if unavailable."""
+    fd = os.open(CACHE_DIR / f"{key}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+    deadline = time.monotonic() + CACHE_LOCK_TIMEOUT
+    while True:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return fd
+        except BlockingIOError:
+            if not blocking or time.monotonic() > deadline:
+                os.close(fd)
+                return None
+            time.sleep(0.05)
+
+
+def _refresh_cache(
+    key: str,
+    fetch: Callable[[], str | None],
+    ttl: float,
+    error_ttl: float,
+    max_error_ttl: float,
+    blocking: bool,
+) -> dict:
+    """
+    Fetch a new value under the key's lock and store it.
+    Failures keep the previous value and back off exponentially.
+    """
+    fd = _lock_cache(key, blocking)
+    if fd is None:
+        return _load_cache_entry(key)
+
+    try:
+        # Another process may have refreshed while we waited for the lock
+        entry = _load_cache_entry(key)
+        now = time.time()
+        if entry.get("expires", 0) > now or entry.get("retry_at", 0) > now:
+            return entry
+
+        try:
+            value = fetch()
+        except Exception:
+            value = None
+
+        if value is not None:
+            entry = {"value": value, "fetched": now, "expires": now + ttl, "failures": 0}
+        else:
+            failures = entry.get("failures", 0) + 1
+            entry["failures"] = failures
+            entry["retry_at"] = now + min(error_ttl * 2 ** (failures - 1), max_error_ttl)
+
+        write_atomic(_cache_path(key), json.dumps(entry))
+        return entry
+    finally:
+        os.close(fd)
+
+
+def spawn_detached(func: Callable[[], Any]) -> None:
+    """Run func in a detached grandchild so the caller can return immediately."""
+    pid = os.fork()
+    if pid:
+        os.waitpid(pid, 0)
+        return
+
+    try:
+        os.setsid()
+        if os.fork() == 0:
+            # Detach from the caller's pipes (hyprlock waits for EOF on stdout)
+            devnull = os.open(os.devnull, os.O_RDWR)
+            for fd in (0, 1, 2):
+                os.dup2(devnull, fd)
+            func()
+    finally:
+        os._exit(0)
+
+
+def cached(
+    key: str,
+    fetch: Callable[[], str | None],
+    ttl: float,
+    error_ttl: float = 60,
+    max_error_ttl: float = 3600,
+    stale_while_revalidate: bool = False,
+    default: str | None = None,
+) -> str | None:
+    """
+    Return a value from the file-backed cache, fetching it when expired.
+    
+    Args:
+        key: Cache key (used as file name under CACHE_DIR)
+        fetch: Produces a fresh value, or None on failure
+        ttl: Seconds a fetched value stays fresh
+        error_ttl: Initial seconds to wait before retrying after a failure
+        max_error_ttl: Upper bound for the exponential failure backoff
+        stale_while_revalidate: Return an expired value at once and refresh
+            it in a detached process instead of blocking on fetch
+        default: Returned when no value has ever been fetched
+        
+    Returns:
+        Cached or freshly fetched value, or default
+    """
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    entry = _load_cache_entry(key)
+    now = time.time()
+
+    fresh = entry.get("expires", 0) > now
+    backing_off = entry.get("retry_at", 0) > now
+    if fresh or backing_off:
+        return entry.get("value", default)
+
+    def refresh() -> dict:
+        return _refresh_cache(key, fetch, ttl, error_ttl, max_error_ttl,
+                              blocking=not stale_while_revalidate)
+
+    if stale_while_revalidate and "value" in entry:
+        spawn_detached(refresh)
+        return entry["value"]
+
+    return refresh().get("value", default)
+
+
 # =============================================================================
 # Hyprland Utilities
 # =============================================================================
 
+HYPR_SOCKET: str = ".socket.sock"
+HYPR_SOCKET_TIMEOUT: float = 2.0
+HYPR_RECV_SIZE: int = 65536
+
+_hypr_dir: Path | None = None
+
+
+def get_hypr_dir() -> Path | None:
+    """
+    Resolve the runtime directory of the running Hyprland instance.
+    The result is cached for the lifetime of the process.
+
+    Returns:
+        Instance directory, or None when not running under Hyprland
+    """
+    global _hypr_dir
+    if _hypr_dir is not None:
+        return _hypr_dir
+
+    signature = os.environ.get("HYPRLAND_INSTANCE_SIGNATURE")
+    if not signature:
+        return None
+
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR", f"/run/user/{os.getuid()}")
+    for base in (Path(runtime_dir) / "hypr", Path("/tmp/hypr")):
+        if (base / signature).is_dir():
+            _hypr_dir = base / signature
+            return _hypr_dir
+    return None
+
+
+def hypr_request(request: str, socket_name: str = HYPR_SOCKET) -> str | None:
+    """
+    Send a raw request over a Hyprland IPC socket and return the reply.
+    Hyprland answers one request per connection, so each call opens a fresh one.
+
+    Args:
+        request: Request string as hyprctl would send it (e.g. "j/monitors")
+        socket_name: Socket file inside the instance directory
+
+    Returns:
+        Reply text, or None if the socket is unreachable
+    """
+    hypr_dir = get_hypr_dir()
+    if hypr_dir is None:
+        return None
+
+    chunks: list[bytes] = []
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(HYPR_SOCKET_TIMEOUT)
+            sock.connect(str(hypr_dir / socket_name))
+            sock.sendall(request.encode("utf-8"))
+            while chunk := sock.recv(HYPR_RECV_SIZE):
+                chunks.append(chunk)
+    except OSError:
+        return None
+
+    return b"".join(chunks).decode("utf-8", errors="replace")
+
+
 def hyprctl(*args: str, json_output: bool = False) -> str | dict | list:
     """
     Execute a hyprctl command and return the output.
+    Uses the IPC socket directly and falls back to the hyprctl binary.
     
     Args:
         *args: Arguments to pass to hyprctl
@@ -174,11 +622,16 @@ def hyprctl(*args: str, json_output: bool = False) -> str | dict | list:
     Returns:
         Command output as string or parsed JSON
     """
-    cmd = ["hyprctl"] + list(args)
-    if json_output:
-        cmd.append("-j")
-    
-    stdout, _, _ = run_capture(cmd)
+    request = ("j/" if json_output else "") + " ".join(args)
+    stdout = hypr_request(request)
+
+    if stdout is None:
+        cmd = ["hyprctl"] + list(args)
+        if json_output:
+            cmd.append("-j")
+        stdout, _, _ = run_capture(cmd)
+    else:
+        stdout = stdout.strip()
     
     if json_output:
         return json.loads(stdout) if stdout else {}
@@ -187,18 +640,21 @@ def hyprctl(*args: str, json_output: bool = False) -> str | dict | list:
 
 def hyprctl_keyword(keyword: str, value: str) -> None:
     """Set a Hyprland keyword value."""
-    run_silent(["hyprctl", "keyword", keyword, value])
+    if hypr_request(f"keyword {keyword} {value}") is None:
+        run_silent(["hyprctl", "keyword", keyword, value])
 
 
 def hyprctl_batch(*commands: str) -> None:
     """Execute multiple hyprctl commands in batch."""
     batch_cmd = ";".join(commands)
-    run_silent(["hyprctl", "--batch", batch_cmd])
+    if hypr_request(f"[[BATCH]]{batch_cmd}") is None:
+        run_silent(["hyprctl", "--batch", batch_cmd])
 
 
 def hyprctl_reload() -> None:
     """Reload Hyprland configuration."""
-    run_silent(["hyprctl", "reload"])
+    if hypr_request("reload") is None:
+        run_silent(["hyprctl", "reload"])
 
 
 def get_monitors() -> list[dict]:
@@ -211,23 +667,216 @@ def get_active_window() -> dict:
     return hyprctl("activewindow", json_output=True)
 
 
+THEME_VARS: Path = Path.home() / ".config/hypr/Themes/ThemeVariables.conf"
+DEFAULT_THEME_DIR: Path = Path.home() / ".config/hypr/Themes/NierAutomata"
+THEME_CACHE_FILE: str = "theme-dir"
+
+# (inode, mtime_ns, size) of ThemeVariables.conf -> resolved theme directory
+_theme_memo: tuple[tuple[int, int, int], Path] | None = None
+
+
+def _parse_theme_vars(content: str) -> Path:
+    for line in content.splitlines():
+        if "$theme_dir" in line and "=" in line:
+            path = line.split("=", 1)[1].strip()
+            path = path.replace("$HOME", str(Path.home()))
+            return Path(path)
+    return DEFAULT_THEME_DIR
+
+
 def get_theme_dir() -> Path:
-    """Get the current theme directory path."""
-    theme_vars = Path.home() / ".config/hypr/Themes/ThemeVariables.conf"
-    if theme_vars.exists():
-        content = theme_vars.read_text()
-        for line in content.splitlines():
-            if "$theme_dir" in line and "=" in line:
-                path = line.split("=", 1)[1].strip()
-                path = path.replace("$HOME", str(Path.home()))
-                return Path(path)
-    return Path.home() / ".config/hypr/Themes/NierAutomata"
+    """
+    Get the current theme directory path.
+    The result is memoized per process and persisted in the runtime directory,
+    keyed on the inode, mtime and size of ThemeVariables.conf.
+    """
+    global _theme_memo
+
+    try:
+        st = THEME_VARS.stat()
+    except OSError:
+        return DEFAULT_THEME_DIR
+    key = (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    if _theme_memo is not None and _theme_memo[0] == key:
+        return _theme_memo[1]
+
+    stamp = "{}:{}:{}".format(*key)
+    cache_file = None
+    try:
+        # An unusable runtime dir only costs the cache, never the lookup
+        cache_file = get_runtime_dir() / THEME_CACHE_FILE
+        cached_stamp, _, cached_path = read_file(cache_file).partition("\t")
+        if cached_stamp == stamp and cached_path:
+            _theme_memo = (key, Path(cached_path))
+            return _theme_memo[1]
+    except OSError:
+        pass
+
+    try:
+        theme_dir = _parse_theme_vars(THEME_VARS.read_text())
+    except OSError:
+        return DEFAULT_THEME_DIR
+
+    _theme_memo = (key, theme_dir)
+    if cache_file is not None:
+        try:
+            write_atomic(cache_file, f"{stamp}\t{theme_dir}")
+        except OSError:
+            pass
+    return theme_dir
+
+
+def invalidate_theme_dir() -> None:
+    """Drop the memoized theme directory so the next call re-resolves it."""
+    global _theme_memo
+    _theme_memo = None
+
+
+# =============================================================================
+# Inotify Utilities
+# =============================================================================
+
+IN_MODIFY: int = 0x002
+IN_CLOSE_WRITE: int = 0x008
+IN_MOVED_TO: int = 0x080
+IN_CREATE: int = 0x100
+IN_NONBLOCK: int = 0o4000
+IN_CLOEXEC: int = 0o2000000
+
+_INOTIFY_EVENT_SIZE: int = 16  # int wd; u32 mask, cookie, len
+
+
+class Inotify:
+    """Minimal non-blocking inotify wrapper over libc via ctypes."""
+
+    def __init__(self) -> None:
+        import ctypes
+
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watches: dict[int, Path] = {}
+
+    def add_watch(self, path: str | Path, mask: int) -> int:
+        """Watch a file or directory. Returns the watch descriptor."""
+        import ctypes
+
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+        self._watches[wd] = Path(path)
+        return wd
+
+    def fileno(self) -> int:
+        return self.fd
+
+    def read(self) -> list[tuple[Path, int, str]]:
+        """
+        Drain pending events without blocking.
+
+        Returns:
+            (watched path, mask, name) for each event
+        """
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 4096)
+            except BlockingIOError:
+                return events
+
+            offset = 0
+            while offset + _INOTIFY_EVENT_SIZE <= len(data):
+                wd = int.from_bytes(data[offset:offset + 4], sys.byteorder, signed=True)
+                mask = int.from_bytes(data[offset + 4:offset + 8], sys.byteorder)
+                length = int.from_bytes(data[offset + 12:offset + 16], sys.byteorder)
+                start = offset + _INOTIFY_EVENT_SIZE
+                name = data[start:start + length].rstrip(b"\0").decode("utf-8", errors="replace")
+                events.append((self._watches.get(wd, Path()), mask, name))
+                offset = start + length
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class ThemeWatcher:
+    """
+    Notices theme switches in long-lived processes.
+    Watches the Themes directory, since ThemeVariables.conf may be rewritten
+    in place or replaced by rename.
+    """
+
+    def __init__(self) -> None:
+        self._inotify = Inotify()
+        self._inotify.add_watch(THEME_VARS.parent, IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE)
+
+    def fileno(self) -> int:
+        return self._inotify.fileno()
+
+    def changed(self) -> bool:
+        """Drain pending events and return True if the theme variables changed."""
+        changed = any(name == THEME_VARS.name for _, _, name in self._inotify.read())
+        if changed:
+            invalidate_theme_dir()
+        return changed
 
 
 # =============================================================================
 # Process Utilities
 # =============================================================================
 
+# Opt-in subprocess instrumentation (HYPR_PROFILE=1)
+STATS_DIR: Path = Path.home() / ".cache/hypr/stats"
+PROFILE_ENABLED: bool = os.environ.get("HYPR_PROFILE", "0") not in ("", "0")
+
+# command -> [calls, total_us, failures, bytes_captured, {log2_us_bucket: calls}]
+_command_stats: dict[str, list] = {}
+
+
+def _record_call(name: str, start: float, returncode: int, captured: int = 0) -> None:
+    """Add one subprocess call to the in-memory histogram when profiling is on."""
+    if not PROFILE_ENABLED:
+        return
+
+    elapsed_us = int((time.perf_counter() - start) * 1_000_000)
+    entry = _command_stats.get(name)
+    if entry is None:
+        if not _command_stats:
+            atexit.register(flush_stats)
+        entry = _command_stats[name] = [0, 0, 0, 0, {}]
+
+    entry[0] += 1
+    entry[1] += elapsed_us
+    entry[2] += returncode != 0
+    entry[3] += captured
+    bucket = elapsed_us.bit_length()
+    entry[4][bucket] = entry[4].get(bucket, 0) + 1
+
+
+def _command_name(cmd: list[str]) -> str:
+    return os.path.basename(cmd[0]) if cmd else "?"
+
+
+def flush_stats() -> None:
+    """
+    Append this process's subprocess histogram to the per-script stats file.
+    One compact JSON line per process; called automatically at exit.
+    """
+    if not _command_stats:
+        return
+
+    script = Path(sys.argv[0]).stem or "python"
+    record = {"t": int(time.time()), "c": _command_stats}
+    try:
+        STATS_DIR.mkdir(parents=True, exist_ok=True)
+        with open(STATS_DIR / f"{script}.log", "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+    except OSError:
+        pass
+    _command_stats.clear()
+
+
 def run_bg(cmd: list[str], **kwargs) -> subprocess.Popen:
     """
     Run a command in background with suppressed output.
@@ -244,21 +893,113 @@ def run_bg(cmd: list[str], **kwargs) -> subprocess.Popen:
         "stderr": subprocess.DEVNULL,
     }
     defaults.update(kwargs)
-    return subprocess.Popen(cmd, **defaults)
+    _invalidate_pid_index()
+    start = time.perf_counter()
+    process = subprocess.Popen(cmd, **defaults)
+    # Only the spawn cost is known for background processes
+    _record_call(_command_name(cmd), start, 0)
+    return process
+
+
+PROC_DIR: str = "/proc"
+PID_INDEX_TTL: float = 0.25  # Seconds a /proc scan stays valid
+COMM_MAX_LEN: int = 15  # Kernel truncates comm to TASK_COMM_LEN - 1
+
+_pid_index: dict[str, list[int]] = {}
+_pid_index_time: float = 0.0
+
+
+def _scan_processes() -> dict[str, list[int]]:
+    """
+    Build a name -> PIDs index from a single pass over /proc.
+    Processes are indexed by comm; when comm is truncated the basename of
+    argv[0] is indexed as well, matching pidof behaviour.
+    """
+    index: dict[str, list[int]] = {}
+    self_pid = os.getpid()
+
+    with os.scandir(PROC_DIR) as entries:
+        for entry in entries:
+            if not entry.name.isdigit():
+                continue
+            pid = int(entry.name)
+            if pid == self_pid:
+                continue
+            try:
+                with open(f"{PROC_DIR}/{pid}/comm", "rb") as f:
+                    comm = f.read().rstrip(b"\n").decode("utf-8", errors="replace")
+                index.setdefault(comm, []).append(pid)
+
+                if len(comm) >= COMM_MAX_LEN:
+                    with open(f"{PROC_DIR}/{pid}/cmdline", "rb") as f:
+                        argv0 = f.read().split(b"\0", 1)[0]
+                    name = os.path.basename(argv0).decode("utf-8", errors="replace")
+                    if name and name != comm:
+                        index.setdefault(name, []).append(pid)
+            except OSError:
+                continue
+
+    for pids in index.values():
+        pids.sort(reverse=True)
+    return index
+
+
+def _invalidate_pid_index() -> None:
+    """Drop the cached process index after spawning or killing processes."""
+    global _pid_index_time
+    _pid_index_time = 0.0
+
+
+def _wait_pidfds(pidfds: list[int], timeout: float | None) -> None:
+    """Block until every pidfd reports process exit or the timeout expires."""
+    poller = select.poll()
+    for pidfd in pidfds:
+        poller.register(pidfd, select.POLLIN)
+
+    pending = len(pidfds)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while pending:
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        events = poller.poll(None if remaining is None else remaining * 1000)
+        if not events:
+            return
+        for fd, _ in events:
+            poller.unregister(fd)
+            pending -= 1
+
+
+def pids_of(*names: str) -> dict[str, list[int]]:
+    """
+    Resolve several process names with a single /proc pass.
+    The index is reused for PID_INDEX_TTL seconds within the process.
+
+    Returns:
+        Mapping of each name to its PIDs (newest first, empty if not running)
+    """
+    global _pid_index, _pid_index_time
+
+    now = time.monotonic()
+    if now - _pid_index_time > PID_INDEX_TTL:
+        _pid_index = _scan_processes()
+        _pid_index_time = now
+
+    return {name: list(_pid_index.get(name, [])) for name in names}
 
 
 def is_running(process: str) -> bool:
     """Check if a process is currently running."""
-    return bool(get_pid(process))
+    return bool(pids_of(process)[process])
 
 
 def run_silent(cmd: list[str]) -> int:
     """Run a command silently and return exit code."""
+    start = time.perf_counter()
     result = subprocess.run(
         cmd,
         stdout=subprocess.DEVNULL,
         stderr=subprocess.DEVNULL
     )
+    _record_call(_command_name(cmd), start, result.returncode)
     return result.returncode
 
 
@@ -269,7 +1010,9 @@ def run_capture(cmd: list[str]) -> tuple[str, str, int]:
     Returns:
         Tuple of (stdout, stderr, returncode)
     """
+    start = time.perf_counter()
     result = subprocess.run(cmd, capture_output=True, text=True)
+    _record_call(_command_name(cmd), start, result.returncode, len(result.stdout) + len(result.stderr))
     return result.stdout.strip(), result.stderr.strip(), result.returncode
 
 
@@ -286,7 +1029,9 @@ def run_with_input(cmd: list[str], input_data: str | bytes, text: bool = True) -
     Returns:
         Tuple of (stdout, returncode)
     """
+    start = time.perf_counter()
     result = subprocess.run(cmd, input=input_data, capture_output=True, text=text)
+    _record_call(_command_name(cmd), start, result.returncode, len(result.stdout))
     output = result.stdout.strip() if text and isinstance(result.stdout, str) else result.stdout
     return output, result.returncode
 
@@ -308,11 +1053,13 @@ def run_pipeline(cmd1: list[str], cmd2: list[str], **kwargs) -> int:
         "stderr": subprocess.DEVNULL,
     }
     defaults.update(kwargs)
+    start = time.perf_counter()
     p1 = subprocess.Popen(cmd1, stdout=subprocess.PIPE)
     p2 = subprocess.Popen(cmd2, stdin=p1.stdout, **defaults)
     if p1.stdout:
         p1.stdout.close()
     p2.wait()
+    _record_call(f"{_command_name(cmd1)}|{_command_name(cmd2)}", start, p2.returncode)
     return p2.returncode
 
 
@@ -4,6 +4,7 @@ Handles wallpaper setting and awww daemon control.
 """
 
 import argparse
+import asyncio
 import os
 import shutil
 from pathlib import Path
@@ -104,12 +105,30 @@ def set_wallpaper(image_path: str) -> None:
     run_silent(["magick", str(WAL_DEST), "-resize", "10%", str(BAN_DEST)])
 
 
+def watch_monitors() -> None:
+    """Apply the current wallpaper to monitors as they are hot-plugged."""
+    from HyprEvents import Event, EventBus
+
+    bus = EventBus()
+
+    @bus.on("monitoradded")
+    def on_monitor_added(event: Event) -> None:
+        monitor = event.get("name")
+        if not WAL_DEST.exists():
+            return
+        log.info(f"Monitor added: {monitor}, applying wallpaper")
+        start_daemon()
+        run_silent(["awww", "img", str(WAL_DEST), "--outputs", monitor] + AWWW_PARAMS)
+
+    asyncio.run(bus.run())
+
+
 def main() -> None:
     """Parse arguments and execute the requested wallpaper action."""
     parser = argparse.ArgumentParser(description="Wallpaper manager")
     parser.add_argument(
         "action",
-        choices=["set", "run"],
+        choices=["set", "run", "watch"],
         help="Wallpaper action to perform"
     )
     parser.add_argument(
@@ -126,6 +145,8 @@ def main() -> None:
                 set_wallpaper(args.path)
         case "run":
             awww_run()
+        case "watch":
+            watch_monitors()
 
 
 if __name__ == "__main__":
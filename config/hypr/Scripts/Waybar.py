@@ -1,9 +1,12 @@
 """
 Waybar process management module.
-Provides functions to start and stop Waybar.
+Provides functions to start, stop and refresh Waybar.
 """
 
-from Utils import is_running, run_bg, kill_all
+import os
+import signal
+
+from Utils import is_running, run_bg, kill_all, pids_of
 
 
 def kill_waybar() -> None:
@@ -15,3 +18,12 @@ def run_waybar() -> None:
     """Start Waybar if not already running."""
     if not is_running("waybar"):
         run_bg(["waybar"])
+
+
+def refresh_module(signal_offset: int) -> None:
+    """Re-run the custom modules configured with "signal": signal_offset (SIGRTMIN+n)."""
+    for pid in pids_of("waybar")["waybar"]:
+        try:
+            os.kill(pid, signal.SIGRTMIN + signal_offset)
+        except (ProcessLookupError, PermissionError):
+            pass
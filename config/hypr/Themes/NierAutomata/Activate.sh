@@ -26,5 +26,7 @@ killall -qw swaync waybar
 
 swaync -c "$THEME_DIR/Swaync/Config.json" -s "$THEME_DIR/Swaync/Style.css" &
 waybar -c "$THEME_DIR/Bar/Config.jsonc" -s "$THEME_DIR/Bar/Config.css" &
+python "$THEME_DIR/Bar/Scripts/Kahfein.py" watch &
+python "$THEME_DIR/Bar/Scripts/BlueLightFilter.py" schedule &
 
 exit 0
@@ -1,14 +1,17 @@
 """
 Battery animation module for Waybar.
-Displays battery icon with charging animation.
+Displays battery icon with charging animation, once per call or as a resident stream.
 """
 
 import json
+import select
+import socket
 import sys
+import time
 from pathlib import Path
 
 sys.path.insert(0, str(Path.home() / ".config/hypr/Scripts"))
-from Utils import read_file
+from PowerState import get_power_state, get_snapshot_sequence, charging_frame, FRAME_INTERVAL
 
 # Simulation settings (for testing)
 SIMULATE_CHARGING: bool = False
@@ -20,22 +23,26 @@ CHARGING_ICONS: list[str] = ["󰢟", "󰢜", "󰂆", "󰂇", "󰂈", "󰢝", "
 # Battery level icons (not charging)
 BATTERY_ICONS: list[str] = ["󰂎", "󰁺", "󰁻", "󰁼", "󰁽", "󰁾", "󰁿", "󰂀", "󰂁", "󰂂", "󰁹"]
 
-STATE_FILE: Path = Path("/tmp/battery_animation_frame")
+# Streaming mode
+NETLINK_KOBJECT_UEVENT: int = 15
+UEVENT_KERNEL_GROUP: int = 1
+PUBLISH_WAIT: float = 5.0   # How long a uevent keeps us watching for the provider's publish
+PUBLISH_POLL: float = 0.05  # Snapshot re-read interval while watching
+POLL_INTERVAL: float = 30.0  # Safety re-read for drivers that skip uevents
 
 
 def get_battery_info() -> tuple[str, int]:
-    """Get battery status and level from system or simulation."""
+    """Get battery status and level from the shared snapshot or simulation."""
     if (len(sys.argv) > 1 and sys.argv[1] == "sim") or SIMULATE_CHARGING:
         status = "Charging"
         level = int(sys.argv[2]) if len(sys.argv) > 2 else SIMULATE_LEVEL
     else:
-        try:
-            bat_path = next(Path("/sys/class/power_supply").glob("BAT*"))
-            status = read_file(bat_path / "status").strip()
-            level = int(read_file(bat_path / "capacity").strip())
-        except (StopIteration, FileNotFoundError, ValueError):
+        snapshot = get_power_state()
+        if snapshot is None:
             status = "Unknown"
             level = 0
+        else:
+            status, level = snapshot.status, snapshot.capacity
 
     return status, level
 
@@ -54,32 +61,12 @@ def get_css_class(level: int, status: str) -> str:
 
 
 def get_charging_icon(level: int) -> str:
-    """Get animated charging icon based on current frame."""
-    start_index = min(level // 10, 10)
-
-    # Read current frame
-    if STATE_FILE.exists():
-        try:
-            frame = int(STATE_FILE.read_text().strip())
-        except ValueError:
-            frame = start_index
-    else:
-        frame = start_index
-
-    # Ensure frame is not less than start index
-    frame = max(frame, start_index)
-    icon = CHARGING_ICONS[frame]
+    """Get animated charging icon from the shared animation clock."""
+    return CHARGING_ICONS[charging_frame(level)]
 
-    # Update frame for next call
-    next_frame = frame + 1 if frame < 10 else start_index
-    STATE_FILE.write_text(str(next_frame))
 
-    return icon
-
-
-def main() -> None:
-    """Generate Waybar-compatible battery output."""
-    status, level = get_battery_info()
+def build_output(status: str, level: int) -> dict:
+    """Build the Waybar JSON object for a battery reading."""
     start_index = min(level // 10, 10)
 
     if status == "Charging":
@@ -90,22 +77,96 @@ def main() -> None:
         icon = "󰂅"
         tooltip = "Fully Charged"
         css_class = "full"
-        STATE_FILE.unlink(missing_ok=True)
     else:
         icon = BATTERY_ICONS[start_index]
         tooltip = f"Battery {level}%"
         css_class = get_css_class(level, status)
-        STATE_FILE.unlink(missing_ok=True)
 
-    output = {
+    return {
         "text": icon,
         "tooltip": tooltip,
         "class": css_class,
         "percentage": level
     }
 
-    print(json.dumps(output))
+
+def open_uevent_socket() -> socket.socket | None:
+    """Subscribe to kernel uevents, or None if netlink is unavailable."""
+    try:
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+        sock.bind((0, UEVENT_KERNEL_GROUP))
+    except OSError:
+        return None
+    sock.setblocking(False)
+    return sock
+
+
+def drain_uevents(sock: socket.socket) -> bool:
+    """Read all pending uevents and report whether any came from power_supply."""
+    relevant = False
+    while True:
+        try:
+            data = sock.recv(8192)
+        except BlockingIOError:
+            return relevant
+        # Payload: "action@devpath\0KEY=VALUE\0..."
+        if b"\0SUBSYSTEM=power_supply\0" in data:
+            relevant = True
+
+
+def stream() -> None:
+    """
+    Print a JSON line whenever the module's output changes.
+    Wakes on power_supply uevents, on each shared-clock frame while
+    charging, and every POLL_INTERVAL otherwise. The snapshot provider
+    publishes some time after the uevent, so after one the snapshot is
+    re-read every PUBLISH_POLL until its publish counter moves.
+    """
+    sock = open_uevent_socket()
+    last_line = None
+    # (publish counter at the uevent, monotonic deadline) while watching
+    pending: tuple[int | None, float] | None = None
+
+    while True:
+        if pending is not None and (
+            get_snapshot_sequence() != pending[0] or time.monotonic() >= pending[1]
+        ):
+            pending = None
+        status, level = get_battery_info()
+
+        line = json.dumps(build_output(status, level))
+        if line != last_line:
+            print(line, flush=True)
+            last_line = line
+
+        if status == "Charging":
+            # Align with the clock so the bar and lock screen animate in step
+            timeout = FRAME_INTERVAL - time.time() % FRAME_INTERVAL
+        else:
+            timeout = POLL_INTERVAL
+        if pending is not None:
+            timeout = min(timeout, PUBLISH_POLL)
+        if sock is None:
+            time.sleep(timeout)
+            continue
+
+        ready, _, _ = select.select([sock], [], [], timeout)
+        if ready and drain_uevents(sock):
+            pending = (get_snapshot_sequence(), time.monotonic() + PUBLISH_WAIT)
+
+
+def main() -> None:
+    """Generate Waybar-compatible battery output."""
+    if len(sys.argv) > 1 and sys.argv[1] == "--stream":
+        stream()
+        return
+
+    status, level = get_battery_info()
+    print(json.dumps(build_output(status, level)))
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    try:
+        main()
+    except KeyboardInterrupt:
+        pass
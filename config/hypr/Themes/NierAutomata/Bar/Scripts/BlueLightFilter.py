@@ -1,16 +1,26 @@
 """
 Blue Light Filter module for Waybar using hyprsunset.
-Controls screen color temperature to reduce eye strain.
+Controls screen color temperature to reduce eye strain, manually or on a solar schedule.
 """
 
 import argparse
 import json
-import subprocess
+import os
 import sys
+import time
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
 from pathlib import Path
 
 sys.path.insert(0, str(Path.home() / ".config/hypr/Scripts"))
-from Utils import get_pid, kill_all, notify
+from DBus import Connection, DBusError
+from Solar import solar_elevation, sun_times
+from Utils import (
+    get_logger, get_runtime_dir, hypr_request, is_running, notify, read_config, run_bg,
+    runtime_lock, load_worker_state, save_worker_state, worker_alive, write_atomic
+)
+
+log = get_logger("BlueLightFilter")
 
 # Temperature presets (in Kelvin)
 TEMP_OFF = 6500       # Neutral daylight (no filter)
@@ -27,92 +37,172 @@ PRESETS = {
     "extreme": TEMP_EXTREME,
 }
 
-
-STATE_FILE = Path("/tmp/bluelight_temp")
-
-
-def save_state(temp: int) -> None:
-    """Save current temperature to state file."""
-    STATE_FILE.write_text(str(temp))
+# hyprsunset IPC socket inside the Hyprland instance directory
+SUNSET_SOCKET = ".hyprsunset.sock"
+SUNSET_START_TIMEOUT = 2.0
+TEMP_IDENTITY = 6000  # hyprsunset's neutral point, reported while at identity
+
+# Animated transitions between presets
+RAMP_STATE = "bluelight"
+RAMP_IDLE = {"target": None, "worker": 0}
+RAMP_DURATION = 1.0   # Seconds per transition
+FRAME_INTERVAL = 1 / 30
+
+# Solar schedule
+CONFIG_PATH = Path.home() / ".config/hypr/Configs/BlueLight.conf"
+SCHEDULE_STATE = "bluelight-schedule.json"
+SCHEDULE_STEP = 50          # Kelvin between scheduled steps
+SCHEDULE_RESOLUTION = 15    # Seconds between samples of a transition
+DEFAULT_TRANSITION = 60     # Minutes, centred on sunrise and sunset
+
+LOGIND_BUS = "org.freedesktop.login1"
+LOGIND_MANAGER = "org.freedesktop.login1.Manager"
+
+
+def sunset_request(command: str) -> str | None:
+    """Send one command to hyprsunset, or return None if it is not running."""
+    reply = hypr_request(command, SUNSET_SOCKET)
+    return reply.strip() if reply is not None else None
+
+
+def ensure_daemon() -> bool:
+    """Start hyprsunset at identity if needed and wait for its socket."""
+    if sunset_request("temperature") is not None:
+        return True
+    if not is_running("hyprsunset"):
+        log.info("Starting hyprsunset")
+        run_bg(["hyprsunset", "--identity"])
+
+    deadline = time.monotonic() + SUNSET_START_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        if sunset_request("temperature") is not None:
+            return True
+    log.error("hyprsunset IPC socket did not come up")
+    return False
+
+
+def read_temperature() -> int | None:
+    """Current temperature as reported by hyprsunset."""
+    try:
+        return round(float(sunset_request("temperature")))
+    except (TypeError, ValueError):
+        return None
 
 
-def load_state() -> int | None:
-    """Load temperature from state file."""
+def read_gamma() -> int | None:
+    """Current gamma percentage as reported by hyprsunset."""
     try:
-        if STATE_FILE.exists():
-            return int(STATE_FILE.read_text().strip())
-    except (ValueError, OSError):
-        pass
-    return None
+        return round(float(sunset_request("gamma")))
+    except (TypeError, ValueError):
+        return None
 
 
 def get_current_status() -> tuple[bool, int]:
-    """Check if hyprsunset is running and get current temperature."""
-    pid = get_pid("hyprsunset")
-    if not pid:
+    """
+    Check if the filter is active and get its temperature.
+    While a ramp runs its target is reported, so repeated clicks step from it.
+    hyprsunset reports TEMP_IDENTITY both at identity and for an explicit
+    6000K, so that reading only counts as off when the last request was off.
+    """
+    with runtime_lock(RAMP_STATE):
+        state = load_worker_state(RAMP_STATE, RAMP_IDLE)
+    requested = state.get("target")
+    if worker_alive(state.get("worker", 0)) and requested is not None:
+        temp = requested
+    else:
+        temp = read_temperature()
+    if temp is None or temp >= TEMP_OFF:
         return False, TEMP_OFF
+    if temp == TEMP_IDENTITY and (requested is None or requested >= TEMP_OFF):
+        return False, TEMP_OFF
+    return True, temp
 
-    # Try to load from state file first
-    saved_temp = load_state()
-    if saved_temp is not None:
-        return True, saved_temp
 
-    # Fallback: try to read from process arguments
-    try:
-        result = subprocess.run(
-            ["ps", "-p", pid, "-o", "args="],
-            capture_output=True,
-            text=True
-        )
-        args = result.stdout.strip()
-        if "-t" in args:
-            parts = args.split()
-            for i, part in enumerate(parts):
-                if part == "-t" and i + 1 < len(parts):
-                    return True, int(parts[i + 1])
-    except (ValueError, IndexError):
-        pass
-
-    return True, TEMP_MEDIUM
+def interpolate(start: int, target: int, progress: float) -> int:
+    """Ease between two temperatures in mired space, where steps look even."""
+    eased = progress * progress * (3 - 2 * progress)
+    mired = 1e6 / start + (1e6 / target - 1e6 / start) * eased
+    return round(1e6 / mired)
+
+
+def run_ramp(start: int, target: int) -> None:
+    """Stream ramp steps to hyprsunset, restarting from the current step when the target moves."""
+    position = start
+    ramp_from, ramp_start = start, time.monotonic()
+
+    while True:
+        progress = min((time.monotonic() - ramp_start) / RAMP_DURATION, 1.0)
+        step = interpolate(ramp_from, target, progress)
+        if step != position:
+            sunset_request(f"temperature {step}")
+            position = step
+
+        with runtime_lock(RAMP_STATE):
+            state = load_worker_state(RAMP_STATE, RAMP_IDLE)
+            if state.get("target") != target:
+                target = state["target"]
+                ramp_from, ramp_start = position, time.monotonic()
+            elif progress >= 1.0:
+                # Release the ramp under the lock so a retarget is never missed
+                state["worker"] = 0
+                save_worker_state(RAMP_STATE, state)
+                break
+
+        time.sleep(FRAME_INTERVAL)
+
+    if target >= TEMP_OFF:
+        sunset_request("identity")
 
 
 def set_temperature(temp: int) -> None:
-    """Set the color temperature using hyprsunset."""
-    kill_all("hyprsunset")
+    """
+    Move hyprsunset to a temperature with a smooth ramp.
+    A ramp that is already running is retargeted; otherwise this process
+    runs the ramp itself.
+    """
+    if not ensure_daemon():
+        notify("dialog-error", "Blue Light Filter: hyprsunset unavailable")
+        return
+
+    with runtime_lock(RAMP_STATE):
+        state = load_worker_state(RAMP_STATE, RAMP_IDLE)
+        retarget = worker_alive(state.get("worker", 0)) and state.get("target") is not None
+        if retarget:
+            state["target"] = temp
+        else:
+            start = read_temperature() or TEMP_OFF
+            state = {"target": temp, "worker": os.getpid()}
+        save_worker_state(RAMP_STATE, state)
 
     if temp >= TEMP_OFF:
-        # Remove state file when turning off
-        if STATE_FILE.exists():
-            STATE_FILE.unlink()
         notify("weather-clear", "Blue Light Filter: Off")
-        return
+    else:
+        # Determine preset name for notification
+        preset_name = "Custom"
+        for name, preset_temp in PRESETS.items():
+            if temp == preset_temp:
+                preset_name = name.capitalize()
+                break
+        notify("weather-clear-night", f"Blue Light Filter: {preset_name} ({temp}K)")
 
-    # Save current temperature to state file
-    save_state(temp)
+    if not retarget:
+        log.debug(f"Ramp {start}K -> {temp}K")
+        run_ramp(start, temp)
 
-    subprocess.Popen(
-        ["hyprsunset", "-t", str(temp)],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL
-    )
 
-    # Determine preset name for notification
-    preset_name = "Custom"
-    for name, preset_temp in PRESETS.items():
-        if temp == preset_temp:
-            preset_name = name.capitalize()
-            break
-
-
-    notify("weather-clear-night", f"Blue Light Filter: {preset_name} ({temp}K)")
+def set_gamma(percent: int) -> None:
+    """Set the display gamma through hyprsunset."""
+    if ensure_daemon():
+        sunset_request(f"gamma {percent}")
+        notify("weather-clear", f"Blue Light Filter: Gamma {percent}%")
 
 
 def toggle() -> None:
     """Toggle blue light filter on/off."""
-    # Use state file for consistency (more reliable than process detection)
-    saved_temp = load_state()
+    is_active, _ = get_current_status()
 
-    if saved_temp is not None:
+    if is_active:
         # Filter is on, turn it off
         set_temperature(TEMP_OFF)
     else:
@@ -125,11 +215,10 @@ def cycle() -> None:
     # Define cycle order (coolest to warmest)
     cycle_temps = [TEMP_OFF, TEMP_LOW, TEMP_MEDIUM, TEMP_HIGH, TEMP_EXTREME]
 
-    # Get current state from file (more reliable than process detection)
-    saved_temp = load_state()
+    is_active, saved_temp = get_current_status()
 
-    if saved_temp is None:
-        # No state file means filter is off, start from Low
+    if not is_active:
+        # Filter is off, start from Low
         next_temp = TEMP_LOW
     else:
         # Find nearest preset and move to next
@@ -187,6 +276,192 @@ def decrease() -> None:
     set_temperature(TEMP_OFF)
 
 
+# =============================================================================
+# Solar schedule
+# =============================================================================
+
+def load_schedule_config() -> dict | None:
+    """Read coordinates and temperatures from BlueLight.conf, or None if unset."""
+    config = read_config(CONFIG_PATH)
+    try:
+        return {
+            "latitude": float(config["LATITUDE"]),
+            "longitude": float(config["LONGITUDE"]),
+            "day": int(config.get("DAY_TEMP", TEMP_OFF)),
+            "night": int(config.get("NIGHT_TEMP", TEMP_HIGH)),
+            "transition": float(config.get("TRANSITION", DEFAULT_TRANSITION)) * 60,
+        }
+    except (TypeError, KeyError, ValueError):
+        return None
+
+
+def build_day(day: date, config: dict) -> tuple[list[tuple[int, int]], list[tuple[int, int, int]]]:
+    """
+    Precompute one local day of the temperature curve.
+
+    Args:
+        day: Local calendar date
+        config: Parsed schedule configuration
+
+    Returns:
+        (steps, transitions): steps are (timestamp, kelvin) pairs from local
+        midnight, kept only where the quantized temperature changes;
+        transitions are (start, end, kelvin) for each ramp
+    """
+    start = datetime.combine(day, datetime.min.time()).astimezone()
+    end = datetime.combine(day + timedelta(days=1), datetime.min.time()).astimezone()
+    lat, lon = config["latitude"], config["longitude"]
+
+    times = sun_times(day, lat, lon)
+    if times is None:
+        # Polar day or night: one temperature for the whole day
+        noon = start + (end - start) / 2
+        temp = config["day"] if solar_elevation(noon, lat, lon) > 0 else config["night"]
+        return [(int(start.timestamp()), temp)], []
+
+    half = config["transition"] / 2
+    sunrise, sunset = (t.timestamp() for t in times)
+    ramps = [
+        (sunrise - half, sunrise + half, config["night"], config["day"]),
+        (sunset - half, sunset + half, config["day"], config["night"]),
+    ]
+
+    def temp_at(t: float) -> int:
+        temp = config["night"]
+        for ramp_start, ramp_end, ramp_from, ramp_to in ramps:
+            if t >= ramp_end:
+                temp = ramp_to
+            elif t > ramp_start:
+                progress = (t - ramp_start) / (ramp_end - ramp_start)
+                temp = interpolate(ramp_from, ramp_to, progress)
+        return round(temp / SCHEDULE_STEP) * SCHEDULE_STEP
+
+    samples = [start.timestamp()]
+    for ramp_start, ramp_end, _, _ in ramps:
+        t = ramp_start
+        while t < ramp_end:
+            samples.append(t)
+            t += SCHEDULE_RESOLUTION
+        samples.append(ramp_end)
+
+    steps: list[tuple[int, int]] = []
+    for t in samples:
+        if not start.timestamp() <= t < end.timestamp():
+            continue
+        temp = temp_at(t)
+        if not steps or steps[-1][1] != temp:
+            steps.append((int(t), temp))
+
+    transitions = [(int(s), int(e), to) for s, e, _, to in ramps]
+    return steps, transitions
+
+
+def read_schedule() -> dict | None:
+    """Published schedule of the running scheduler, or None."""
+    try:
+        schedule = json.loads((get_runtime_dir() / SCHEDULE_STATE).read_text())
+    except (OSError, ValueError):
+        return None
+    return schedule if worker_alive(schedule.get("pid", 0)) else None
+
+
+def apply_temperature(temp: int) -> None:
+    """Set a scheduled step directly, without ramp or notification."""
+    sunset_request(f"temperature {temp}")
+    if temp >= TEMP_OFF:
+        sunset_request("identity")
+
+    # Record the request so the status can tell identity from a 6000K step
+    with runtime_lock(RAMP_STATE):
+        state = load_worker_state(RAMP_STATE, RAMP_IDLE)
+        if not worker_alive(state.get("worker", 0)):
+            save_worker_state(RAMP_STATE, {"target": temp, "worker": 0})
+
+
+def connect_resume_signals() -> Connection | None:
+    """System bus connection subscribed to PrepareForSleep, or None."""
+    try:
+        bus = Connection.system()
+    except DBusError as e:
+        log.warning(f"No resume notifications: {e}")
+        return None
+    try:
+        bus.add_match(sender=LOGIND_BUS, interface=LOGIND_MANAGER, member="PrepareForSleep")
+    except (DBusError, OSError) as e:
+        log.warning(f"No resume notifications: {e}")
+        bus.close()
+        return None
+    return bus
+
+
+def run_schedule() -> None:
+    """
+    Follow the solar schedule from one resident process.
+    Sleeps until the next precomputed step; a resume from suspend wakes it
+    early through logind's PrepareForSleep signal.
+    Without a configured location there is nothing to follow.
+    """
+    config = load_schedule_config()
+    if config is None:
+        log.debug(f"No location in {CONFIG_PATH}, schedule disabled")
+        return
+    if read_schedule() is not None:
+        log.debug("Scheduler already running")
+        return
+
+    bus = connect_resume_signals()
+
+    log.info(f"Scheduler started for {config['latitude']}, {config['longitude']}")
+    day = None
+    steps: list[tuple[int, int]] = []
+    applied = None
+
+    while True:
+        now = time.time()
+        if date.fromtimestamp(now) != day:
+            day = date.fromtimestamp(now)
+            steps, transitions = build_day(day, config)
+            next_steps, next_transitions = build_day(day + timedelta(days=1), config)
+            steps += next_steps
+            transitions += next_transitions
+            write_atomic(get_runtime_dir() / SCHEDULE_STATE,
+                         json.dumps({"pid": os.getpid(), "day": config["day"],
+                                     "transitions": transitions}))
+            log.debug(f"Schedule for {day}: {len(steps)} steps")
+
+        index = bisect_right(steps, (now, sys.maxsize)) - 1
+        temp = steps[max(index, 0)][1]
+        if temp != applied and ensure_daemon():
+            apply_temperature(temp)
+            applied = temp
+
+        wake = steps[index + 1][0] if index + 1 < len(steps) else now + 3600
+        timeout = max(0.0, wake - time.time())
+        if bus is None:
+            time.sleep(timeout)
+            continue
+        try:
+            bus.next_signal(timeout)
+        except (DBusError, OSError) as e:
+            # Bus restarted: subscribe again, sleeping without it meanwhile
+            log.warning(f"Lost the system bus: {e}")
+            bus.close()
+            bus = connect_resume_signals()
+
+
+def format_next_transition(schedule: dict) -> str | None:
+    """Describe the next or current scheduled transition."""
+    now = time.time()
+    upcoming = next((t for t in schedule["transitions"] if t[1] > now), None)
+    if upcoming is None:
+        return None
+    start, end, temp = upcoming
+    label = "Day" if temp == schedule.get("day", TEMP_OFF) else f"Night ({temp}K)"
+    if start <= now:
+        return f"Transitioning to {label} until {time.strftime('%H:%M', time.localtime(end))}"
+    return f"Next: {label} at {time.strftime('%H:%M', time.localtime(start))}"
+
+
 def get_icon(temp: int) -> str:
     """Get appropriate icon based on temperature."""
     if temp >= TEMP_OFF:
@@ -233,6 +508,10 @@ def output_waybar() -> None:
     tooltip = f"Blue Light Filter: {preset_name}"
     if temp < TEMP_OFF:
         tooltip += f" ({temp}K)"
+    if is_active and (gamma := read_gamma()) is not None and gamma != 100:
+        tooltip += f", gamma {gamma}%"
+    if (schedule := read_schedule()) is not None and (upcoming := format_next_transition(schedule)):
+        tooltip += f"\n{upcoming}"
 
     output = {
         "text": icon,
@@ -252,7 +531,7 @@ def main() -> None:
         "action",
         nargs="?",
         default="status",
-        choices=["toggle", "cycle", "increase", "decrease", "on", "off", "status", "low", "medium", "high", "extreme"],
+        choices=["toggle", "cycle", "increase", "decrease", "on", "off", "status", "low", "medium", "high", "extreme", "schedule"],
         help="Action to perform"
     )
     parser.add_argument(
@@ -260,6 +539,11 @@ def main() -> None:
         type=int,
         help="Set custom temperature (2500-6500K)"
     )
+    parser.add_argument(
+        "-g", "--gamma",
+        type=int,
+        help="Set display gamma (10-100%%)"
+    )
 
     args = parser.parse_args()
 
@@ -267,6 +551,8 @@ def main() -> None:
         # Clamp temperature to valid range
         temp = max(2500, min(6500, args.temperature))
         set_temperature(temp)
+    elif args.gamma:
+        set_gamma(max(10, min(100, args.gamma)))
     elif args.action == "toggle":
         toggle()
     elif args.action == "cycle":
@@ -287,6 +573,11 @@ def main() -> None:
         set_temperature(TEMP_HIGH)
     elif args.action == "extreme":
         set_temperature(TEMP_EXTREME)
+    elif args.action == "schedule":
+        try:
+            run_schedule()
+        except KeyboardInterrupt:
+            pass
     else:  # status
         output_waybar()
 
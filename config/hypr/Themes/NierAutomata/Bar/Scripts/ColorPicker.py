@@ -1,41 +1,153 @@
 """
 Color Picker module for Waybar using hyprpicker.
-Pick colors from screen and copy to clipboard.
+Pick colors from screen once, convert them locally and keep a browsable history.
 """
 
 import argparse
 import json
 import subprocess
 import sys
+from collections.abc import Sequence
 from pathlib import Path
 
 sys.path.insert(0, str(Path.home() / ".config/hypr/Scripts"))
-from Utils import notify
+from Utils import get_logger, get_theme_dir, notify, run_bg, run_with_input, write_atomic
+
+log = get_logger("ColorPicker")
 
 # Available color formats
 FORMATS = ["hex", "rgb", "hsl", "hsv", "cmyk"]
 
+HISTORY_FILE = Path.home() / ".cache/hypr/colorpicker-history.json"
+HISTORY_LIMIT = 50
+
+ROFI_THEME = "Rofi/Clipboard"  # Relative to the theme directory
+SWATCH = "<span foreground='{color}'>██</span>  "
+
+# Palette export styles, matching the theme's Colors/*.css files
+EXPORT_STYLES = {
+    "gtk": ("", "@define-color {name} {value};", ""),
+    "rofi": ("* {{", "    {name}: {value};", "}}"),
+    "css": (":root {{", "    --{name}: {value};", "}}"),
+}
+
+
+# =============================================================================
+# Conversions
+# =============================================================================
+# Every converter takes whole channel columns, so a palette is converted in
+# one pass instead of color by color.
+
+def parse_hex(colors: Sequence[str]) -> tuple[list[int], list[int], list[int]]:
+    """Split #rrggbb strings into red, green and blue columns."""
+    values = [int(color.lstrip("#")[:6], 16) for color in colors]
+    return (
+        [v >> 16 & 0xFF for v in values],
+        [v >> 8 & 0xFF for v in values],
+        [v & 0xFF for v in values],
+    )
+
+
+def _hue(r: list[float], g: list[float], b: list[float], hi: list[float], delta: list[float]) -> list[float]:
+    """Hue in degrees from normalized channels and their max/chroma columns."""
+    return [
+        0.0 if d == 0 else
+        60 * (((gv - bv) / d) % 6) if h == rv else
+        60 * ((bv - rv) / d + 2) if h == gv else
+        60 * ((rv - gv) / d + 4)
+        for rv, gv, bv, h, d in zip(r, g, b, hi, delta)
+    ]
+
+
+def convert(colors: Sequence[str], fmt: str, uppercase: bool = False) -> list[str]:
+    """
+    Convert #rrggbb colors to the given format.
+
+    Args:
+        colors: Hex colors
+        fmt: One of FORMATS
+        uppercase: Uppercase hex digits
+
+    Returns:
+        Formatted strings, in input order
+    """
+    red, green, blue = parse_hex(colors)
+
+    if fmt == "hex":
+        out = [f"#{r:02x}{g:02x}{b:02x}" for r, g, b in zip(red, green, blue)]
+        return [c.upper() for c in out] if uppercase else out
+    if fmt == "rgb":
+        return [f"rgb({r}, {g}, {b})" for r, g, b in zip(red, green, blue)]
+
+    r = [v / 255 for v in red]
+    g = [v / 255 for v in green]
+    b = [v / 255 for v in blue]
+    hi = list(map(max, r, g, b))
+    lo = list(map(min, r, g, b))
+    delta = [h - l for h, l in zip(hi, lo)]
+
+    if fmt == "hsl":
+        hue = _hue(r, g, b, hi, delta)
+        light = [(h + l) / 2 for h, l in zip(hi, lo)]
+        sat = [0.0 if d == 0 else d / (1 - abs(2 * l - 1)) for d, l in zip(delta, light)]
+        return [f"hsl({round(h) % 360}, {round(s * 100)}%, {round(l * 100)}%)"
+                for h, s, l in zip(hue, sat, light)]
+    if fmt == "hsv":
+        hue = _hue(r, g, b, hi, delta)
+        sat = [0.0 if h == 0 else d / h for h, d in zip(hi, delta)]
+        return [f"hsv({round(h) % 360}, {round(s * 100)}%, {round(v * 100)}%)"
+                for h, s, v in zip(hue, sat, hi)]
+    if fmt == "cmyk":
+        key = [1 - h for h in hi]
+        cmy = [
+            [0.0 if k == 1 else (1 - ch - k) / (1 - k) for ch, k in zip(channel, key)]
+            for channel in (r, g, b)
+        ]
+        return [f"cmyk({round(c * 100)}%, {round(m * 100)}%, {round(y * 100)}%, {round(k * 100)}%)"
+                for c, m, y, k in zip(*cmy, key)]
+    raise ValueError(f"Unknown format: {fmt}")
+
+
+# =============================================================================
+# History
+# =============================================================================
+
+def load_history() -> list[str]:
+    """Stored colors, most recent first."""
+    try:
+        return json.loads(HISTORY_FILE.read_text())
+    except (OSError, ValueError):
+        return []
+
+
+def add_to_history(color: str) -> None:
+    """Store a color at the front, dropping duplicates and the oldest entries."""
+    color = color.lower()
+    history = [color] + [c for c in load_history() if c != color]
+    HISTORY_FILE.parent.mkdir(parents=True, exist_ok=True)
+    write_atomic(HISTORY_FILE, json.dumps(history[:HISTORY_LIMIT]))
+
 
-def pick_color(
-    fmt: str = "hex",
-    autocopy: bool = True,
-    lowercase: bool = True,
-    no_zoom: bool = False
-) -> str | None:
-    """Pick a color from screen using hyprpicker."""
-    cmd = ["hyprpicker"]
+def copy(text: str) -> None:
+    """
+    Copy text to the clipboard.
+    wl-copy forks a server that outlives it, so its output must not be piped
+    back here or reading it would block until the selection changes hands.
+    """
+    try:
+        proc = run_bg(["wl-copy"], stdin=subprocess.PIPE, text=True)
+        proc.communicate(text)
+    except FileNotFoundError:
+        notify("dialog-error", "Color Picker: wl-copy not found")
 
-    # Format option
-    if fmt in FORMATS:
-        cmd.extend(["-f", fmt])
 
-    # Autocopy to clipboard
-    if autocopy:
-        cmd.append("-a")
+# =============================================================================
+# Actions
+# =============================================================================
 
-    # Lowercase hex output
-    if lowercase and fmt == "hex":
-        cmd.append("-l")
+def pick_color(no_zoom: bool = False) -> str | None:
+    """Pick a color from screen using hyprpicker, always as lowercase hex."""
+    cmd = ["hyprpicker", "-f", "hex", "-l"]
 
     # Disable zoom lens
     if no_zoom:
@@ -62,21 +174,79 @@ def pick_color(
         return None
 
 
-def pick_and_notify(fmt: str = "hex", lowercase: bool = True) -> None:
-    """Pick color and show notification."""
-    color = pick_color(fmt=fmt, autocopy=True, lowercase=lowercase)
+def pick_and_notify(fmt: str = "hex", uppercase: bool = False, no_zoom: bool = False) -> None:
+    """Pick color, store it and copy it in the requested format."""
+    color = pick_color(no_zoom=no_zoom)
 
     if color:
-        notify("color-select", f"Copied: {color}")
+        add_to_history(color)
+        value = convert([color], fmt, uppercase)[0]
+        copy(value)
+        notify("color-select", f"Copied: {value}")
     else:
         notify("dialog-warning", "Color Picker: Cancelled")
 
 
+def rofi_select(prompt: str, lines: list[str]) -> int | None:
+    """Show a rofi list and return the selected index."""
+    output, _ = run_with_input(
+        ["rofi", "-dmenu", "-i", "-markup-rows", "-no-custom", "-format", "i",
+         "-theme", str(get_theme_dir() / ROFI_THEME), "-p", prompt],
+        "\n".join(lines)
+    )
+    try:
+        return int(output)
+    except ValueError:
+        return None
+
+
+def browse_history(uppercase: bool = False) -> None:
+    """Browse stored colors in rofi and copy one in any format."""
+    history = load_history()
+    if not history:
+        notify("dialog-information", "Color Picker: History is empty")
+        return
+
+    hex_values = convert(history, "hex", uppercase)
+    index = rofi_select("Colors", [SWATCH.format(color=c) + v for c, v in zip(history, hex_values)])
+    if index is None:
+        return
+
+    color = history[index]
+    values = [convert([color], fmt, uppercase)[0] for fmt in FORMATS]
+    choice = rofi_select(color, [SWATCH.format(color=color) + v for v in values])
+    if choice is None:
+        return
+
+    add_to_history(color)
+    copy(values[choice])
+    notify("color-select", f"Copied: {values[choice]}")
+
+
+def export_palette(style: str, fmt: str, prefix: str, output: Path | None) -> None:
+    """Write the history as a palette of color variables."""
+    history = load_history()
+    values = convert(history, fmt)
+    header, line, footer = EXPORT_STYLES[style]
+
+    lines = [header.format()] if header else []
+    lines += [line.format(name=f"{prefix}-{i}", value=v) for i, v in enumerate(values, 1)]
+    if footer:
+        lines.append(footer.format())
+    text = "\n".join(lines) + "\n"
+
+    if output is None:
+        sys.stdout.write(text)
+    else:
+        write_atomic(output, text)
+        log.info(f"Exported {len(values)} colors to {output}")
+
+
 def output_waybar() -> None:
     """Generate Waybar-compatible JSON output."""
     output = {
         "text": "󰈋",
-        "tooltip": "Color Picker (click to pick)",
+        "tooltip": "Color Picker (click to pick, right-click for history)",
         "class": "colorpicker"
     }
     print(json.dumps(output))
@@ -91,7 +261,7 @@ def main() -> None:
         "action",
         nargs="?",
         default="pick",
-        choices=["pick", "status"] + FORMATS,
+        choices=["pick", "status", "history", "export"] + FORMATS,
         help="Action or format to use"
     )
     parser.add_argument(
@@ -110,16 +280,36 @@ def main() -> None:
         action="store_true",
         help="Disable zoom lens"
     )
+    parser.add_argument(
+        "--style",
+        choices=list(EXPORT_STYLES),
+        default="gtk",
+        help="Export syntax, like the theme's Colors/*.css (default: gtk)"
+    )
+    parser.add_argument(
+        "--prefix",
+        default="picked",
+        help="Variable name prefix for export (default: picked)"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        type=Path,
+        help="Export file (default: stdout)"
+    )
 
     args = parser.parse_args()
 
     if args.action == "status":
         output_waybar()
+    elif args.action == "history":
+        browse_history(uppercase=args.uppercase)
+    elif args.action == "export":
+        export_palette(args.style, args.format, args.prefix, args.output)
     elif args.action in FORMATS:
         # Direct format selection
-        pick_and_notify(fmt=args.action, lowercase=not args.uppercase)
+        pick_and_notify(fmt=args.action, uppercase=args.uppercase, no_zoom=args.no_zoom)
     else:  # pick
-        pick_and_notify(fmt=args.format, lowercase=not args.uppercase)
+        pick_and_notify(fmt=args.format, uppercase=args.uppercase, no_zoom=args.no_zoom)
 
 
 if __name__ == "__main__":
@@ -1,46 +1,287 @@
 """
 Kahfein (Caffeine) module for Waybar.
-Prevents the system from going idle by toggling hypridle.
+Prevents the system from going idle by holding a logind idle inhibitor.
 """
 
 import argparse
 import json
+import os
+import re
+import select
+import signal
 import sys
+import time
 from pathlib import Path
 
 sys.path.insert(0, str(Path.home() / ".config/hypr/Scripts"))
-from Utils import is_running, run_bg, kill_all, get_logger
+from DBus import Connection, DBusError
+from Utils import is_running, pids_of, run_bg, get_logger, get_runtime_dir, write_atomic
+from Waybar import refresh_module
 
 log = get_logger("Kahfein")
 
 PROCESS: str = "hypridle"
 
+# Matches "signal" of custom/kahfein in Config.jsonc
+WAYBAR_SIGNAL: int = 8
+
+WATCHER_PID_FILE: str = "kahfein-watch.pid"
+INHIBIT_STATE_FILE: str = "kahfein-inhibit.json"
+
+LOGIND_BUS: str = "org.freedesktop.login1"
+LOGIND_PATH: str = "/org/freedesktop/login1"
+LOGIND_MANAGER: str = "org.freedesktop.login1.Manager"
+
+TICK_INTERVAL: float = 60.0  # Seconds between remaining-time refreshes
+RESCAN_INTERVAL: float = 30.0  # Seconds between looks for hypridle while none runs
+STOP_TIMEOUT: float = 2.0
+
+DURATION_UNITS: dict[str, int] = {"h": 3600, "m": 60, "s": 1}
+
+
+def parse_duration(value: str) -> int:
+    """Parse a duration like 30m, 1h or 1h30m into seconds."""
+    parts = re.findall(r"(\d+)([hms])", value)
+    if not parts or "".join(n + u for n, u in parts) != value:
+        raise argparse.ArgumentTypeError(f"invalid duration: {value}")
+    return sum(int(n) * DURATION_UNITS[u] for n, u in parts)
+
+
+def format_remaining(seconds: float) -> str:
+    minutes = max(1, round(seconds / 60))
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m" if hours else f"{minutes}m"
+
+
+def read_inhibitor() -> dict | None:
+    """State of the running inhibitor, or None."""
+    try:
+        state = json.loads((get_runtime_dir() / INHIBIT_STATE_FILE).read_text())
+        os.kill(state["pid"], 0)
+    except (OSError, ValueError, KeyError):
+        return None
+    return state
+
 
 def status() -> None:
     """Print Kahfein status in Waybar JSON format."""
-    running = is_running(PROCESS)
+    inhibitor = read_inhibitor()
+    active = inhibitor is not None or not is_running(PROCESS)
+    remaining = None
+    tooltip = "Kahfein: Active" if active else "Kahfein: Inactive"
+
+    if inhibitor is not None:
+        if inhibitor["until"] is not None:
+            remaining = max(0, round(inhibitor["until"] - time.time()))
+            tooltip += f" ({format_remaining(remaining)} left)"
+        elif inhibitor["app"]:
+            tooltip += f" (until {inhibitor['app']} exits)"
+
     output = {
-        "text": "󰛊" if running else "󰅶",
-        "tooltip": "Kahfein: Inactive" if running else "Kahfein: Active",
-        "class": "inactive" if running else "active"
+        "text": "󰅶" if active else "󰛊",
+        "tooltip": tooltip,
+        "class": "active" if active else "inactive",
+        "remaining": remaining
     }
     print(json.dumps(output))
 
 
+def inhibit(duration: int | None = None, app: str | None = None) -> None:
+    """
+    Hold a logind idle inhibitor until the duration passes or the app exits.
+    hypridle keeps running and honours the inhibitor, so its timers stay intact.
+
+    Args:
+        duration: Seconds to inhibit for (default: until stopped)
+        app: Process name whose exit releases the inhibitor
+    """
+    stop_inhibitor()
+
+    app_pidfd = None
+    if app:
+        pids = pids_of(app)[app]
+        if not pids:
+            log.error(f"{app} is not running")
+            sys.exit(1)
+        app_pidfd = os.pidfd_open(pids[0])
+
+    reason = "Caffeine mode"
+    try:
+        bus = Connection.system(unix_fds=True)
+        inhibit_fd = bus.call(LOGIND_BUS, LOGIND_PATH, LOGIND_MANAGER, "Inhibit", "ssss",
+                              "idle", "Kahfein", reason, "block")[0]
+        bus.close()
+    except DBusError as e:
+        log.error(f"Could not take idle inhibitor: {e}")
+        sys.exit(1)
+
+    until = time.time() + duration if duration else None
+    write_atomic(get_runtime_dir() / INHIBIT_STATE_FILE,
+                 json.dumps({"pid": os.getpid(), "until": until, "app": app}))
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    log.info(f"Idle inhibited ({format_remaining(duration) if duration else 'no limit'}"
+             f"{f', until {app} exits' if app else ''})")
+    refresh_module(WAYBAR_SIGNAL)
+
+    try:
+        while True:
+            timeout = None
+            if until is not None:
+                remaining = until - time.time()
+                if remaining <= 0:
+                    break
+                timeout = min(remaining, TICK_INTERVAL)
+
+            ready, _, _ = select.select([app_pidfd] if app_pidfd is not None else [], [], [], timeout)
+            if ready:
+                log.info(f"{app} exited")
+                break
+            refresh_module(WAYBAR_SIGNAL)
+    finally:
+        os.close(inhibit_fd)
+        (get_runtime_dir() / INHIBIT_STATE_FILE).unlink(missing_ok=True)
+        log.info("Idle inhibitor released")
+        refresh_module(WAYBAR_SIGNAL)
+
+
+def spawn_inhibitor(duration: int | None = None, app: str | None = None) -> None:
+    """
+    Start the inhibitor in its own session so it outlives Waybar's process group.
+    It refreshes Waybar once it holds the lock.
+    """
+    cmd = [sys.executable, __file__, "inhibit", "--foreground"]
+    if duration:
+        cmd += ["--for", f"{duration}s"]
+    if app:
+        cmd += ["--until-exit", app]
+    run_bg(cmd, start_new_session=True)
+
+
+def stop_inhibitor() -> None:
+    """Release a running inhibitor and wait until its fd is closed."""
+    inhibitor = read_inhibitor()
+    if inhibitor is None:
+        return
+    try:
+        pidfd = os.pidfd_open(inhibitor["pid"])
+    except ProcessLookupError:
+        return
+    try:
+        signal.pidfd_send_signal(pidfd, signal.SIGTERM)
+        select.select([pidfd], [], [], STOP_TIMEOUT)
+    except ProcessLookupError:
+        pass
+    finally:
+        os.close(pidfd)
+
+
+def read_watcher_pid() -> int | None:
+    """PID of the running watcher, or None."""
+    try:
+        pid = int((get_runtime_dir() / WATCHER_PID_FILE).read_text())
+        os.kill(pid, 0)
+    except (OSError, ValueError):
+        return None
+    return pid
+
+
+def process_start(pid: int) -> int | None:
+    """Start time of a process in clock ticks since boot, or None if it is gone."""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # starttime is field 22; the comm before it may contain spaces
+    return int(stat.rsplit(b")", 1)[1].split()[19])
+
+
 def toggle() -> None:
-    """Toggle hypridle on or off."""
-    if is_running(PROCESS):
-        log.info("Enabling caffeine mode (killing hypridle)")
-        kill_all(PROCESS)
-    else:
+    """Toggle caffeine mode and push the new state to Waybar."""
+    if read_inhibitor() is not None:
+        log.info("Disabling caffeine mode")
+        stop_inhibitor()
+    elif not is_running(PROCESS):
         log.info("Disabling caffeine mode (starting hypridle)")
         run_bg([PROCESS])
+        # Have the watcher pick up the new process
+        if (pid := read_watcher_pid()) is not None:
+            os.kill(pid, signal.SIGUSR1)
+    else:
+        log.info("Enabling caffeine mode")
+        spawn_inhibitor()
+        return
+
+    refresh_module(WAYBAR_SIGNAL)
+
+
+def watch() -> None:
+    """
+    Refresh Waybar the moment hypridle exits, however it was stopped.
+    Blocks on a pidfd while hypridle runs; otherwise looks again every
+    RESCAN_INTERVAL seconds, or as soon as toggle sends SIGUSR1 after
+    starting a new one.
+    """
+    if read_watcher_pid() is not None:
+        log.debug("Watcher already running")
+        return
+    write_atomic(get_runtime_dir() / WATCHER_PID_FILE, str(os.getpid()))
+
+    wakeup_r, wakeup_w = os.pipe2(os.O_NONBLOCK | os.O_CLOEXEC)
+    signal.set_wakeup_fd(wakeup_w)
+    signal.signal(signal.SIGUSR1, lambda *_: None)
+
+    # Exited processes can linger as zombies or in the cached /proc index.
+    # They are keyed by start time so a reused PID is watched again.
+    exited: set[tuple[int, int]] = set()
+    while True:
+        running = [(pid, process_start(pid)) for pid in pids_of(PROCESS)[PROCESS]]
+        # Forget processes that have been reaped
+        exited &= set(running)
+
+        pidfd = None
+        for process in running:
+            if process[1] is None or process in exited:
+                continue
+            try:
+                pidfd = os.pidfd_open(process[0])
+                break
+            except ProcessLookupError:
+                continue
+
+        if pidfd is None:
+            ready, _, _ = select.select([wakeup_r], [], [], RESCAN_INTERVAL)
+        else:
+            ready, _, _ = select.select([wakeup_r, pidfd], [], [])
+            os.close(pidfd)
+            if pidfd in ready:
+                exited.add(process)
+                log.info("hypridle exited")
+                refresh_module(WAYBAR_SIGNAL)
+        if wakeup_r in ready:
+            while True:
+                try:
+                    os.read(wakeup_r, 64)
+                except BlockingIOError:
+                    break
 
 
 def main() -> None:
     """Parse arguments and execute the requested action."""
     parser = argparse.ArgumentParser(description="Kahfein - Caffeine for Hyprland")
-    parser.add_argument("action", choices=["toggle", "status"])
+    parser.add_argument("action", choices=["toggle", "status", "watch", "inhibit", "stop"])
+    parser.add_argument(
+        "--for",
+        dest="duration",
+        type=parse_duration,
+        help="Inhibit duration, e.g. 30m, 1h or 1h30m (default: until stopped)"
+    )
+    parser.add_argument("--until-exit", metavar="APP", help="Release the inhibitor when APP exits")
+    parser.add_argument(
+        "--foreground",
+        action="store_true",
+        help="Hold the inhibitor in this process instead of a detached one"
+    )
 
     args = parser.parse_args()
 
@@ -49,7 +290,21 @@ def main() -> None:
             toggle()
         case "status":
             status()
+        case "watch":
+            try:
+                watch()
+            except KeyboardInterrupt:
+                pass
+        case "inhibit" if args.foreground:
+            try:
+                inhibit(args.duration, args.until_exit)
+            except KeyboardInterrupt:
+                pass
+        case "inhibit":
+            spawn_inhibitor(args.duration, args.until_exit)
+        case "stop":
+            stop_inhibitor()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
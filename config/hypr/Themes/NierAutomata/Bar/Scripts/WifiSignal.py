@@ -1,57 +1,92 @@
 """
 WiFi signal strength module for Waybar.
-Displays connection status and signal strength icons.
+Displays connection status and signal strength icons, once per call or as a stream.
 """
 
 import json
+import select
 import sys
+import time
 from pathlib import Path
 
 sys.path.insert(0, str(Path.home() / ".config/hypr/Scripts"))
-from Utils import run_capture
+from Netlink import LinkTable, LinkWatcher, Nl80211, load_link_table
+from Utils import read_file
 
+PROC_WIRELESS: Path = Path("/proc/net/wireless")
+STREAM_INTERVAL: float = 1.0
 
-def get_wifi_info() -> tuple[int | None, str | None]:
-    """Get current WiFi connection info (signal strength, SSID) using iwd."""
-    stdout, _, returncode = run_capture(["iwctl", "station", "wlan0", "show"])
+# nl80211 connection, opened once and reused by the stream
+_nl80211: Nl80211 | None = None
 
-    if returncode != 0 or not stdout:
-        return None, None
 
-    ssid = None
-    signal = None
-
-    for line in stdout.split("\n"):
-        line = line.strip()
-        if "Connected network" in line:
-            # Format: "Connected network              SSID_NAME"
-            parts = line.split()
-            if len(parts) >= 3:
-                ssid = " ".join(parts[2:])
-        elif "RSSI" in line:
-            # Format: "RSSI                          -XX dBm"
-            parts = line.split()
-            for i, part in enumerate(parts):
-                if part.startswith("-") and part[1:].isdigit():
-                    rssi = int(part)
-                    # Convert RSSI (dBm) to percentage (rough approximation)
-                    # -30 dBm = 100%, -90 dBm = 0%
-                    signal = max(0, min(100, 2 * (rssi + 100)))
-                    break
-
-    if ssid and signal is not None:
-        return signal, ssid
+def rssi_to_percent(rssi: int) -> int:
+    """Convert RSSI (dBm) to a percentage: -50 dBm and above = 100%, -100 dBm = 0%."""
+    return max(0, min(100, 2 * (rssi + 100)))
+
+
+def get_nl80211_info() -> tuple[int | None, str | None]:
+    """Read the first associated station interface from nl80211."""
+    global _nl80211
+
+    if _nl80211 is None:
+        _nl80211 = Nl80211()
+    for link in _nl80211.links():
+        if link.ssid and link.signal_dbm is not None:
+            return rssi_to_percent(link.signal_dbm), link.ssid
+    return None, None
+
+
+def get_proc_wireless_info() -> tuple[int | None, str | None]:
+    """
+    Fallback reader for /proc/net/wireless.
+    It carries no SSID, so the interface name is reported instead.
+    """
+    try:
+        lines = read_file(PROC_WIRELESS).splitlines()[2:]
+    except OSError:
+        return None, None
 
+    for line in lines:
+        # Format: "wlan0: 0000   54.  -56.  -256 ..."
+        iface, _, fields = line.partition(":")
+        parts = fields.split()
+        if len(parts) < 3:
+            continue
+        try:
+            level = int(float(parts[2]))
+        except ValueError:
+            continue
+        if level > 0:
+            # Some drivers report the level as an unsigned byte
+            level -= 256
+        return rssi_to_percent(level), iface.strip()
     return None, None
 
 
-def check_network() -> tuple[str | None, str | None, str | None]:
-    """Check active network interfaces via /sys/class/net.
+def get_wifi_info() -> tuple[int | None, str | None]:
+    """Get current WiFi connection info (signal strength, SSID) from the kernel."""
+    global _nl80211
+
+    try:
+        return get_nl80211_info()
+    except OSError:
+        # nl80211 unavailable (no cfg80211) or the socket broke; reconnect next time
+        if _nl80211 is not None:
+            _nl80211.close()
+            _nl80211 = None
+    return get_proc_wireless_info()
+
+
+def check_network(table: LinkTable | None = None) -> tuple[str | None, str | None, str | None]:
+    """Check active wired/virtual interfaces in the rtnetlink link table.
     Returns (icon, type_name, iface_name) or (None, None, None).
     """
-    net_dir = Path("/sys/class/net")
-    if not net_dir.exists():
-        return None, None, None
+    if table is None:
+        try:
+            table = load_link_table()
+        except OSError:
+            return None, None, None
 
     # (prefix_tuple, type_name, icon, priority)
     types = [
@@ -63,15 +98,9 @@ def check_network() -> tuple[str | None, str | None, str | None]:
     ]
 
     found = []
-    for iface_path in net_dir.iterdir():
-        name = iface_path.name
-        if name in ("lo",) or name.startswith(("wl", "wlan")):
-            continue
-        try:
-            state = (iface_path / "operstate").read_text().strip()
-        except (OSError, IOError):
-            continue
-        if state != "up":
+    for link in table.up_links():
+        name = link.name
+        if link.wireless or name.startswith(("wl", "wlan")):
             continue
         for prefixes, type_name, icon, priority in types:
             if name.startswith(prefixes):
@@ -100,13 +129,13 @@ def get_signal_icon(signal: int) -> tuple[str, str]:
     return "󰤯", "very-weak"
 
 
-def main() -> None:
-    """Generate Waybar-compatible network status output."""
+def build_output(table: LinkTable | None = None) -> dict:
+    """Build the Waybar JSON object for the current network state."""
     signal, ssid = get_wifi_info()
 
     if signal is None:
         # No WiFi, check other interfaces
-        icon, type_name, iface_name = check_network()
+        icon, type_name, iface_name = check_network(table)
         if icon:
             output = {
                 "text": icon,
@@ -127,8 +156,47 @@ def main() -> None:
             "class": css_class
         }
 
-    print(json.dumps(output))
+    return output
+
+
+def stream() -> None:
+    """
+    Print a JSON line only when the icon, class or SSID changes.
+    Link changes wake the loop at once; signal is sampled every STREAM_INTERVAL.
+    """
+    try:
+        watcher = LinkWatcher()
+    except OSError:
+        watcher = None
+
+    last_key = None
+    while True:
+        if watcher is not None:
+            watcher.update()
+        output = build_output(watcher.table if watcher else None)
+        # The tooltip's percentage moves constantly; only buckets count
+        key = (output["text"], output["class"], output["tooltip"].rsplit(" (", 1)[0])
+        if key != last_key:
+            print(json.dumps(output), flush=True)
+            last_key = key
+
+        if watcher is None:
+            time.sleep(STREAM_INTERVAL)
+        else:
+            select.select([watcher], [], [], STREAM_INTERVAL)
+
+
+def main() -> None:
+    """Generate Waybar-compatible network status output."""
+    if len(sys.argv) > 1 and sys.argv[1] == "--stream":
+        stream()
+        return
+
+    print(json.dumps(build_output()))
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    try:
+        main()
+    except KeyboardInterrupt:
+        pass
\ No newline at end of file
@@ -6,12 +6,13 @@ Updates system stats (CPU, RAM, Swap, Disk, Uptime, Temp) in Swaync config.
 import argparse
 import json
 import os
+import select
 import sys
 import time
 from pathlib import Path
 
 sys.path.insert(0, str(Path.home() / ".config/hypr/Scripts"))
-from Utils import get_logger, run_silent, get_theme_dir
+from Utils import get_logger, run_silent, get_theme_dir, SYSFS_ROOT, ThemeWatcher
 
 log = get_logger("Sysinfo")
 
@@ -58,7 +59,7 @@ def get_uptime() -> str:
 def get_temp() -> str:
     """Get CPU temperature."""
     try:
-        temp = int(open('/sys/class/thermal/thermal_zone0/temp').read()) // 1000
+        temp = int(open(SYSFS_ROOT / 'class/thermal/thermal_zone0/temp').read()) // 1000
         return f"󰔄  Temp: {temp}°C"
     except (FileNotFoundError, ValueError):
         return "󰔄  Temp: N/A"
@@ -154,11 +155,26 @@ def update_widget() -> None:
 
 
 def daemon(interval: int) -> None:
-    """Run continuous update loop."""
+    """Run continuous update loop, switching config files when the theme changes."""
+    global CONFIG_PATH
+
     log.info(f"Starting sysinfo daemon (interval: {interval}s)")
+    try:
+        watcher = ThemeWatcher()
+    except OSError as e:
+        log.warning(f"Theme watch unavailable: {e}")
+        watcher = None
+
     while True:
         update_widget()
-        time.sleep(interval)
+        if watcher is None:
+            time.sleep(interval)
+            continue
+
+        ready, _, _ = select.select([watcher], [], [], interval)
+        if ready and watcher.changed():
+            CONFIG_PATH = get_theme_dir() / "Swaync/Config.json"
+            log.info(f"Theme changed, updating {CONFIG_PATH}")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,56 @@
+"""
+Shared setup for the script checks.
+Points HOME and XDG_RUNTIME_DIR at a scratch directory before any script module is imported.
+"""
+
+import os
+import socket
+import sys
+import tempfile
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+
+REPO_DIR: Path = Path(__file__).resolve().parent.parent
+SCRIPTS_DIR: Path = REPO_DIR / "config/hypr/Scripts"
+FIXTURES_DIR: Path = Path(__file__).resolve().parent / "fixtures"
+
+SCRATCH_DIR: Path = Path(tempfile.mkdtemp(prefix="hypr-tests-"))
+os.environ["HOME"] = str(SCRATCH_DIR / "home")
+os.environ["XDG_RUNTIME_DIR"] = str(SCRATCH_DIR / "run")
+os.makedirs(os.environ["XDG_RUNTIME_DIR"], mode=0o700, exist_ok=True)
+
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+
+class UnixServer:
+    """
+    A throwaway AF_UNIX stream server answering each connection on a thread.
+    The handler gets the accepted socket; the connection is closed afterwards.
+    """
+
+    def __init__(self, path: Path, handler: Callable[[socket.socket], None]) -> None:
+        self.path = path
+        self.handler = handler
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(str(path))
+        self.sock.listen(16)
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    def __enter__(self) -> "UnixServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.sock.close()
+        self.path.unlink(missing_ok=True)
+
+    def _serve(self) -> None:
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            with conn:
+                self.handler(conn)
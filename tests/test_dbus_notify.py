@@ -0,0 +1,240 @@
+"""
+Checks for the D-Bus client and native notifications.
+Runs against a minimal AF_UNIX peer that plays both the bus and the notification server.
+"""
+
+import os
+import socket
+import stat
+import threading
+import time
+import unittest
+from unittest import mock
+
+import support
+import DBus
+import Utils
+from DBus import ERROR, METHOD_CALL, METHOD_RETURN, SIGNAL, Connection, DBusError, Message
+
+UNIQUE_NAME: str = ":1.42"
+
+
+class FakeBus:
+    """
+    A single-peer stand-in for the session bus and a notification server.
+    Answers Hello and Notify; before each Notify reply it sends a signal and
+    a reply to someone else's serial, which the client must skip. With
+    hello=False the peer hangs up instead of answering Hello.
+    """
+
+    def __init__(self, path, auth_reply: bytes = b"OK 0123456789abcdef\r\n", hello: bool = True) -> None:
+        self.auth_reply = auth_reply
+        self.hello = hello
+        self.auth_lines: list[bytes] = []
+        self.calls: list[Message] = []
+        self.next_id = 7
+        self.server = support.UnixServer(path, self.handle)
+        self.address = f"unix:path={path}"
+
+    def __enter__(self) -> "FakeBus":
+        self.server.__enter__()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.__exit__(*exc)
+
+    def handle(self, conn: socket.socket) -> None:
+        buf = b""
+        while not buf.endswith(b"BEGIN\r\n"):
+            chunk = conn.recv(1)
+            if not chunk:
+                return
+            buf += chunk
+            if buf.endswith(b"\r\n"):
+                line, buf = buf, b""
+                self.auth_lines.append(line)
+                if line.startswith(b"\0AUTH"):
+                    conn.sendall(self.auth_reply)
+                    if not self.auth_reply.startswith(b"OK"):
+                        return
+                elif line.startswith(b"NEGOTIATE_UNIX_FD"):
+                    conn.sendall(b"AGREE_UNIX_FD\r\n")
+                else:
+                    buf = line
+
+        serial = 1000
+        data = b""
+        while True:
+            length = DBus.message_length(data)
+            if length is None or len(data) < length:
+                chunk = conn.recv(65536)
+                if not chunk:
+                    return
+                data += chunk
+                continue
+            msg, data = DBus.decode_message(data[:length]), data[length:]
+            self.calls.append(msg)
+            if msg.type != METHOD_CALL:
+                continue
+
+            replies = []
+            if msg.member == "Hello":
+                if not self.hello:
+                    return
+                replies.append(Message(METHOD_RETURN, 0, reply_serial=msg.serial,
+                                       signature="s", body=[UNIQUE_NAME]))
+            elif msg.member == "Notify":
+                replies.append(Message(SIGNAL, 0, path=DBus.BUS_PATH, interface=DBus.BUS_NAME,
+                                       member="NameAcquired", signature="s", body=[UNIQUE_NAME]))
+                replies.append(Message(METHOD_RETURN, 0, reply_serial=msg.serial + 100,
+                                       signature="u", body=[999]))
+                replies.append(Message(METHOD_RETURN, 0, reply_serial=msg.serial,
+                                       signature="u", body=[self.next_id]))
+                self.next_id += 1
+            else:
+                replies.append(Message(ERROR, 0, reply_serial=msg.serial,
+                                       error_name="org.freedesktop.DBus.Error.UnknownMethod",
+                                       signature="s", body=[msg.member or ""]))
+            for reply in replies:
+                serial += 1
+                reply.serial = serial
+                conn.sendall(DBus.encode_message(reply))
+
+    def notify_calls(self) -> list[Message]:
+        return [msg for msg in self.calls if msg.member == "Notify"]
+
+
+def client_sockets() -> tuple[list[socket.socket], mock._patch]:
+    """Collect the sockets the test thread creates (the fake peer's are left out)."""
+    created = []
+    real_socket = socket.socket
+
+    def make(*args, **kwargs) -> socket.socket:
+        sock = real_socket(*args, **kwargs)
+        if threading.current_thread() is threading.main_thread():
+            created.append(sock)
+        return sock
+
+    return created, mock.patch.object(DBus.socket, "socket", make)
+
+
+class DBusTestCase(unittest.TestCase):
+    """Gives each test its own bus socket path and a clean notification state."""
+
+    def setUp(self) -> None:
+        self.bus_path = support.SCRATCH_DIR / f"bus-{time.monotonic_ns()}"
+        env = mock.patch.dict(os.environ, {"DBUS_SESSION_BUS_ADDRESS": f"unix:path={self.bus_path}"})
+        env.start()
+        self.addCleanup(env.stop)
+        self.addCleanup(self.reset_session)
+        self.reset_session()
+
+    @staticmethod
+    def reset_session() -> None:
+        if DBus._session is not None:
+            DBus._session.close()
+        DBus._session = None
+        Utils._notification_ids.clear()
+        for path in Utils.get_runtime_dir().glob("notify-*.id"):
+            path.unlink()
+
+
+class ConnectionTest(DBusTestCase):
+    """SASL EXTERNAL and the handshake failure paths."""
+
+    def test_external_auth_and_hello(self) -> None:
+        with FakeBus(self.bus_path) as bus:
+            conn = Connection(bus.address)
+            conn.close()
+        self.assertEqual(conn.unique_name, UNIQUE_NAME)
+        uid = str(os.getuid()).encode().hex().encode()
+        self.assertEqual(bus.auth_lines[0], b"\0AUTH EXTERNAL " + uid + b"\r\n")
+        self.assertEqual(bus.calls[0].member, "Hello")
+
+    def test_rejected_auth_closes_socket(self) -> None:
+        created, patch = client_sockets()
+        with FakeBus(self.bus_path, auth_reply=b"REJECTED EXTERNAL\r\n") as bus, patch:
+            with self.assertRaises(DBusError) as raised:
+                Connection(bus.address)
+        self.assertEqual([sock.fileno() for sock in created], [-1])
+        self.assertEqual(raised.exception.name, "org.freedesktop.DBus.Error.AuthFailed")
+
+    def test_failed_hello_closes_socket(self) -> None:
+        created, patch = client_sockets()
+        with FakeBus(self.bus_path, hello=False) as bus, patch:
+            with self.assertRaises(DBusError):
+                Connection(bus.address)
+        self.assertEqual([sock.fileno() for sock in created], [-1])
+
+    def test_missing_bus(self) -> None:
+        with self.assertRaises(DBusError) as raised:
+            Connection.session()
+        self.assertEqual(raised.exception.name, "org.freedesktop.DBus.Error.NoServer")
+
+
+class NotifyTest(DBusTestCase):
+    """send_notification and notify over the fake server."""
+
+    def test_reply_serial_and_replaces_id(self) -> None:
+        with FakeBus(self.bus_path) as bus:
+            first = Utils.send_notification("Volume: 40%", icon="audio", tag="test")
+            second = Utils.send_notification("Volume: 45%", icon="audio", tag="test")
+            untagged = Utils.send_notification("Hello")
+
+        # The signal and the foreign reply before each answer are skipped
+        self.assertEqual((first, second, untagged), (7, 8, 9))
+        calls = bus.notify_calls()
+        self.assertEqual([call.body[1] for call in calls], [0, 7, 0])
+
+        app_name, _, icon, summary, body, actions, hints, timeout = calls[0].body
+        self.assertEqual((app_name, icon, summary, body, actions, timeout),
+                         ("notify-send", "audio", "Volume: 40%", "", [], -1))
+        self.assertEqual(hints["x-canonical-private-synchronous"], "test")
+        self.assertEqual(hints["urgency"], 0)
+
+    def test_connection_is_reused(self) -> None:
+        with FakeBus(self.bus_path) as bus:
+            Utils.send_notification("one")
+            Utils.send_notification("two")
+        self.assertEqual([msg.member for msg in bus.calls], ["Hello", "Notify", "Notify"])
+
+    def test_notify_uses_the_bus(self) -> None:
+        log = self.fake_notify_send()
+        with FakeBus(self.bus_path) as bus:
+            Utils.notify("audio-volume-high", "Volume: 50%")
+        self.assertEqual(len(bus.notify_calls()), 1)
+        self.assertFalse(os.path.exists(log))
+
+    def test_notify_send_fallback_without_bus(self) -> None:
+        log = self.fake_notify_send()
+        self.assertIsNone(Utils.send_notification("nobody listens"))
+        Utils.notify("audio-volume-high", "Volume: 50%", level="critical")
+        with open(log) as f:
+            self.assertEqual(f.read().split("\0")[:-1], [
+                "-e", "-a", "volume-notify",
+                "-h", f"string:x-canonical-private-synchronous:{Utils.NOTIFY_SYNC_TAG}",
+                "-u", "critical", "-i", "audio-volume-high", "Volume: 50%",
+            ])
+
+    def test_notify_send_fallback_when_handshake_fails(self) -> None:
+        log = self.fake_notify_send()
+        with FakeBus(self.bus_path, auth_reply=b"REJECTED EXTERNAL\r\n"):
+            Utils.notify("audio-volume-high", "Volume: 50%")
+        self.assertTrue(os.path.exists(log))
+
+    def fake_notify_send(self) -> str:
+        """Put a notify-send on PATH that logs its arguments; return the log path."""
+        bin_dir = support.SCRATCH_DIR / f"bin-{time.monotonic_ns()}"
+        bin_dir.mkdir()
+        log = bin_dir / "calls"
+        script = bin_dir / "notify-send"
+        script.write_text(f"#!/bin/sh\nprintf '%s\\0' \"$@\" > {log}\n")
+        script.chmod(script.stat().st_mode | stat.S_IXUSR)
+        env = mock.patch.dict(os.environ, {"PATH": f"{bin_dir}:{os.environ['PATH']}"})
+        env.start()
+        self.addCleanup(env.stop)
+        return str(log)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+"""
+Checks for the Hyprland event parser and bus.
+Replays a recorded .socket2.sock session, including lines split across reads.
+"""
+
+import asyncio
+import unittest
+
+import support
+from HyprEvents import WILDCARD, EventBus, EventParser
+
+SESSION: str = str(support.FIXTURES_DIR / "hyprland-session.socket2")
+
+SESSION_EVENTS: list[str] = [
+    "workspace", "workspacev2", "focusedmon", "activewindow", "activewindowv2",
+    "monitoradded", "monitoraddedv2", "createworkspace", "createworkspacev2",
+    "moveworkspacev2", "openwindow", "activewindow", "windowtitlev2", "closewindow",
+    "monitorremoved", "monitorremovedv2", "focusedmon", "configreloaded",
+]
+
+
+class ReplayTest(unittest.TestCase):
+    """EventBus.replay over the recorded session."""
+
+    def replay(self, bus: EventBus) -> None:
+        asyncio.run(bus.replay(SESSION, speed=0))
+
+    def test_every_event_in_order(self) -> None:
+        bus = EventBus()
+        seen = []
+        bus.subscribe(WILDCARD, seen.append)
+        self.replay(bus)
+        self.assertEqual([event.name for event in seen], SESSION_EVENTS)
+
+    def test_line_split_across_reads(self) -> None:
+        bus = EventBus()
+        created = []
+        bus.subscribe("createworkspacev2", created.append)
+        self.replay(bus)
+        self.assertEqual([(e.get("id"), e.get("name")) for e in created], [("5", "5")])
+
+    def test_character_split_across_reads(self) -> None:
+        bus = EventBus()
+        opened = []
+        bus.subscribe("openwindow", opened.append)
+        self.replay(bus)
+        self.assertEqual(opened[0].fields, {
+            "address": "5581e4b1d2e0",
+            "workspace": "5",
+            "class": "firefox",
+            "title": "Résumé - Mozilla Firefox",
+        })
+
+    def test_last_field_keeps_commas(self) -> None:
+        bus = EventBus()
+        windows = []
+        bus.subscribe("activewindow", windows.append)
+        self.replay(bus)
+        self.assertEqual(windows[0].get("class"), "kitty")
+        self.assertEqual(windows[0].get("title"), "~/src: nvim, main.py")
+
+    def test_monitor_hotplug_and_async_handlers(self) -> None:
+        bus = EventBus()
+        monitors = []
+
+        @bus.on("monitoraddedv2", "monitorremovedv2")
+        async def track(event) -> None:
+            await asyncio.sleep(0)
+            monitors.append((event.name, event.get("name"), event.get("description")))
+
+        self.replay(bus)
+        self.assertEqual(monitors, [
+            ("monitoraddedv2", "HDMI-A-1", "Dell Inc. DELL U2720Q"),
+            ("monitorremovedv2", "HDMI-A-1", "Dell Inc. DELL U2720Q"),
+        ])
+
+    def test_failing_handler_does_not_stop_replay(self) -> None:
+        bus = EventBus()
+        seen = []
+        bus.subscribe("workspace", lambda event: 1 / 0)
+        bus.subscribe(WILDCARD, seen.append)
+        with self.assertLogs("HyprEvents", "ERROR"):
+            self.replay(bus)
+        self.assertEqual(len(seen), len(SESSION_EVENTS))
+
+
+class ParserTest(unittest.TestCase):
+    """EventParser on arbitrary chunk boundaries."""
+
+    def test_any_chunking_gives_the_same_events(self) -> None:
+        payload = b"workspace>>3\nactivewindow>>kitty,a, b\nbogus line\nconfigreloaded>>\n"
+        whole = [(e.name, e.data) for e in EventParser().feed(payload)]
+        self.assertEqual(whole, [("workspace", "3"), ("activewindow", "kitty,a, b"),
+                                 ("configreloaded", "")])
+
+        for size in range(1, len(payload)):
+            parser = EventParser()
+            events = []
+            for i in range(0, len(payload), size):
+                events += parser.feed(payload[i:i + size])
+            self.assertEqual([(e.name, e.data) for e in events], whole, size)
+
+
+if __name__ == "__main__":
+    unittest.main()
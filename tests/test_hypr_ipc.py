@@ -0,0 +1,111 @@
+"""
+Checks for the Hyprland IPC client in Utils.
+Runs against a stand-in .socket.sock server and a fake hyprctl binary.
+"""
+
+import json
+import os
+import shlex
+import stat
+import time
+import unittest
+from unittest import mock
+
+import support
+import Utils
+
+
+class HyprIPCTest(unittest.TestCase):
+    """hypr_request and the hyprctl helpers against a stand-in instance."""
+
+    def setUp(self) -> None:
+        self.signature = f"test_{os.getpid()}_{time.monotonic_ns()}"
+        self.hypr_dir = support.SCRATCH_DIR / "run/hypr" / self.signature
+        self.hypr_dir.mkdir(parents=True)
+        self.requests: list[str] = []
+        self.replies: list[list[bytes]] = []
+
+        env = mock.patch.dict(os.environ, {"HYPRLAND_INSTANCE_SIGNATURE": self.signature})
+        env.start()
+        self.addCleanup(env.stop)
+        Utils._hypr_dir = None
+        self.addCleanup(setattr, Utils, "_hypr_dir", None)
+
+    def serve(self) -> support.UnixServer:
+        """Start a server that records each request and sends the next queued reply."""
+        def handle(conn) -> None:
+            self.requests.append(conn.recv(65536).decode())
+            for chunk in self.replies.pop(0) if self.replies else [b"ok"]:
+                conn.sendall(chunk)
+                # Let the client see each chunk as a separate read
+                time.sleep(0.01)
+
+        return support.UnixServer(self.hypr_dir / Utils.HYPR_SOCKET, handle)
+
+    def fake_hyprctl(self, output: str) -> str:
+        """Put a hyprctl on PATH that logs its arguments; return the log path."""
+        bin_dir = self.hypr_dir / "bin"
+        bin_dir.mkdir()
+        log = bin_dir / "calls"
+        script = bin_dir / "hyprctl"
+        script.write_text(f'#!/bin/sh\necho "$@" >> {log}\nprintf %s {shlex.quote(output)}\n')
+        script.chmod(script.stat().st_mode | stat.S_IXUSR)
+        env = mock.patch.dict(os.environ, {"PATH": f"{bin_dir}:{os.environ['PATH']}"})
+        env.start()
+        self.addCleanup(env.stop)
+        return str(log)
+
+    def test_plain_request(self) -> None:
+        self.replies.append([b"Hyprland 0.45\n"])
+        with self.serve():
+            self.assertEqual(Utils.hyprctl("version"), "Hyprland 0.45")
+        self.assertEqual(self.requests, ["version"])
+
+    def test_json_prefix_and_multi_chunk_reply(self) -> None:
+        monitors = [{"name": f"DP-{i}", "description": "x" * 1000} for i in range(200)]
+        data = json.dumps(monitors).encode()
+        self.assertGreater(len(data), Utils.HYPR_RECV_SIZE)
+        third = len(data) // 3
+        self.replies.append([data[:third], data[third:2 * third], data[2 * third:]])
+
+        with self.serve():
+            self.assertEqual(Utils.get_monitors(), monitors)
+        self.assertEqual(self.requests, ["j/monitors"])
+
+    def test_batch(self) -> None:
+        with self.serve():
+            Utils.hyprctl_batch("keyword animations:enabled 0", "keyword decoration:rounding 0")
+        self.assertEqual(
+            self.requests,
+            ["[[BATCH]]keyword animations:enabled 0;keyword decoration:rounding 0"]
+        )
+
+    def test_keyword_and_reload(self) -> None:
+        with self.serve():
+            Utils.hyprctl_keyword("general:gaps_in", "5")
+            Utils.hyprctl_reload()
+        self.assertEqual(self.requests, ["keyword general:gaps_in 5", "reload"])
+
+    def test_fallback_without_socket(self) -> None:
+        log = self.fake_hyprctl('[{"name": "eDP-1"}]')
+        self.assertIsNone(Utils.hypr_request("monitors"))
+        self.assertEqual(Utils.get_monitors(), [{"name": "eDP-1"}])
+        Utils.hyprctl_batch("dispatch workspace 1", "dispatch workspace 2")
+        with open(log) as f:
+            self.assertEqual(f.read().splitlines(), [
+                "monitors -j",
+                "--batch dispatch workspace 1;dispatch workspace 2",
+            ])
+
+    def test_fallback_outside_hyprland(self) -> None:
+        log = self.fake_hyprctl("ok")
+        with mock.patch.dict(os.environ):
+            del os.environ["HYPRLAND_INSTANCE_SIGNATURE"]
+            self.assertIsNone(Utils.get_hypr_dir())
+            Utils.hyprctl_keyword("general:gaps_in", "5")
+        with open(log) as f:
+            self.assertEqual(f.read().splitlines(), ["keyword general:gaps_in 5"])
+
+
+if __name__ == "__main__":
+    unittest.main()
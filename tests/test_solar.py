@@ -0,0 +1,69 @@
+"""
+Checks for the offline sunrise/sunset equations in Solar.
+Expected times are published almanac values in UTC, rounded to the minute.
+"""
+
+import unittest
+from datetime import date, datetime, timedelta, timezone
+
+import support
+from Solar import solar_elevation, sun_times
+
+# Published times are rounded and the equations are good to about a minute
+TOLERANCE: timedelta = timedelta(minutes=2)
+
+TROMSO: tuple[float, float] = (69.6492, 18.9553)
+
+# (place, latitude, longitude, day, sunrise UTC, sunset UTC)
+KNOWN_TIMES: list[tuple[str, float, float, date, str, str]] = [
+    ("London", 51.5074, -0.1278, date(2024, 6, 21), "2024-06-21 03:43", "2024-06-21 20:21"),
+    ("London", 51.5074, -0.1278, date(2024, 12, 21), "2024-12-21 08:04", "2024-12-21 15:53"),
+    ("New York", 40.7128, -74.0060, date(2024, 6, 20), "2024-06-20 09:25", "2024-06-21 00:31"),
+    ("New York", 40.7128, -74.0060, date(2024, 12, 21), "2024-12-21 12:16", "2024-12-21 21:32"),
+    ("Sydney", -33.8688, 151.2093, date(2024, 1, 1), "2023-12-31 18:47", "2024-01-01 09:10"),
+    ("Sydney", -33.8688, 151.2093, date(2024, 6, 21), "2024-06-20 21:00", "2024-06-21 06:54"),
+    ("Tokyo", 35.6762, 139.6503, date(2024, 3, 20), "2024-03-19 20:45", "2024-03-20 08:54"),
+]
+
+
+def utc(text: str) -> datetime:
+    return datetime.strptime(text, "%Y-%m-%d %H:%M").replace(tzinfo=timezone.utc)
+
+
+class SunTimesTest(unittest.TestCase):
+    """sun_times against almanac values."""
+
+    def test_known_times(self) -> None:
+        for place, latitude, longitude, day, sunrise, sunset in KNOWN_TIMES:
+            with self.subTest(place=place, day=day):
+                times = sun_times(day, latitude, longitude)
+                self.assertIsNotNone(times)
+                self.assertLessEqual(abs(times[0] - utc(sunrise)), TOLERANCE, "sunrise")
+                self.assertLessEqual(abs(times[1] - utc(sunset)), TOLERANCE, "sunset")
+
+    def test_polar_day(self) -> None:
+        day = date(2024, 6, 21)
+        self.assertIsNone(sun_times(day, *TROMSO))
+        midnight = datetime(2024, 6, 21, 23, 0, tzinfo=timezone.utc)
+        self.assertGreater(solar_elevation(midnight, *TROMSO), 0)
+
+    def test_polar_night(self) -> None:
+        day = date(2024, 12, 21)
+        self.assertIsNone(sun_times(day, *TROMSO))
+        noon = datetime(2024, 12, 21, 10, 45, tzinfo=timezone.utc)
+        self.assertLess(solar_elevation(noon, *TROMSO), 0)
+
+
+class ElevationTest(unittest.TestCase):
+    """solar_elevation agrees with sun_times."""
+
+    def test_horizon_at_sunrise_and_sunset(self) -> None:
+        for place, latitude, longitude, day, _, _ in KNOWN_TIMES:
+            with self.subTest(place=place, day=day):
+                for event in sun_times(day, latitude, longitude):
+                    # Apparent horizon: refraction and the solar radius
+                    self.assertAlmostEqual(solar_elevation(event, latitude, longitude), -0.833, delta=0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()